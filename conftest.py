@@ -15,6 +15,12 @@ if _src not in sys.path:
     sys.path.insert(0, _src)
 
 
+@pytest.fixture(autouse=True)
+def _no_shared_embedding_cache(monkeypatch):
+    """Keep tests from reading or writing the user's shared embedding cache."""
+    monkeypatch.setenv("LGREP_EMBED_CACHE", "0")
+
+
 class FakeClock:
     """Deterministic, manually advancing perf_counter seam for tests.
 
@@ -19,8 +19,13 @@ import json
 import re
 from typing import Any
 
+try:
+    import orjson
+except ImportError:  # optional extra: pip install "lgrep[orjson]"
+    orjson = None
 
-def load_jsonc_text(text: str) -> dict[str, Any]:
+
+def load_jsonc_text(text: str | bytes) -> dict[str, Any]:
     """Load a JSONC (JSON with comments) string and return a plain dict.
 
     Strips:
@@ -29,7 +34,8 @@ def load_jsonc_text(text: str) -> dict[str, Any]:
       - Trailing commas before ``]`` or ``}``
 
     Args:
-        text: JSONC-formatted string.
+        text: JSONC-formatted string, or its UTF-8 bytes. Plain-JSON bytes
+            are parsed without decoding to ``str`` first.
 
     Returns:
         Parsed Python dict.
@@ -37,6 +43,17 @@ def load_jsonc_text(text: str) -> dict[str, Any]:
     Raises:
         ValueError: If the stripped text is not valid JSON.
     """
+    # Fast path: most configs are plain JSON, which parses identically with or
+    # without the character-by-character comment scan below.
+    try:
+        data = orjson.loads(text) if orjson is not None else json.loads(text)
+    except ValueError:
+        pass
+    else:
+        return data
+
+    if isinstance(text, bytes):
+        text = text.decode("utf-8")
     stripped = _strip_comments(text)
     stripped = _strip_trailing_commas(stripped)
     try:
@@ -48,8 +65,10 @@ def load_jsonc_text(text: str) -> dict[str, Any]:
 def dump_jsonc_text(data: dict[str, Any], *, indent: int | None = None) -> str:
     """Dump a dict to a JSON string.
 
-    This is a thin wrapper around ``json.dumps`` — no comment-preservation
-    is needed for write operations.
+    This is a thin wrapper around ``json.dumps`` (or ``orjson`` for the
+    2-space layout when it is installed) — no comment-preservation is needed
+    for write operations. With orjson, non-ASCII text is written as UTF-8
+    rather than ``\\u`` escapes.
 
     Args:
         data: Python dict to serialize.
@@ -58,6 +77,8 @@ def dump_jsonc_text(data: dict[str, Any], *, indent: int | None = None) -> str:
     Returns:
         JSON string (no added comments — install config uses plain JSON).
     """
+    if orjson is not None and indent == 2:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
     return json.dumps(data, indent=indent, separators=(",", ": "))
 
 
@@ -5,11 +5,24 @@ Uses AST-aware chunking via tree-sitter for better semantic boundaries.
 
 from __future__ import annotations
 
+import bisect
+import os
+import re
+import sys
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass, field
+from itertools import pairwise
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import structlog
 
+from lgrep.discovery import MAX_FILE_SIZE_BYTES
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
 log = structlog.get_logger()
 
 # Language detection by file extension
@@ -56,11 +69,50 @@ LANGUAGE_MAP = {
     ".md": "markdown",
     ".sql": "sql",
 }
+# Keys are stored lowercase so detect_language can try the raw extension
+# first and lowercase only on a miss. Language names are interned because
+# they key the per-thread parser pool on every chunk_file call.
+LANGUAGE_MAP = {sys.intern(ext.lower()): sys.intern(lang) for ext, lang in LANGUAGE_MAP.items()}
 
 # Default chunk size (tokens)
 DEFAULT_CHUNK_SIZE = 500
 MIN_CHUNK_TOKENS = 10  # Skip tiny chunks
 
+# Batches smaller than this are chunked in-process: spawning worker processes
+# costs more than parsing a handful of files.
+PARALLEL_CHUNK_MIN_FILES = 8
+PARALLEL_CHUNK_BATCH = 32
+
+_NEWLINE = re.compile("\n")
+_READ_CHUNK_BYTES = 1 << 16
+# Leading bytes sniffed for NUL when skipping binary files (same as discovery).
+_BINARY_SNIFF_BYTES = 8192
+
+# Process-wide LRU of decoded content plus line index for small files, keyed by
+# (path, st_mtime_ns, st_size, read options) so any modification misses.
+# Repeated index passes over unchanged content (reindex cycles, retries) skip
+# the read, decode and newline scan. Memory is capped at roughly
+# _CONTENT_CACHE_SIZE * _CONTENT_CACHE_MAX_BYTES.
+_CONTENT_CACHE_SIZE = 256
+_CONTENT_CACHE_MAX_BYTES = 64 * 1024
+_CONTENT_CACHE: OrderedDict[tuple, tuple[str, _LineIndex]] = OrderedDict()
+_CONTENT_CACHE_LOCK = threading.Lock()
+
+# Process-wide pool of Chonkie chunkers keyed by (language, chunk_size).
+# Tree-sitter parsers are not safe to share between threads, so the pool is
+# thread-local: every worker thread reuses its own parsers across files and
+# across CodeChunker instances instead of rebuilding tree-sitter state.
+_PARSER_POOL = threading.local()
+
+
+def _thread_parser_pool() -> dict[tuple[str, int], object]:
+    """Return the calling thread's parser pool, creating it on first use."""
+    pool = getattr(_PARSER_POOL, "chunkers", None)
+    if pool is None:
+        pool = {}
+        _PARSER_POOL.chunkers = pool
+    return pool
+
 
 @dataclass
 class CodeChunkResult:
@@ -83,17 +135,108 @@ class ChunkInfo:
     end_line: int
 
 
+class _LineIndex:
+    """Character offset where each line of a file starts.
+
+    Built once per file and shared by the AST and fallback chunking paths.
+    Newlines are located with a single regex scan, so no per-line strings are
+    allocated; the fallback path slices lines out of ``content`` on demand.
+    ``starts`` has one extra trailing entry (``len(content) + 1``) so the end
+    of the last line can be looked up like any other.
+    """
+
+    __slots__ = ("content", "starts")
+
+    def __init__(self, content: str) -> None:
+        self.content = content
+        starts = [0]
+        starts.extend(m.end() for m in _NEWLINE.finditer(content))
+        starts.append(len(content) + 1)
+        self.starts = starts
+
+    def __len__(self) -> int:
+        return len(self.starts) - 1
+
+    def iter_lines(self) -> Iterator[str]:
+        """Yield each line without its trailing newline."""
+        content = self.content
+        for start, next_start in pairwise(self.starts):
+            yield content[start : next_start - 1]
+
+    def line_at(self, pos: int) -> int:
+        """Return the 1-indexed line containing character offset ``pos``."""
+        return bisect.bisect_right(self.starts, pos)
+
+
+def _group_lines(word_counts: Iterable[int], chunk_size: int) -> list[tuple[int, int, int]]:
+    """Group consecutive lines into ranges of at most ``chunk_size`` tokens.
+
+    Each line costs its word count plus one. A single line larger than
+    ``chunk_size`` still forms its own range.
+
+    Returns:
+        ``(first_line, last_line, tokens)`` tuples, 1-indexed and inclusive.
+    """
+    ranges: list[tuple[int, int, int]] = []
+    append = ranges.append
+    current = 0
+    start = 1
+    line = 0
+    for line, words in enumerate(word_counts, 1):
+        cost = words + 1
+        if current + cost > chunk_size and line > start:
+            append((start, line - 1, current))
+            current = cost
+            start = line
+        else:
+            current += cost
+    append((start, max(line, start), current))
+    return ranges
+
+
 def detect_language(file_path: str | Path) -> str | None:
     """Detect programming language from file extension.
 
+    Works on the path string directly (``os.path.splitext``) rather than
+    building a ``Path`` per call, and only lowercases the extension when the
+    exact-case lookup misses.
+
     Args:
         file_path: Path to the file
 
     Returns:
         Language name for Chonkie, or None if unsupported
     """
-    ext = Path(file_path).suffix.lower()
-    return LANGUAGE_MAP.get(ext)
+    ext = os.path.splitext(file_path if isinstance(file_path, str) else os.fspath(file_path))[1]
+    if not ext:
+        return None
+    language = LANGUAGE_MAP.get(ext)
+    if language is None and not ext.islower():
+        language = LANGUAGE_MAP.get(ext.lower())
+    return language
+
+
+# Per-process CodeChunker used by chunk_files() worker processes.
+_WORKER_CHUNKER: CodeChunker | None = None
+
+
+def _init_chunk_worker(
+    chunk_size: int,
+    max_bytes: int | None = MAX_FILE_SIZE_BYTES,
+    skip_binary: bool = True,
+) -> None:
+    """ProcessPoolExecutor initializer: build the worker's CodeChunker once."""
+    global _WORKER_CHUNKER
+    _WORKER_CHUNKER = CodeChunker(
+        chunk_size=chunk_size, max_bytes=max_bytes, skip_binary=skip_binary
+    )
+
+
+def _chunk_one(file_path: str) -> CodeChunkResult:
+    """Chunk one file in a worker process (top-level so it pickles)."""
+    if _WORKER_CHUNKER is None:
+        _init_chunk_worker(DEFAULT_CHUNK_SIZE)
+    return _WORKER_CHUNKER.chunk_file(file_path)
 
 
 class CodeChunker:
@@ -106,51 +249,144 @@ class CodeChunker:
     def __init__(
         self,
         chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_bytes: int | None = MAX_FILE_SIZE_BYTES,
+        skip_binary: bool = True,
     ) -> None:
         """Initialize the chunker.
 
         Args:
             chunk_size: Target chunk size in tokens (default 500)
+            max_bytes: Files larger than this are read as empty and produce
+                no chunks (default 1 MB; None disables the cap)
+            skip_binary: Treat files with a NUL byte in their first 8 KB as
+                empty instead of chunking them
         """
         self.chunk_size = chunk_size
-        self._chunkers: dict[str, object] = {}
+        self.max_bytes = max_bytes
+        self.skip_binary = skip_binary
         log.info("code_chunker_initialized", chunk_size=chunk_size)
 
     def _get_chunker(self, language: str):
         """Get or create a Chonkie chunker for a language.
 
+        Chunkers come from the calling thread's pool, so repeated indexing runs
+        and fresh CodeChunker instances on the same thread reuse parsers.
+
         Note: Uses Chonkie's experimental AST-aware chunker. This API may change.
         """
-        if language not in self._chunkers:
+        pool = _thread_parser_pool()
+        key = (language, self.chunk_size)
+        if key not in pool:
             try:
                 from chonkie.experimental import CodeChunker as ChonkieCodeChunker
 
-                self._chunkers[language] = ChonkieCodeChunker(
+                pool[key] = ChonkieCodeChunker(
                     language=language,
                     chunk_size=self.chunk_size,
                 )
-                log.debug("chunker_created", language=language)
+                log.debug("chunker_created", language=language, chunk_size=self.chunk_size)
             except Exception as e:
                 log.warning("chunker_creation_failed", language=language, error=str(e))
                 return None
-        return self._chunkers.get(language)
+        return pool.get(key)
+
+    def close(self) -> None:
+        """Drop the calling thread's pooled chunkers for this chunk size.
+
+        Long-running servers can call this to release tree-sitter state once a
+        project is unloaded. Parsers are rebuilt lazily on the next chunk call.
+        """
+        pool = _thread_parser_pool()
+        for key in [k for k in pool if k[1] == self.chunk_size]:
+            del pool[key]
 
     def _read_file_content(self, file_path: Path) -> str | None:
-        """Read file content, returning None on failure."""
+        """Read file content, returning None on failure.
+
+        Reads the raw bytes with ``os.read`` sized from ``fstat`` rather than
+        going through a buffered text stream, then decodes once. Newlines are
+        normalized to ``\n`` exactly as a text-mode read would.
+
+        Oversized and binary files (see ``max_bytes`` / ``skip_binary``) are
+        returned as ``""`` so callers treat them as having nothing to index;
+        the size check happens before any data is read.
+        """
         try:
-            return file_path.read_text(encoding="utf-8", errors="replace")
+            fd = os.open(file_path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+            try:
+                size = os.fstat(fd).st_size
+                if self.max_bytes is not None and size > self.max_bytes:
+                    log.debug("file_skipped_oversized", file=str(file_path), size=size)
+                    return ""
+                # One byte past the stat size, so an unchanged file is read
+                # in a single call; keep reading if it grew meanwhile.
+                parts = [os.read(fd, size + 1)]
+                while parts[-1]:
+                    parts.append(os.read(fd, _READ_CHUNK_BYTES))
+            finally:
+                os.close(fd)
+            data = parts[0] if len(parts) == 2 else b"".join(parts)
+            if self.skip_binary and data.find(b"\x00", 0, _BINARY_SNIFF_BYTES) != -1:
+                log.debug("file_skipped_binary", file=str(file_path))
+                return ""
+            text = data.decode("utf-8", "replace")
         except Exception as e:
             log.warning("file_read_failed", file=str(file_path), error=str(e))
             return None
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return text
 
-    def _try_ast_chunk(self, content: str, language: str, str_path: str) -> list[ChunkInfo] | None:
+    def _load_file(self, str_path: str) -> tuple[str | None, _LineIndex | None]:
+        """Read a file and build its line index, via the shared content cache.
+
+        Files up to ``_CONTENT_CACHE_MAX_BYTES`` are served from
+        ``_CONTENT_CACHE`` while their mtime and size are unchanged. Larger
+        files, and files that cannot be stat'ed, are always read fresh.
+
+        Returns:
+            ``(content, line_index)``; ``(None, None)`` if the read failed.
+            The index is None when the content is blank.
+        """
+        key = None
+        try:
+            st = os.stat(str_path)
+        except OSError:
+            pass
+        else:
+            if st.st_size <= _CONTENT_CACHE_MAX_BYTES:
+                key = (str_path, st.st_mtime_ns, st.st_size, self.max_bytes, self.skip_binary)
+                with _CONTENT_CACHE_LOCK:
+                    hit = _CONTENT_CACHE.get(key)
+                    if hit is not None:
+                        _CONTENT_CACHE.move_to_end(key)
+                        return hit
+
+        content = self._read_file_content(Path(str_path))
+        if content is None:
+            return None, None
+        line_index = _LineIndex(content) if content.strip() else None
+        if key is not None and line_index is not None:
+            with _CONTENT_CACHE_LOCK:
+                _CONTENT_CACHE[key] = (content, line_index)
+                if len(_CONTENT_CACHE) > _CONTENT_CACHE_SIZE:
+                    _CONTENT_CACHE.popitem(last=False)
+        return content, line_index
+
+    def _try_ast_chunk(
+        self,
+        content: str,
+        language: str,
+        str_path: str,
+        line_index: _LineIndex | None = None,
+    ) -> list[ChunkInfo] | None:
         """Attempt AST-based chunking, returning None on failure."""
         chunker = self._get_chunker(language)
         if not chunker:
             return None
         try:
             raw_chunks = chunker.chunk(content)
-            chunks = self._process_chunks(raw_chunks, content)
+            chunks = self._process_chunks(raw_chunks, content, line_index)
             log.debug(
                 "file_chunked",
                 file=str_path,
@@ -176,8 +412,9 @@ class CodeChunker:
         str_path = str(file_path)
 
         # Read content if not provided
+        line_index = None
         if content is None:
-            content = self._read_file_content(file_path)
+            content, line_index = self._load_file(str_path)
             if content is None:
                 return CodeChunkResult(
                     file_path=str_path,
@@ -188,14 +425,15 @@ class CodeChunker:
             return CodeChunkResult(file_path=str_path, language=None)
 
         language = detect_language(file_path)
+        line_index = line_index or _LineIndex(content)
 
         # Try AST-based chunking, then fallback to text
         chunks = None
         if language:
-            chunks = self._try_ast_chunk(content, language, str_path)
+            chunks = self._try_ast_chunk(content, language, str_path, line_index)
 
         if chunks is None:
-            chunks = self._fallback_chunk(content)
+            chunks = self._fallback_chunk(content, line_index)
             log.debug("file_chunked_fallback", file=str_path, chunks=len(chunks))
 
         return CodeChunkResult(
@@ -204,19 +442,67 @@ class CodeChunker:
             language=language,
         )
 
-    def _process_chunks(self, raw_chunks: list, content: str) -> list[ChunkInfo]:
+    def chunk_files(
+        self, file_paths: list[str | Path], max_workers: int | None = None
+    ) -> list[CodeChunkResult]:
+        """Chunk many files, fanning the CPU-bound work out to worker processes.
+
+        Results are returned in the same order as ``file_paths``. Batches
+        smaller than ``PARALLEL_CHUNK_MIN_FILES`` (or ``max_workers=1``) are
+        chunked in-process. Workers are spawned rather than forked so a
+        multi-threaded daemon never forks while another thread holds a lock.
+
+        Args:
+            file_paths: Paths of the files to chunk
+            max_workers: Worker process count (default: ``os.cpu_count()``)
+
+        Returns:
+            One CodeChunkResult per input path
+        """
+        workers = max_workers or os.cpu_count() or 1
+        if workers <= 1 or len(file_paths) < PARALLEL_CHUNK_MIN_FILES:
+            return [self.chunk_file(path) for path in file_paths]
+
+        # Deferred: process-pool machinery is only needed for large batches.
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        workers = min(workers, len(file_paths))
+        batch = max(1, min(PARALLEL_CHUNK_BATCH, len(file_paths) // workers))
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_chunk_worker,
+            initargs=(self.chunk_size, self.max_bytes, self.skip_binary),
+        ) as executor:
+            return list(
+                executor.map(
+                    _chunk_one,
+                    [str(path) for path in file_paths],
+                    chunksize=batch,
+                )
+            )
+
+    def _process_chunks(
+        self, raw_chunks: list, content: str, line_index: _LineIndex | None = None
+    ) -> list[ChunkInfo]:
         """Process Chonkie chunks into ChunkInfo objects.
 
-        Filters out tiny chunks and calculates line numbers.
+        Filters out tiny chunks and calculates line numbers. Chunk offsets come
+        from Chonkie's ``start_index`` when it matches the content; otherwise
+        the chunk's full text (then its 50-char prefix) is located with a
+        forward-moving search cursor, so locating every chunk costs
+        O(len(content)) overall and each line lookup is a binary search over
+        the line-start offsets.
         """
         chunks = []
-        lines = content.split("\n")
-        line_starts = [0]  # Cumulative char positions for each line
-        for line in lines:
-            line_starts.append(line_starts[-1] + len(line) + 1)
+        if line_index is None:
+            line_index = _LineIndex(content)
 
+        search_from = 0
         for i, raw in enumerate(raw_chunks):
-            text = raw.text.strip()
+            raw_text = raw.text
+            text = raw_text.strip()
             token_count = getattr(raw, "token_count", len(text.split()))
 
             # Skip tiny/empty chunks
@@ -224,22 +510,29 @@ class CodeChunker:
                 continue
 
             # Calculate line numbers
-            # Find the chunk in content and get line numbers
             start_line = 1
             end_line = 1
             try:
-                pos = content.find(text[: min(50, len(text))])
+                pos = -1
+                start_index = getattr(raw, "start_index", None)
+                if isinstance(start_index, int):
+                    candidate = start_index + (len(raw_text) - len(raw_text.lstrip()))
+                    if content.startswith(text, candidate):
+                        pos = candidate
+                if pos < 0:
+                    # Whole-text match first: a shared prefix (boilerplate
+                    # headers, decorators) must not anchor to the wrong spot.
+                    pos = content.find(text, search_from)
+                if pos < 0:
+                    needle = text[: min(50, len(text))]
+                    pos = content.find(needle, search_from)
+                    if pos < 0:
+                        pos = content.find(needle)
                 if pos >= 0:
-                    # Find which line this position is on
-                    for line_num, start_pos in enumerate(line_starts):
-                        if start_pos > pos:
-                            start_line = line_num
-                            break
                     end_pos = pos + len(text)
-                    for line_num, start_pos in enumerate(line_starts):
-                        if start_pos > end_pos:
-                            end_line = line_num
-                            break
+                    start_line = line_index.line_at(pos)
+                    end_line = line_index.line_at(end_pos)
+                    search_from = end_pos
             except Exception as e:
                 log.debug("line_number_calc_failed", chunk_index=i, error=str(e))
 
@@ -255,52 +548,33 @@ class CodeChunker:
 
         return chunks
 
-    def _fallback_chunk(self, content: str) -> list[ChunkInfo]:
+    def _fallback_chunk(
+        self, content: str, line_index: _LineIndex | None = None
+    ) -> list[ChunkInfo]:
         """Simple text-based chunking fallback.
 
-        Splits on double newlines (paragraphs) and recombines to target size.
+        Per-line token estimates are computed up front, grouped into line
+        ranges by :func:`_group_lines`, and each range is emitted as a single
+        slice of ``content`` using the cached line offsets.
         """
-        chunks = []
-        lines = content.split("\n")
-
-        current_chunk = []
-        current_tokens = 0
-        start_line = 1
-
-        for i, line in enumerate(lines):
-            line_tokens = len(line.split()) + 1  # Rough estimate
-
-            if current_tokens + line_tokens > self.chunk_size and current_chunk:
-                # Emit current chunk
-                text = "\n".join(current_chunk)
-                if len(text.strip()) > 0:
-                    chunks.append(
-                        ChunkInfo(
-                            text=text,
-                            token_count=current_tokens,
-                            chunk_index=len(chunks),
-                            start_line=start_line,
-                            end_line=i,
-                        )
-                    )
-                current_chunk = [line]
-                current_tokens = line_tokens
-                start_line = i + 1
-            else:
-                current_chunk.append(line)
-                current_tokens += line_tokens
-
-        # Emit final chunk
-        if current_chunk:
-            text = "\n".join(current_chunk)
-            if len(text.strip()) > 0:
+        line_index = line_index or _LineIndex(content)
+        starts = line_index.starts
+        # Rough estimate: whitespace-separated words plus one for the newline.
+        word_counts = map(len, map(str.split, line_index.iter_lines()))
+
+        chunks: list[ChunkInfo] = []
+        for first_line, last_line, tokens in _group_lines(word_counts, self.chunk_size):
+            # Lines first_line..last_line (1-indexed, inclusive) end just before
+            # the newline that precedes line last_line + 1.
+            text = content[starts[first_line - 1] : starts[last_line] - 1]
+            if text and not text.isspace():
                 chunks.append(
                     ChunkInfo(
                         text=text,
-                        token_count=current_tokens,
+                        token_count=tokens,
                         chunk_index=len(chunks),
-                        start_line=start_line,
-                        end_line=len(lines),
+                        start_line=first_line,
+                        end_line=last_line,
                     )
                 )
 
@@ -20,42 +20,11 @@ def main() -> int:
     args = sys.argv[1:]
 
     # Subcommand dispatch
-    if args and args[0] in ("search", "search-semantic"):
-        return _cmd_search_semantic(args[1:])
-
-    if args and args[0] in ("index", "index-semantic"):
-        return _cmd_index_semantic(args[1:])
-
-    if args and args[0] in ("search-symbols",):
-        return _cmd_search_symbols(args[1:])
-
-    if args and args[0] in ("index-symbols",):
-        return _cmd_index_symbols(args[1:])
-
-    if args and args[0] in ("init-ignore", "init-lgrepignore"):
-        return _cmd_init_ignore(args[1:])
-
-    if args and args[0] == "prune-orphans":
-        return _cmd_prune_orphans(args[1:])
-
-    if args and args[0] == "prune-symbols":
-        return _cmd_prune_symbols(args[1:])
-
-    if args and args[0] == "gc":
-        return _cmd_gc(args[1:])
-
-    if args and args[0] == "remove":
-        return _cmd_remove(args[1:])
-
-    if args and args[0] == "install-opencode":
-        from lgrep.install_opencode import install
-
-        return install()
-
-    if args and args[0] == "uninstall-opencode":
-        from lgrep.install_opencode import uninstall
-
-        return uninstall()
+    if args:
+        handler_name = _COMMANDS.get(args[0])
+        if handler_name is not None:
+            _configure_subcommand_logging()
+            return globals()[handler_name](args[1:])
 
     if "--help" in sys.argv or "-h" in sys.argv:
         _print_help()
@@ -86,11 +55,123 @@ def main() -> int:
         return 1
 
     # Default: start MCP server
+    _limit_native_threads()
     from lgrep.server import run_server
 
     return run_server(transport=transport, host=host, port=port)
 
 
+# Subcommand name -> handler function name. Handlers are looked up by name at
+# dispatch time (not bound here) so they resolve after module load, including
+# when tests patch ``lgrep.cli._cmd_*``; each handler imports its own deps.
+_COMMANDS: dict[str, str] = {
+    "search": "_cmd_search_semantic",
+    "search-semantic": "_cmd_search_semantic",
+    "index": "_cmd_index_semantic",
+    "index-semantic": "_cmd_index_semantic",
+    "search-symbols": "_cmd_search_symbols",
+    "index-symbols": "_cmd_index_symbols",
+    "init-ignore": "_cmd_init_ignore",
+    "init-lgrepignore": "_cmd_init_ignore",
+    "prune-orphans": "_cmd_prune_orphans",
+    "prune-symbols": "_cmd_prune_symbols",
+    "gc": "_cmd_gc",
+    "remove": "_cmd_remove",
+    "install-opencode": "_cmd_install_opencode",
+    "uninstall-opencode": "_cmd_uninstall_opencode",
+}
+
+
+# Native thread pools that size themselves from these variables when their
+# library is first imported.
+_NATIVE_THREAD_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+
+def _limit_native_threads() -> None:
+    """Default BLAS/OpenMP pools to one thread before the server imports numpy.
+
+    The server's numpy work (semantic-cache scoring) is a single small
+    matrix-vector product per search, run from many tool calls at once;
+    per-call BLAS threads only oversubscribe the cores that the runtime
+    pools and LanceDB already use. Values set by the user are kept.
+    """
+    import os
+
+    for name in _NATIVE_THREAD_VARS:
+        os.environ.setdefault(name, "1")
+
+
+def _configure_subcommand_logging() -> None:
+    """Filter structlog below ``LGREP_LOG_LEVEL`` (default INFO) for subcommands.
+
+    Unconfigured structlog formats and prints every debug event, including
+    the per-file ones from discovery and chunking. A filtering bound logger
+    turns calls below the threshold into no-ops. Output format and
+    destination are left at structlog's defaults.
+    """
+    import logging
+    import os
+
+    import structlog
+
+    log_level = getattr(
+        logging,
+        os.environ.get("LGREP_LOG_LEVEL", "INFO").upper(),
+        logging.INFO,
+    )
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(log_level))
+
+
+# type -> whether ``_dataclass_fields`` may encode its instances.
+_DATACLASS_TYPES: dict[type, bool] = {}
+
+
+def _dataclass_fields(obj: object) -> dict:
+    """``json.dumps`` default hook: expose a dataclass's fields without copying.
+
+    Unlike ``dataclasses.asdict`` this does not deep-copy the tree; nested
+    dataclasses come back through the hook as the encoder reaches them. The
+    dataclass check runs once per type, not once per result.
+    """
+    cls = type(obj)
+    encodable = _DATACLASS_TYPES.get(cls)
+    if encodable is None:
+        from dataclasses import is_dataclass
+
+        encodable = _DATACLASS_TYPES[cls] = is_dataclass(cls)
+    if encodable:
+        return vars(obj)
+    raise TypeError(f"Object of type {cls.__name__} is not JSON serializable")
+
+
+def _dumps(data: object) -> str:
+    """Serialize a subcommand's JSON output, using orjson when installed.
+
+    Dataclasses such as ``SearchResults`` are encoded in place on both paths,
+    never via an ``asdict`` copy. orjson writes compact UTF-8; the stdlib
+    fallback keeps ``json.dumps`` defaults.
+    """
+    try:
+        import orjson  # optional extra: pip install "lgrep[orjson]"
+    except ImportError:
+        return json.dumps(data, default=_dataclass_fields)
+    return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+def _cmd_install_opencode(args: list[str]) -> int:
+    """Install lgrep into OpenCode (tool + MCP + skill)."""
+    from lgrep.install_opencode import install
+
+    return install()
+
+
+def _cmd_uninstall_opencode(args: list[str]) -> int:
+    """Remove lgrep from OpenCode."""
+    from lgrep.install_opencode import uninstall
+
+    return uninstall()
+
+
 def _print_help() -> None:
     """Print CLI help text."""
     print("usage: lgrep [command] [options]")
@@ -117,6 +198,7 @@ def _print_help() -> None:
     print()
     print("index-semantic options:")
     print("  --chunk-size N                 token size per chunk (default: 500)")
+    print("  --batch-size N                 chunks per embedding request (default: 128)")
     print()
     print("server options:")
     print("  --version                      show version and exit")
@@ -150,11 +232,10 @@ def _cmd_search_semantic(args: list[str]) -> int:
         return 0
 
     import os
-    from dataclasses import asdict
     from pathlib import Path
 
     from lgrep.embeddings import VoyageEmbedder
-    from lgrep.storage import ChunkStore, get_project_db_path
+    from lgrep.storage import ChunkStore, get_project_db_path, open_default_embedding_cache
 
     # Parse args
     query = None
@@ -191,7 +272,7 @@ def _cmd_search_semantic(args: list[str]) -> int:
     api_key = os.environ.get("VOYAGE_API_KEY")
     if not api_key:
         print(
-            json.dumps(
+            _dumps(
                 {
                     "error": "VOYAGE_API_KEY not set",
                     "hint": "Set VOYAGE_API_KEY in your environment or MCP server config env section.",
@@ -204,7 +285,7 @@ def _cmd_search_semantic(args: list[str]) -> int:
     db_path = get_project_db_path(path)
     if not db_path.exists():
         print(
-            json.dumps(
+            _dumps(
                 {
                     "error": f"No index found for {path}. Run 'lgrep index-semantic {path}' first.",
                     "hint": "The lgrep MCP server auto-indexes on first search. Use the MCP tool (lgrep_search_semantic) instead of the CLI wrapper for automatic indexing.",
@@ -215,7 +296,8 @@ def _cmd_search_semantic(args: list[str]) -> int:
 
     # Search
     try:
-        embedder = VoyageEmbedder(api_key=api_key)
+        embedder = VoyageEmbedder(api_key=api_key, cache=open_default_embedding_cache())
+        # The table keeps its on-disk width; a mismatch raises a reindex hint.
         store = ChunkStore(db_path, project_path=path)
 
         query_vector = embedder.embed_query(query)
@@ -225,10 +307,10 @@ def _cmd_search_semantic(args: list[str]) -> int:
         else:
             results = store.search_vector(query_vector, limit)
 
-        print(json.dumps(asdict(results)))
+        print(_dumps(results))
         return 0
     except Exception as e:
-        print(json.dumps({"error": str(e)}))
+        print(_dumps({"error": str(e)}))
         return 1
 
 
@@ -270,13 +352,13 @@ def _cmd_init_ignore(args: list[str]) -> int:
 
     path = Path(positional[0]).resolve() if positional else Path.cwd().resolve()
     if not path.exists() or not path.is_dir():
-        print(json.dumps({"error": f"Path does not exist or is not a directory: {path}"}))
+        print(_dumps({"error": f"Path does not exist or is not a directory: {path}"}))
         return 1
 
     try:
         lgrepignore_path, created = scaffold_lgrepignore(path, force=force)
         print(
-            json.dumps(
+            _dumps(
                 {
                     "path": str(lgrepignore_path),
                     "created": created,
@@ -286,7 +368,7 @@ def _cmd_init_ignore(args: list[str]) -> int:
         )
         return 0
     except OSError as e:
-        print(json.dumps({"error": f"Failed to write .lgrepignore: {e}"}))
+        print(_dumps({"error": f"Failed to write .lgrepignore: {e}"}))
         return 1
 
 
@@ -344,7 +426,7 @@ def _cmd_prune_orphans(args: list[str]) -> int:
             return 1
 
     report = prune_orphans(dry_run=dry_run, cache_dir=cache_dir)
-    print(json.dumps(report))
+    print(_dumps(report))
     return 0
 
 
@@ -399,7 +481,7 @@ def _cmd_prune_symbols(args: list[str]) -> int:
             return 1
 
     report = prune_symbols(dry_run=dry_run, storage_dir=storage_dir)
-    print(json.dumps(report))
+    print(_dumps(report))
     return 0
 
 
@@ -469,7 +551,7 @@ def _cmd_gc(args: list[str]) -> int:
         "gc_worktree_meta": meta_report,
         "prune_symbols": symbols_report,
     }
-    print(json.dumps(combined))
+    print(_dumps(combined))
     return 0
 
 
@@ -479,10 +561,10 @@ def _cmd_index_semantic(args: list[str]) -> int:
     Creates an embedder and ChunkStore directly, performs a full index,
     and prints JSON status to stdout. Bypasses the MCP server entirely.
 
-    Usage: lgrep index-semantic [path] [--chunk-size N]
+    Usage: lgrep index-semantic [path] [--chunk-size N] [--batch-size N]
     """
     if "--help" in args or "-h" in args:
-        print("usage: lgrep index-semantic [path] [--chunk-size N]")
+        print("usage: lgrep index-semantic [path] [--chunk-size N] [--batch-size N]")
         print()
         print("Index a project directory for semantic code search.")
         print()
@@ -491,6 +573,7 @@ def _cmd_index_semantic(args: list[str]) -> int:
         print()
         print("options:")
         print("  --chunk-size N                 token size per chunk (default: 500)")
+        print("  --batch-size N                 chunks per embedding request (default: 128)")
         return 0
 
     import os
@@ -498,10 +581,11 @@ def _cmd_index_semantic(args: list[str]) -> int:
 
     from lgrep.embeddings import VoyageEmbedder
     from lgrep.indexing import Indexer
-    from lgrep.storage import ChunkStore, get_project_db_path
+    from lgrep.storage import ChunkStore, get_project_db_path, open_default_embedding_cache
 
     # Parse args
     chunk_size = 500
+    batch_size = 128
     positional = []
 
     i = 0
@@ -509,6 +593,9 @@ def _cmd_index_semantic(args: list[str]) -> int:
         if args[i] == "--chunk-size" and i + 1 < len(args):
             chunk_size = int(args[i + 1])
             i += 2
+        elif args[i] == "--batch-size" and i + 1 < len(args):
+            batch_size = int(args[i + 1])
+            i += 2
         elif args[i].startswith("-"):
             print(f"Unknown option: {args[i]}", file=sys.stderr)
             return 1
@@ -520,14 +607,14 @@ def _cmd_index_semantic(args: list[str]) -> int:
 
     # Validate path
     if not path.exists() or not path.is_dir():
-        print(json.dumps({"error": f"Path does not exist or is not a directory: {path}"}))
+        print(_dumps({"error": f"Path does not exist or is not a directory: {path}"}))
         return 1
 
     # Validate environment
     api_key = os.environ.get("VOYAGE_API_KEY")
     if not api_key:
         print(
-            json.dumps(
+            _dumps(
                 {
                     "error": "VOYAGE_API_KEY not set",
                     "hint": "Set VOYAGE_API_KEY in your environment or MCP server config env section.",
@@ -539,14 +626,14 @@ def _cmd_index_semantic(args: list[str]) -> int:
     # Index
     try:
         db_path = get_project_db_path(path)
-        embedder = VoyageEmbedder(api_key=api_key)
-        store = ChunkStore(db_path, project_path=path)
-        indexer = Indexer(path, store, embedder, chunk_size=chunk_size)
+        embedder = VoyageEmbedder(api_key=api_key, cache=open_default_embedding_cache())
+        store = ChunkStore(db_path, project_path=path, dimension=embedder.output_dimension)
+        indexer = Indexer(path, store, embedder, chunk_size=chunk_size, batch_size=batch_size)
 
         status = indexer.index_all()
 
         print(
-            json.dumps(
+            _dumps(
                 {
                     "project": str(path),
                     "file_count": status.file_count,
@@ -558,7 +645,7 @@ def _cmd_index_semantic(args: list[str]) -> int:
         )
         return 0
     except Exception as e:
-        print(json.dumps({"error": str(e)}))
+        print(_dumps({"error": str(e)}))
         return 1
 
 
@@ -586,7 +673,7 @@ def _cmd_remove(args: list[str]) -> int:
 
     if db_path.exists():
         print(
-            json.dumps(
+            _dumps(
                 {
                     "project": str(project_path),
                     "db_path": str(db_path),
@@ -598,7 +685,7 @@ def _cmd_remove(args: list[str]) -> int:
         )
     else:
         print(
-            json.dumps(
+            _dumps(
                 {
                     "project": str(project_path),
                     "db_path": str(db_path),
@@ -669,7 +756,7 @@ def _cmd_search_symbols(args: list[str]) -> int:
     path = str(Path(positional[1]).resolve()) if len(positional) > 1 else str(Path.cwd().resolve())
 
     result = search_symbols(query, path, storage_dir=storage_dir, limit=limit)
-    print(json.dumps(result))
+    print(_dumps(result))
     return 0 if "error" not in result else 1
 
 
@@ -721,7 +808,7 @@ def _cmd_index_symbols(args: list[str]) -> int:
     path = str(Path(positional[0]).resolve()) if positional else str(Path.cwd().resolve())
 
     result = index_folder(path, storage_dir=storage_dir, max_files=max_files)
-    print(json.dumps(result))
+    print(_dumps(result))
     return 0 if "error" not in result else 1
 
 
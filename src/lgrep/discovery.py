@@ -15,15 +15,17 @@ Security hardening (v2.0.0):
 from __future__ import annotations
 
 import os
+from collections import deque
 from pathlib import Path
 from typing import TYPE_CHECKING
 
-import gitignorefile
 import structlog
 
 if TYPE_CHECKING:
     from collections.abc import Iterator
 
+    import pathspec
+
 log = structlog.get_logger()
 
 DEFAULT_LGREPIGNORE_TEMPLATE = """# lgrep recommended ignore patterns
@@ -67,6 +69,16 @@ docs/site/
 # Maximum file size to index (1 MB). Files larger than this are skipped.
 MAX_FILE_SIZE_BYTES = 1 * 1024 * 1024  # 1 MB
 
+# Upper bound on cached per-directory ignore-rule results; the cache is simply
+# cleared when full (directory sets are small relative to file sets).
+_DIR_IGNORE_CACHE_MAX = 4096
+
+# pathspec matching backend. "best" compiles each ignore file's patterns into a
+# single google-re2 (or hyperscan) pattern set when the optional extra is
+# installed (`pip install lgrep[re2]`), so a path is matched against all rules
+# in one DFA pass; otherwise pathspec's pure-Python backend is used.
+_IGNORE_BACKEND = "best"
+
 # Directories to always skip (build artifacts, dependencies, generated code).
 _SKIP_DIRS: frozenset[str] = frozenset(
     [
@@ -157,13 +169,13 @@ def _is_secret_file(path: Path) -> bool:
     return bool(any(name.startswith(prefix) for prefix in _SECRET_PREFIXES))
 
 
-def _is_binary_file(path: Path) -> bool:
+def _is_binary_file(path: str | Path) -> bool:
     """Return True if the file appears to be binary (contains null bytes).
 
     Reads only the first 8 KB to keep this fast.
     """
     try:
-        with path.open("rb") as f:
+        with open(path, "rb") as f:
             chunk = f.read(8192)
         return b"\x00" in chunk
     except OSError:
@@ -226,120 +238,268 @@ class FileDiscovery:
         Args:
             root_path: Absolute path to the project root directory
         """
-        self.root_path = Path(root_path).resolve()
+        # Deferred so scaffold_lgrepignore (`lgrep init-ignore`) and other
+        # importers that never walk a tree do not pay for pathspec.
+        import pathspec
 
-        # Initialize gitignore matchers
-        self.gitignore_match = None
-        self.lgrepignore_match = None
-
-        gitignore_path = self.root_path / ".gitignore"
-        if gitignore_path.exists():
-            self.gitignore_match = gitignorefile.parse(str(gitignore_path))
-            log.debug("gitignore_loaded", path=str(gitignore_path))
-
-        lgrepignore_path = self.root_path / ".lgrepignore"
-        if lgrepignore_path.exists():
-            self.lgrepignore_match = gitignorefile.parse(str(lgrepignore_path))
-            log.debug("lgrepignore_loaded", path=str(lgrepignore_path))
+        self.root_path = Path(root_path).resolve()
+        self._root_str = str(self.root_path)
+        self._root_prefix = os.path.join(self._root_str, "")
+
+        # Compiled ignore rules, one spec per file. The files stay separate so a
+        # negation in one cannot re-include a path the other ignores.
+        self.ignore_specs: list[pathspec.PathSpec] = []
+        for filename, event in (
+            (".gitignore", "gitignore_loaded"),
+            (".lgrepignore", "lgrepignore_loaded"),
+        ):
+            ignore_path = self.root_path / filename
+            if ignore_path.is_file():
+                try:
+                    with ignore_path.open(encoding="utf-8", errors="replace") as f:
+                        self.ignore_specs.append(
+                            pathspec.GitIgnoreSpec.from_lines(f, backend=_IGNORE_BACKEND)
+                        )
+                    log.debug(event, path=str(ignore_path))
+                except OSError as e:
+                    log.warning("ignore_file_read_failed", path=str(ignore_path), error=str(e))
+
+        # Ignore-rule verdicts per root-relative directory ("pkg/sub/"). Git
+        # cannot re-include anything below an excluded directory, so a cached
+        # True answers every descendant without matching it.
+        self._dir_ignore_cache: dict[str, bool] = {}
 
         log.info("file_discovery_initialized", root=str(self.root_path))
 
-    def is_ignored(self, path: str | Path) -> bool:
-        """Check if a path is ignored by any rules.
-
-        Applies security checks first (path traversal, symlinks, secrets,
-        binary, size), then gitignore/lgrepignore rules.
-
-        Args:
-            path: Absolute or relative path to check
+    def _match_ignore_rules(self, rel_paths: list[str]) -> set[str]:
+        """Return the subset of root-relative POSIX paths matched by ignore rules.
 
-        Returns:
-            True if the path should be ignored
+        Directory paths must carry a trailing ``/`` so directory-only patterns
+        (``build/``) apply. All paths are matched in one call per spec.
+        """
+        if not self.ignore_specs or not rel_paths:
+            return set()
+        matched: set[str] = set()
+        for spec in self.ignore_specs:
+            matched.update(spec.match_files(rel_paths))
+        return matched
+
+    def _cache_dir_verdict(self, rel_dir: str, ignored: bool) -> None:
+        """Record an ignore-rule verdict for a directory (``rel_dir`` ends in ``/``)."""
+        if len(self._dir_ignore_cache) >= _DIR_IGNORE_CACHE_MAX:
+            self._dir_ignore_cache.clear()
+        self._dir_ignore_cache[rel_dir] = ignored
+
+    def _dir_rule_ignored(self, rel_dir: str) -> bool:
+        """Return True if ignore rules exclude ``rel_dir`` or any of its parents."""
+        cached = self._dir_ignore_cache.get(rel_dir)
+        if cached is None:
+            parent = rel_dir[:-1].rpartition("/")[0]
+            cached = (bool(parent) and self._dir_rule_ignored(parent + "/")) or bool(
+                self._match_ignore_rules([rel_dir])
+            )
+            self._cache_dir_verdict(rel_dir, cached)
+        return cached
+
+    def _relative_posix(self, abs_str: str) -> str | None:
+        """Return the root-relative POSIX form of a resolved path string.
+
+        Returns ``""`` for the root itself and None for paths outside it.
+        """
+        if abs_str == self._root_str:
+            return ""
+        if not abs_str.startswith(self._root_prefix):
+            return None
+        rel = abs_str[len(self._root_prefix) :]
+        return rel if os.sep == "/" else rel.replace(os.sep, "/")
+
+    def _rejected_by_checks(self, abs_path: Path, rel: str | None, path: str) -> bool:
+        """Apply the security and skip-directory checks to a resolved path.
+
+        Covers everything in ``is_ignored`` except the gitignore/lgrepignore
+        rules, which ``find_files`` evaluates in per-directory batches.
+        ``rel`` is the result of ``_relative_posix`` for ``abs_path``.
         """
-        path = Path(path)
-
-        # Resolve to absolute for security checks — always resolve to eliminate
-        # any .. components that could escape the root.
-        abs_path = (self.root_path / path).resolve() if not path.is_absolute() else path.resolve()
-
         # 1. Path traversal: reject anything outside root
-        try:
-            abs_path.relative_to(self.root_path)
-        except ValueError:
-            log.debug("security_path_traversal_rejected", path=str(path))
+        if rel is None:
+            log.debug("security_path_traversal_rejected", path=path)
             return True
 
         # 2. Symlink escape: reject symlinks that resolve outside root
         if abs_path.is_symlink() and _resolves_outside_root(abs_path, self.root_path):
-            log.debug("security_symlink_escape_rejected", path=str(path))
+            log.debug("security_symlink_escape_rejected", path=path)
             return True
 
         # 3. Secret file detection
         if _is_secret_file(abs_path):
-            log.debug("security_secret_file_rejected", path=str(path))
+            log.debug("security_secret_file_rejected", path=path)
             return True
 
-        # 4. Skip directory names
+        # 4. Skip directory names (and the legacy .git guard)
+        parts = rel.split("/") if rel else []
+        if ".git" in parts:
+            return True
         if abs_path.is_dir():
             if abs_path.name in _SKIP_DIRS:
                 return True
-        else:
-            # Check if any parent directory is in the skip list
-            try:
-                rel = abs_path.relative_to(self.root_path)
-                if any(part in _SKIP_DIRS for part in rel.parts[:-1]):
-                    return True
-            except ValueError:
-                return True
+        elif any(part in _SKIP_DIRS for part in parts[:-1]):
+            return True
 
         # 5. Binary file detection (only for files, not dirs)
         if abs_path.is_file() and not abs_path.is_symlink():
             if _is_binary_file(abs_path):
-                log.debug("security_binary_file_rejected", path=str(path))
+                log.debug("security_binary_file_rejected", path=path)
                 return True
 
             # 6. File size cap
             if _is_oversized(abs_path):
-                log.debug("security_oversized_file_rejected", path=str(path))
+                log.debug("security_oversized_file_rejected", path=path)
                 return True
 
-        # 7. Gitignore rules
-        str_path = str(abs_path)
-        if self.gitignore_match and self.gitignore_match(str_path):
+        return False
+
+    def is_ignored(self, path: str | Path) -> bool:
+        """Check if a path is ignored by any rules.
+
+        Applies security checks first (path traversal, symlinks, secrets,
+        binary, size), then gitignore/lgrepignore rules.
+
+        Args:
+            path: Absolute or relative path to check
+
+        Returns:
+            True if the path should be ignored
+        """
+        return self.is_ignored_str(os.fspath(path))
+
+    def is_ignored_str(self, str_path: str) -> bool:
+        """String-path variant of :meth:`is_ignored`.
+
+        Resolves and relativizes with ``os.path`` string operations against
+        the cached root prefix, so callers that already hold path strings
+        (e.g. watcher events) skip ``Path`` construction and ``relative_to``.
+        """
+        # Always resolve to eliminate any .. components that could escape
+        # the root. Absolute inputs replace the root in the join.
+        abs_str = os.path.realpath(os.path.join(self._root_str, str_path))
+        rel = self._relative_posix(abs_str)
+
+        if self._rejected_by_checks(Path(abs_str), rel, str_path):
             return True
-        if self.lgrepignore_match and self.lgrepignore_match(str_path):
+
+        # 7. Gitignore rules — directories (and a file's parent chain) are
+        # answered from the per-directory cache.
+        if not rel or not self.ignore_specs:
+            return False
+        if os.path.isdir(abs_str):
+            return self._dir_rule_ignored(rel + "/")
+        parent = rel.rpartition("/")[0]
+        if parent and self._dir_rule_ignored(parent + "/"):
+            return True
+        return bool(self._match_ignore_rules([rel]))
+
+    def _entry_rejected(self, entry: os.DirEntry[str]) -> bool:
+        """Apply the ``_rejected_by_checks`` rules to a scandir entry.
+
+        Uses the type and size information ``os.scandir`` already cached on
+        the entry instead of re-stat-ing a ``Path``. Regular entries reached by
+        the walk are inside the root by construction, so only symlinks need the
+        full resolve-based checks.
+        """
+        if entry.is_symlink():
+            resolved = os.path.realpath(entry.path)
+            return self._rejected_by_checks(
+                Path(resolved), self._relative_posix(resolved), entry.path
+            )
+
+        name = entry.name
+        if name in _SECRET_FILENAMES or name.endswith(_SECRET_SUFFIXES):
+            log.debug("security_secret_file_rejected", path=entry.path)
+            return True
+        if any(name.startswith(prefix) for prefix in _SECRET_PREFIXES):
+            log.debug("security_secret_file_rejected", path=entry.path)
             return True
 
-        # 8. Legacy: always ignore .git directory parts
         try:
-            rel = abs_path.relative_to(self.root_path)
-            if ".git" in rel.parts:
+            if entry.is_dir(follow_symlinks=False):
+                return name == ".git" or name in _SKIP_DIRS
+            if not entry.is_file(follow_symlinks=False):
+                return False
+            if entry.stat(follow_symlinks=False).st_size > MAX_FILE_SIZE_BYTES:
+                log.debug("security_oversized_file_rejected", path=entry.path)
                 return True
-        except ValueError:
+        except OSError:
+            return True  # Unreadable entries are excluded
+        if _is_binary_file(entry.path):
+            log.debug("security_binary_file_rejected", path=entry.path)
             return True
-
         return False
 
     def find_files(self) -> Iterator[Path]:
         """Iterate over all non-ignored files in the project.
 
+        Walks the tree with ``os.scandir`` in the same top-down, depth-first
+        order as ``os.walk``. Ignore rules are matched once per directory for
+        all of its entries; the remaining per-entry checks only run on entries
+        the rules did not already exclude and reuse each ``DirEntry``'s cached
+        type information. Symlinked directories are never descended into.
+
         Yields:
             Absolute paths to discovered files
         """
-        for root, dirs, files in os.walk(self.root_path, followlinks=False):
-            root_path = Path(root)
-
-            # Filter directories in-place to prevent os.walk from entering them
-            orig_dirs = list(dirs)
-            dirs[:] = [d for d in dirs if not self.is_ignored(root_path / d)]
-
-            if len(dirs) < len(orig_dirs):
-                ignored = set(orig_dirs) - set(dirs)
-                log.debug("skipping_directories", root=str(root_path), ignored=list(ignored))
-
-            for file in files:
-                file_path = root_path / file
-                if not self.is_ignored(file_path):
-                    yield file_path
+        stack: deque[tuple[str, str]] = deque([(self._root_str, "")])
+        while stack:
+            dir_path, prefix = stack.pop()
+            try:
+                with os.scandir(dir_path) as it:
+                    entries = list(it)
+            except OSError as e:
+                log.debug("scandir_failed", path=dir_path, error=str(e))
+                continue
+
+            dir_entries: list[os.DirEntry[str]] = []
+            file_entries: list[os.DirEntry[str]] = []
+            ignored_dirs = []
+            for entry in entries:
+                # Classify like os.walk: symlinks to directories count as
+                # directories (never yielded) but are not descended into.
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if not is_dir:
+                    file_entries.append(entry)
+                elif entry.name in _SKIP_DIRS and not entry.is_symlink():
+                    # Pruned by name alone, before any ignore-rule matching.
+                    ignored_dirs.append(entry.name)
+                else:
+                    dir_entries.append(entry)
+
+            rule_ignored = self._match_ignore_rules(
+                [f"{prefix}{e.name}/" for e in dir_entries]
+                + [prefix + e.name for e in file_entries]
+            )
+
+            subdirs = []
+            for entry in dir_entries:
+                rel_dir = f"{prefix}{entry.name}/"
+                if self.ignore_specs:
+                    self._cache_dir_verdict(rel_dir, rel_dir in rule_ignored)
+                if rel_dir in rule_ignored or self._entry_rejected(entry):
+                    ignored_dirs.append(entry.name)
+                elif not entry.is_symlink():
+                    subdirs.append((entry.path, rel_dir))
+            if ignored_dirs:
+                log.debug("skipping_directories", root=dir_path, ignored=ignored_dirs)
+
+            skipped = 0
+            for entry in file_entries:
+                if prefix + entry.name in rule_ignored or self._entry_rejected(entry):
+                    skipped += 1
                 else:
-                    log.debug("skipping_file", path=str(file_path))
+                    yield Path(entry.path)
+            if skipped:
+                log.debug("skipping_files", root=dir_path, count=skipped)
+
+            # Push in reverse so subdirectories are visited in listing order.
+            stack.extend(reversed(subdirs))
@@ -6,10 +6,16 @@ Uses voyage-code-3 model for code-optimized embeddings.
 from __future__ import annotations
 
 import asyncio
+import operator
 import os
 import random
+import threading
 import time
+from bisect import bisect_right
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
+from itertools import accumulate, chain, repeat
 from typing import TYPE_CHECKING
 
 import structlog
@@ -18,29 +24,197 @@ import voyageai
 from lgrep.exceptions import OperationCancelled
 
 if TYPE_CHECKING:
-    import threading
+    from collections.abc import Callable
+
+    from lgrep.storage.embedding_cache import EmbeddingCache
 
 log = structlog.get_logger()
 
 # Voyage Code 3 specifications
 MODEL_NAME = "voyage-code-3"
 DEFAULT_DIMENSIONS = 1024  # Matryoshka: 256-2048
+# Matryoshka widths Voyage accepts as output_dimension. Truncated vectors keep
+# most of the retrieval signal at a fraction of the payload and index size.
+OUTPUT_DIMENSIONS = (256, 512, 1024, 2048)
 MAX_BATCH_SIZE = 128
-MAX_BATCH_TOKENS = 100_000  # Voyage limit is 120k; use 100k for safety margin
+MAX_BATCH_TOKENS = 118_000  # Voyage limit is 120k; hard ceiling for the adaptive budget
 MAX_RETRIES = 5
 BASE_DELAY = 1.0
 
+# Concurrent document batches per embed_documents call. The Voyage SDK is
+# blocking, so batches are dispatched from a small thread pool; each of the
+# first wave's submissions is staggered by a random delay of up to
+# SUBMIT_JITTER_S to avoid a burst of simultaneous requests (and 429s).
+DEFAULT_MAX_IN_FLIGHT = 4
+SUBMIT_JITTER_S = 0.05
+
+# Adaptive per-batch token budget (AIMD): start under the ceiling, grow by
+# TOKEN_BUDGET_GROWTH after TOKEN_BUDGET_GROWTH_AFTER consecutive successful
+# batches, and halve (down to MIN_BATCH_TOKENS) on a token-limit rejection.
+# The len/4 estimate is only approximate, so the server's verdict steers it.
+INITIAL_BATCH_TOKENS = 80_000
+MIN_BATCH_TOKENS = 10_000
+TOKEN_BUDGET_GROWTH = 1.1
+TOKEN_BUDGET_GROWTH_AFTER = 10
+
 # Query-specific retry budget: interactive queries should fail fast
 # rather than blocking for 30+ seconds of retries.
 QUERY_MAX_RETRIES = 2
 QUERY_BASE_DELAY = 0.5
 
+# Recent query embeddings kept in memory (~4 KB each at 1024 dims), so agents
+# repeating a search skip both the API round-trip and the disk cache.
+QUERY_CACHE_SIZE = 1024
+
+# Distinct queries arriving within a short window share one API request, so
+# concurrent searches pay one round-trip instead of one each.
+DEFAULT_QUERY_BATCH_SIZE = 32
+DEFAULT_QUERY_BATCH_WAIT_MS = 5.0
+# Query batches run on their own small pool so an interactive search never
+# waits behind unrelated work on the loop's default executor.
+QUERY_MAX_WORKERS = 4
+
+# Client-side admission control, sized to Voyage's tier-1 limits for
+# voyage-code-3. Batches wait for capacity instead of tripping 429s and
+# sleeping through exponential backoff.
+VOYAGE_TOKENS_PER_MINUTE = 3_000_000
+VOYAGE_REQUESTS_PER_MINUTE = 2_000
+
+# Vector element types requested from Voyage. "int8" values arrive as small
+# integers (a quarter of the float payload on the wire) and are stored as
+# float32 in LanceDB, whose cosine index is scale-invariant.
+OUTPUT_DTYPES = ("float", "int8")
+DEFAULT_OUTPUT_DTYPE = "float"
+
 # Voyage Code 3 pricing: $0.18 per 1M tokens
 COST_PER_MILLION_TOKENS = 0.18
 COST_THRESHOLD_5 = 5.0
 COST_THRESHOLD_10 = 10.0
 
 
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously from a monotonic clock.
+
+    Callers reserve capacity up front (the balance may go negative) and then
+    sleep off their share of the debt, so concurrent dispatcher threads are
+    admitted in order without polling.
+    """
+
+    def __init__(
+        self,
+        rate_per_s: float,
+        burst: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] | None = None,
+    ) -> None:
+        """Create a full bucket.
+
+        Args:
+            rate_per_s: Refill rate in units per second
+            burst: Bucket capacity; larger requests are clamped to it
+            clock: Monotonic time source (injectable for tests)
+            sleep: Blocking sleep used when no cancel event is given
+                (defaults to time.sleep)
+        """
+        self.rate_per_s = rate_per_s
+        self.burst = burst
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = burst
+        # Refill accrues from here; pause() moves it into the future.
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float, cancel_event: threading.Event | None = None) -> float:
+        """Reserve ``amount`` units, blocking until they have accrued.
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            OperationCancelled: If cancel_event is set while waiting
+        """
+        with self._lock:
+            now = self._clock()
+            if now > self._updated:
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated) * self.rate_per_s
+                )
+                self._updated = now
+            self._tokens -= min(amount, self.burst)
+            wait = self._updated - now + max(0.0, -self._tokens) / self.rate_per_s
+        if wait <= 0:
+            return 0.0
+        if cancel_event is not None:
+            if cancel_event.wait(timeout=wait):
+                raise OperationCancelled("embed rate limit wait cancelled")
+        elif self._sleep is not None:
+            self._sleep(wait)
+        else:
+            time.sleep(wait)
+        return wait
+
+    def pause(self, seconds: float) -> None:
+        """Drain the bucket and admit nothing for ``seconds`` (a 429 Retry-After)."""
+        with self._lock:
+            self._tokens = min(self._tokens, 0.0)
+            self._updated = max(self._updated, self._clock() + seconds)
+
+
+def _int_from_env(name: str, default: int) -> int:
+    raw = os.environ.get(name)
+    if not raw:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        return default
+
+
+def _float_from_env(name: str, default: float) -> float:
+    raw = os.environ.get(name)
+    if not raw:
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        return default
+
+
+def _pack_batches(texts: list[str], batch_size: int, token_budget: int) -> list[list[str]]:
+    """Split ``texts`` into consecutive batches of at most ``batch_size`` items.
+
+    A batch also stays within ``token_budget`` estimated tokens (``len // 4``
+    per text, as in ``VoyageEmbedder._estimate_tokens``) unless a single text
+    exceeds it alone. Estimates are prefix-summed by C-level iterators and
+    each batch end is found by bisection, so the Python work is per batch
+    rather than per text.
+    """
+    # Common case (one file's chunks): everything fits in a single call, so
+    # skip building the prefix sums. sum(len) // 4 bounds the per-text sum.
+    if 0 < len(texts) <= batch_size and sum(map(len, texts)) // 4 <= token_budget:
+        return [texts]
+    prefix = [0, *accumulate(map(operator.floordiv, map(len, texts), repeat(4)))]
+    batches: list[list[str]] = []
+    start, n = 0, len(texts)
+    while start < n:
+        end = bisect_right(prefix, prefix[start] + token_budget, start + 1) - 1
+        end = min(max(end, start + 1), start + batch_size, n)
+        batches.append(texts[start:end])
+        start = end
+    return batches
+
+
+def _retry_after_seconds(error: Exception) -> float | None:
+    """Return the Retry-After delay of a rate-limit error, if it carries one."""
+    headers = getattr(error, "headers", None) or {}
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
 @dataclass
 class EmbeddingResult:
     """Result from embedding operation."""
@@ -57,22 +231,100 @@ class VoyageEmbedder:
     Includes retry logic with exponential backoff and batching.
     """
 
-    def __init__(self, api_key: str | None = None) -> None:
+    def __init__(
+        self,
+        api_key: str | None = None,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        cache: EmbeddingCache | None = None,
+        tokens_per_minute: int = VOYAGE_TOKENS_PER_MINUTE,
+        requests_per_minute: int = VOYAGE_REQUESTS_PER_MINUTE,
+        output_dtype: str | None = None,
+        output_dimension: int | None = None,
+    ) -> None:
         """Initialize the Voyage client.
 
         Args:
             api_key: Voyage API key. If not provided, uses VOYAGE_API_KEY env var.
+            max_in_flight: Max document batches embedded concurrently
+                (1 disables concurrency).
+            cache: Optional persistent embedding cache consulted before every
+                API call; only misses are sent to Voyage.
+            tokens_per_minute: Voyage token rate limit document batches are
+                shaped to
+            requests_per_minute: Voyage request rate limit document batches
+                are shaped to
+            output_dtype: Vector element type requested from Voyage ("float"
+                or "int8"). Defaults to the LGREP_EMBED_DTYPE env var, then
+                "float". Changing it requires rebuilding existing indexes.
+            output_dimension: Embedding width requested from Voyage (256,
+                512, 1024 or 2048). Defaults to the LGREP_EMBED_DIM env var,
+                then DEFAULT_DIMENSIONS. Searching an index built at another
+                width raises DimensionMismatchError; the next full index run
+                rebuilds it at this width.
         """
         self.api_key = api_key or os.environ.get("VOYAGE_API_KEY")
         if not self.api_key:
             raise ValueError("Voyage API key required. Set VOYAGE_API_KEY env var or pass api_key.")
 
+        dtype = (
+            (output_dtype or os.environ.get("LGREP_EMBED_DTYPE") or DEFAULT_OUTPUT_DTYPE)
+            .strip()
+            .lower()
+        )
+        if dtype not in OUTPUT_DTYPES:
+            raise ValueError(f"Unsupported output dtype {dtype!r}; expected one of {OUTPUT_DTYPES}")
+        dimension = output_dimension or _int_from_env("LGREP_EMBED_DIM", DEFAULT_DIMENSIONS)
+        if dimension not in OUTPUT_DIMENSIONS:
+            raise ValueError(
+                f"Unsupported output dimension {dimension}; expected one of {OUTPUT_DIMENSIONS}"
+            )
+
         self.client = voyageai.Client(api_key=self.api_key)
         self.model = MODEL_NAME
+        self.output_dtype = dtype
+        self.output_dimension = dimension
+        # Options beyond the API defaults, forwarded on every embed call.
+        self._embed_options: dict[str, str | int] = {}
+        if self.output_dtype != DEFAULT_OUTPUT_DTYPE:
+            self._embed_options["output_dtype"] = self.output_dtype
+        if self.output_dimension != DEFAULT_DIMENSIONS:
+            self._embed_options["output_dimension"] = self.output_dimension
+        # Persistent cache namespace: vectors of different dtypes or widths
+        # never mix.
+        self._cache_model = ":".join(map(str, [self.model, *self._embed_options.values()]))
+        self.max_in_flight = max(1, max_in_flight)
+        self.cache = cache
+        self._token_rate = TokenBucket(tokens_per_minute / 60, tokens_per_minute)
+        self._request_rate = TokenBucket(requests_per_minute / 60, requests_per_minute)
+        self._query_cache: OrderedDict[str, list[float]] = OrderedDict()
+        self._query_cache_lock = threading.Lock()
+        self._inflight_queries: dict[str, asyncio.Future[list[float]]] = {}
+        self.query_batch_size = max(1, _int_from_env("LGREP_EMBED_BATCH", DEFAULT_QUERY_BATCH_SIZE))
+        self.query_batch_wait_s = (
+            max(0.0, _float_from_env("LGREP_EMBED_WAIT_MS", DEFAULT_QUERY_BATCH_WAIT_MS)) / 1000
+        )
+        self._pending_queries: list[tuple[str, asyncio.Future[list[float]]]] = []
+        self._query_flush: asyncio.TimerHandle | None = None
+        self._query_batch_tasks: set[asyncio.Task[None]] = set()
+        self._query_executor = ThreadPoolExecutor(
+            max_workers=QUERY_MAX_WORKERS, thread_name_prefix="lgrep-embed-query"
+        )
+        self.batch_token_budget = INITIAL_BATCH_TOKENS
+        self._budget_successes = 0
+        self._budget_lock = threading.Lock()
         self.total_tokens_used = 0
         self.cost_warning_5_fired = False
         self.cost_warning_10_fired = False
-        log.info("voyage_client_initialized", model=self.model)
+        log.info(
+            "voyage_client_initialized",
+            model=self.model,
+            output_dtype=self.output_dtype,
+            output_dimension=self.output_dimension,
+        )
+
+    def close(self) -> None:
+        """Release the query worker threads; pending query batches are dropped."""
+        self._query_executor.shutdown(wait=False, cancel_futures=True)
 
     @property
     def estimated_cost_usd(self) -> float:
@@ -99,6 +351,19 @@ class VoyageEmbedder:
                 total_tokens=self.total_tokens_used,
             )
 
+    def _call_embed(self, texts: list[str], input_type: str) -> tuple[list[list[float]], int]:
+        """Make one Voyage embed call, returning (float vectors, token usage)."""
+        result = self.client.embed(
+            texts=texts,
+            model=self.model,
+            input_type=input_type,
+            **self._embed_options,
+        )
+        embeddings = result.embeddings
+        if self.output_dtype == "int8":
+            embeddings = [list(map(float, vector)) for vector in embeddings]
+        return embeddings, result.total_tokens
+
     def _embed_batch_with_retry(
         self,
         batch: list[str],
@@ -121,19 +386,24 @@ class VoyageEmbedder:
             Exception: After MAX_RETRIES failed attempts
             OperationCancelled: If cancel_event is set
         """
+        estimated_tokens = sum(map(self._estimate_tokens, batch))
         for attempt in range(MAX_RETRIES):
             if cancel_event is not None and cancel_event.is_set():
                 raise OperationCancelled("embed batch cancelled before attempt")
+            throttled = self._request_rate.acquire(1, cancel_event)
+            throttled += self._token_rate.acquire(estimated_tokens, cancel_event)
+            if throttled:
+                log.debug("voyage_batch_throttled", waited_s=round(throttled, 3))
             try:
-                result = self.client.embed(
-                    texts=batch,
-                    model=self.model,
-                    input_type=input_type,
-                )
-                return result.embeddings, result.total_tokens
+                embeddings, tokens = self._call_embed(batch, input_type)
+                self._record_batch_success()
+                return embeddings, tokens
             except Exception as e:
                 error_msg = str(e)
 
+                if "max allowed tokens" in error_msg:
+                    self._shrink_token_budget()
+
                 # Token limit exceeded - split batch and retry immediately
                 if "max allowed tokens" in error_msg and len(batch) > 1:
                     mid = len(batch) // 2
@@ -158,6 +428,23 @@ class VoyageEmbedder:
                     )
                     raise
 
+                retry_after = (
+                    _retry_after_seconds(e)
+                    if isinstance(e, voyageai.error.RateLimitError)
+                    else None
+                )
+                if retry_after is not None:
+                    # The buckets hold every dispatcher thread back until the
+                    # server's window reopens; the next attempt waits there.
+                    self._request_rate.pause(retry_after)
+                    self._token_rate.pause(retry_after)
+                    log.warning(
+                        "voyage_batch_rate_limited",
+                        attempt=attempt + 1,
+                        retry_after=retry_after,
+                    )
+                    continue
+
                 delay = BASE_DELAY * (2**attempt) + random.uniform(0, 1)
                 log.warning(
                     "voyage_batch_failed_retrying",
@@ -174,6 +461,25 @@ class VoyageEmbedder:
         # Unreachable: the loop always returns or raises on the last attempt
         raise RuntimeError("Unexpected end of retry loop")  # pragma: no cover
 
+    def _record_batch_success(self) -> None:
+        """Additive increase: grow the batch token budget after a success streak."""
+        with self._budget_lock:
+            self._budget_successes += 1
+            if self._budget_successes < TOKEN_BUDGET_GROWTH_AFTER:
+                return
+            self._budget_successes = 0
+            grown = min(MAX_BATCH_TOKENS, int(self.batch_token_budget * TOKEN_BUDGET_GROWTH))
+            if grown != self.batch_token_budget:
+                self.batch_token_budget = grown
+                log.debug("voyage_token_budget_grown", budget=grown)
+
+    def _shrink_token_budget(self) -> None:
+        """Multiplicative decrease: halve the budget after a token-limit rejection."""
+        with self._budget_lock:
+            self._budget_successes = 0
+            self.batch_token_budget = max(MIN_BATCH_TOKENS, self.batch_token_budget // 2)
+            log.warning("voyage_token_budget_shrunk", budget=self.batch_token_budget)
+
     def _embed_query_with_fast_retry(self, text: str) -> tuple[list[float], int]:
         """Embed a single query with reduced retry budget for interactive use.
 
@@ -192,12 +498,8 @@ class VoyageEmbedder:
         """
         for attempt in range(QUERY_MAX_RETRIES):
             try:
-                result = self.client.embed(
-                    texts=[text],
-                    model=self.model,
-                    input_type="query",
-                )
-                return result.embeddings[0], result.total_tokens
+                embeddings, tokens = self._call_embed([text], "query")
+                return embeddings[0], tokens
             except Exception as e:
                 error_msg = str(e)
 
@@ -231,15 +533,20 @@ class VoyageEmbedder:
         texts: list[str],
         batch_size: int = MAX_BATCH_SIZE,
         cancel_event: threading.Event | None = None,
+        max_in_flight: int | None = None,
     ) -> EmbeddingResult:
         """Embed a list of documents (code chunks) with retry logic.
 
         Uses token-aware batching to stay within Voyage's per-batch token limit.
+        Batches are sent up to ``max_in_flight`` at a time; embeddings are
+        returned in input order.
 
         Args:
             texts: List of text strings to embed
             batch_size: Max number of texts per API call (max 128)
             cancel_event: Optional threading.Event for cooperative cancellation
+            max_in_flight: Lower cap on concurrent batches for this call, for
+                callers that run several calls at once
 
         Returns:
             EmbeddingResult with embeddings and token usage
@@ -250,27 +557,57 @@ class VoyageEmbedder:
         if not texts:
             return EmbeddingResult(embeddings=[], token_usage=0, model=self.model)
 
-        all_embeddings: list[list[float]] = []
-        total_tokens = 0
+        in_flight = self.max_in_flight
+        if max_in_flight is not None:
+            in_flight = max(1, min(in_flight, max_in_flight))
+        if self.cache is not None:
+            return self._embed_documents_cached(
+                self.cache, texts, batch_size, cancel_event, in_flight
+            )
+        return self._embed_documents_uncached(texts, batch_size, cancel_event, in_flight)
 
-        # Build token-aware batches
-        batches: list[list[str]] = []
-        current_batch: list[str] = []
-        current_tokens = 0
-
-        for text in texts:
-            est = self._estimate_tokens(text)
-            if current_batch and (
-                len(current_batch) >= batch_size or current_tokens + est > MAX_BATCH_TOKENS
-            ):
-                batches.append(current_batch)
-                current_batch = []
-                current_tokens = 0
-            current_batch.append(text)
-            current_tokens += est
-
-        if current_batch:
-            batches.append(current_batch)
+    def _embed_documents_cached(
+        self,
+        cache: EmbeddingCache,
+        texts: list[str],
+        batch_size: int,
+        cancel_event: threading.Event | None,
+        max_in_flight: int,
+    ) -> EmbeddingResult:
+        """Serve ``texts`` from the cache, embedding only the distinct misses."""
+        keys = cache.keys_for(self._cache_model, "document", texts)
+        vectors = cache.get_many(keys)
+        missing = {key: text for key, text in zip(keys, texts, strict=True) if key not in vectors}
+        token_usage = 0
+        if missing:
+            fresh = self._embed_documents_uncached(
+                list(missing.values()), batch_size, cancel_event, max_in_flight
+            )
+            new_vectors = dict(zip(missing, fresh.embeddings, strict=True))
+            cache.put_many(new_vectors.items())
+            vectors.update(new_vectors)
+            token_usage = fresh.token_usage
+        log.info(
+            "voyage_embed_cache",
+            num_texts=len(texts),
+            cache_hits=len(texts) - sum(key in missing for key in keys),
+            embedded=len(missing),
+        )
+        return EmbeddingResult(
+            embeddings=[vectors[key] for key in keys],
+            token_usage=token_usage,
+            model=self.model,
+        )
+
+    def _embed_documents_uncached(
+        self,
+        texts: list[str],
+        batch_size: int,
+        cancel_event: threading.Event | None,
+        max_in_flight: int,
+    ) -> EmbeddingResult:
+        """Embed ``texts`` through the Voyage API in token-aware batches."""
+        batches = _pack_batches(texts, batch_size, self.batch_token_budget)
 
         log.info(
             "voyage_embed_batching",
@@ -279,19 +616,7 @@ class VoyageEmbedder:
             batch_sizes=[len(b) for b in batches],
         )
 
-        for batch_num, batch in enumerate(batches, 1):
-            if cancel_event is not None and cancel_event.is_set():
-                raise OperationCancelled("embed_documents cancelled between batches")
-            log.debug(
-                "voyage_embed_batch",
-                batch_num=batch_num,
-                batch_size=len(batch),
-            )
-            embeddings, tokens = self._embed_batch_with_retry(
-                batch, "document", cancel_event=cancel_event
-            )
-            all_embeddings.extend(embeddings)
-            total_tokens += tokens
+        all_embeddings, total_tokens = self._dispatch_batches(batches, cancel_event, max_in_flight)
 
         self.total_tokens_used += total_tokens
         self._check_cost_thresholds()
@@ -309,6 +634,73 @@ class VoyageEmbedder:
             model=self.model,
         )
 
+    def _dispatch_batches(
+        self,
+        batches: list[list[str]],
+        cancel_event: threading.Event | None = None,
+        max_in_flight: int | None = None,
+    ) -> tuple[list[list[float]], int]:
+        """Embed document batches, up to ``max_in_flight`` at a time.
+
+        Embeddings are reassembled in input order regardless of completion
+        order. If any batch fails (or ``cancel_event`` is set), batches that
+        have not started are cancelled and the error propagates.
+
+        Returns:
+            Tuple of (embeddings, token_usage)
+
+        Raises:
+            OperationCancelled: If cancel_event is set before a batch is submitted
+        """
+        workers = min(max_in_flight or self.max_in_flight, len(batches))
+        if workers <= 1:
+            all_embeddings: list[list[float]] = []
+            total_tokens = 0
+            for batch_num, batch in enumerate(batches, 1):
+                if cancel_event is not None and cancel_event.is_set():
+                    raise OperationCancelled("embed_documents cancelled between batches")
+                log.debug("voyage_embed_batch", batch_num=batch_num, batch_size=len(batch))
+                embeddings, tokens = self._embed_batch_with_retry(
+                    batch, "document", cancel_event=cancel_event
+                )
+                all_embeddings.extend(embeddings)
+                total_tokens += tokens
+            return all_embeddings, total_tokens
+
+        results: list[list[list[float]]] = [[] for _ in batches]
+        total_tokens = 0
+        futures: dict[Future, int] = {}
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="lgrep-embed") as executor:
+            try:
+                for idx, batch in enumerate(batches):
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise OperationCancelled("embed_documents cancelled between batches")
+                    # Later submissions queue behind the pool, so only the
+                    # first wave needs staggering.
+                    if 0 < idx < workers:
+                        delay = random.uniform(0, SUBMIT_JITTER_S)
+                        if cancel_event is not None:
+                            if cancel_event.wait(timeout=delay):
+                                raise OperationCancelled(
+                                    "embed_documents cancelled between batches"
+                                )
+                        else:
+                            time.sleep(delay)
+                    log.debug("voyage_embed_batch", batch_num=idx + 1, batch_size=len(batch))
+                    future = executor.submit(
+                        self._embed_batch_with_retry, batch, "document", cancel_event=cancel_event
+                    )
+                    futures[future] = idx
+                for future in as_completed(futures):
+                    embeddings, tokens = future.result()
+                    results[futures[future]] = embeddings
+                    total_tokens += tokens
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+        return list(chain.from_iterable(results)), total_tokens
+
     def embed_query(self, query: str) -> list[float]:
         """Embed a search query with fast retry logic.
 
@@ -319,39 +711,77 @@ class VoyageEmbedder:
             query: Search query string
 
         Returns:
-            Embedding vector (1024 dimensions)
+            Embedding vector (``output_dimension`` wide)
         """
         log.debug("voyage_embed_query", query_len=len(query))
 
+        cached, key = self._cached_query(query)
+        if cached is not None:
+            return cached
         embedding, tokens = self._embed_query_with_fast_retry(query)
+        self._store_query(query, key, embedding)
         self.total_tokens_used += tokens
         self._check_cost_thresholds()
         log.debug("voyage_query_embedded", tokens=tokens)
         return embedding
 
-    async def _embed_query_with_fast_retry_async(self, text: str) -> tuple[list[float], int]:
-        """Async version of _embed_query_with_fast_retry using asyncio.sleep.
+    def _cached_query(self, query: str) -> tuple[list[float] | None, bytes | None]:
+        """Look a query up in memory, then in the persistent cache.
+
+        Returns:
+            (vector or None, persistent cache key or None)
+        """
+        with self._query_cache_lock:
+            vector = self._query_cache.get(query)
+            if vector is not None:
+                self._query_cache.move_to_end(query)
+                return vector, None
+        if self.cache is None:
+            return None, None
+        [key] = self.cache.keys_for(self._cache_model, "query", [query])
+        vector = self.cache.get_many([key]).get(key)
+        if vector is not None:
+            log.debug("voyage_query_cache_hit", query_len=len(query))
+            self._remember_query(query, vector)
+        return vector, key
+
+    def _remember_query(self, query: str, embedding: list[float]) -> None:
+        """Insert into the in-memory query LRU, evicting the oldest entry."""
+        with self._query_cache_lock:
+            self._query_cache[query] = embedding
+            self._query_cache.move_to_end(query)
+            if len(self._query_cache) > QUERY_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
+
+    def _store_query(self, query: str, key: bytes | None, embedding: list[float]) -> None:
+        """Record a freshly embedded query in memory and the persistent cache."""
+        self._remember_query(query, embedding)
+        if self.cache is not None and key is not None:
+            self.cache.put_many([(key, embedding)])
+
+    async def _embed_queries_with_fast_retry_async(
+        self, texts: list[str]
+    ) -> tuple[list[list[float]], int]:
+        """Async version of _embed_query_with_fast_retry for a query batch.
 
         Same retry logic as the sync path but uses asyncio.sleep instead of
-        time.sleep, so the event loop is not blocked during retries.
+        time.sleep, and runs the API call in a worker thread, so the event
+        loop is not blocked during the request or retries.
 
         Args:
-            text: Query text to embed
+            texts: Query texts to embed in one request
 
         Returns:
-            Tuple of (embedding_vector, token_usage)
+            Tuple of (embedding vectors in input order, token_usage)
 
         Raises:
             Exception: After QUERY_MAX_RETRIES failed attempts
         """
         for attempt in range(QUERY_MAX_RETRIES):
             try:
-                result = self.client.embed(
-                    texts=[text],
-                    model=self.model,
-                    input_type="query",
+                return await asyncio.get_running_loop().run_in_executor(
+                    self._query_executor, self._call_embed, texts, "query"
                 )
-                return result.embeddings[0], result.total_tokens
             except Exception as e:
                 error_msg = str(e)
 
@@ -386,12 +816,115 @@ class VoyageEmbedder:
             query: Search query string
 
         Returns:
-            Embedding vector (1024 dimensions)
+            Embedding vector (``output_dimension`` wide)
         """
         log.debug("voyage_embed_query_async", query_len=len(query))
 
-        embedding, tokens = await self._embed_query_with_fast_retry_async(query)
+        with self._query_cache_lock:
+            cached = self._query_cache.get(query)
+            if cached is not None:
+                self._query_cache.move_to_end(query)
+                return cached
+        # Identical queries arriving while one is in flight (agents retrying
+        # or fanning out) share its lookup and API call instead of issuing
+        # their own.
+        task = self._inflight_queries.get(query)
+        if task is None:
+            task = self._enqueue_query(query)
+            self._inflight_queries[query] = task
+            task.add_done_callback(lambda _: self._inflight_queries.pop(query, None))
+        else:
+            log.debug("voyage_query_joined_inflight", query_len=len(query))
+        return await asyncio.shield(task)
+
+    def _enqueue_query(self, query: str) -> asyncio.Future[list[float]]:
+        """Queue a query for the next batched lookup and API call.
+
+        The batch is sent once ``query_batch_size`` queries are waiting or
+        ``query_batch_wait_s`` after the first one arrived, whichever is first.
+        """
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[list[float]] = loop.create_future()
+        self._pending_queries.append((query, future))
+        if len(self._pending_queries) >= self.query_batch_size:
+            self._flush_query_batch()
+        elif self._query_flush is None:
+            self._query_flush = loop.call_later(self.query_batch_wait_s, self._flush_query_batch)
+        return future
+
+    def _flush_query_batch(self) -> None:
+        """Send every queued query in one background API call."""
+        if self._query_flush is not None:
+            self._query_flush.cancel()
+            self._query_flush = None
+        batch, self._pending_queries = self._pending_queries, []
+        if not batch:
+            return
+        task = asyncio.ensure_future(self._fetch_query_batch_async(batch))
+        # The loop only holds weak references to tasks.
+        self._query_batch_tasks.add(task)
+        task.add_done_callback(self._query_batch_tasks.discard)
+
+    def _lookup_persisted_queries(
+        self, queries: list[str]
+    ) -> tuple[dict[str, list[float]], dict[str, bytes]]:
+        """Read a query batch from the persistent cache.
+
+        Returns:
+            (vectors found, by query; cache key of every query)
+        """
+        if self.cache is None:
+            return {}, {}
+        keys = dict(
+            zip(queries, self.cache.keys_for(self._cache_model, "query", queries), strict=True)
+        )
+        stored = self.cache.get_many(list(keys.values()))
+        return {q: stored[k] for q, k in keys.items() if k in stored}, keys
+
+    async def _fetch_query_batch_async(
+        self, batch: list[tuple[str, asyncio.Future[list[float]]]]
+    ) -> None:
+        """Resolve a batch of queries from the persistent cache or the API.
+
+        SQLite work runs on the query pool: the cache lock is shared with
+        document batches being indexed, and waiting on it must not stall the
+        event loop.
+        """
+        loop = asyncio.get_running_loop()
+        queries = [query for query, _ in batch]
+        try:
+            persisted, keys = await loop.run_in_executor(
+                self._query_executor, self._lookup_persisted_queries, queries
+            )
+            misses = [query for query in queries if query not in persisted]
+            embeddings, tokens = (
+                await self._embed_queries_with_fast_retry_async(misses) if misses else ([], 0)
+            )
+            fresh = dict(zip(misses, embeddings, strict=True))
+            if self.cache is not None and fresh:
+                # One transaction for the whole batch, committed before the
+                # callers resume so a shutdown right after cannot lose it.
+                await loop.run_in_executor(
+                    self._query_executor,
+                    self.cache.put_many,
+                    [(keys[query], embedding) for query, embedding in fresh.items()],
+                )
+        except asyncio.CancelledError:
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for query, future in batch:
+            embedding = fresh[query] if query in fresh else persisted[query]
+            self._remember_query(query, embedding)
+            if not future.done():
+                future.set_result(embedding)
+        if persisted:
+            log.debug("voyage_query_cache_hit", hits=len(persisted))
         self.total_tokens_used += tokens
         self._check_cost_thresholds()
-        log.debug("voyage_query_embedded_async", tokens=tokens)
-        return embedding
+        log.debug("voyage_query_batch_embedded", batch_size=len(misses), tokens=tokens)
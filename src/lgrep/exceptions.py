@@ -24,3 +24,13 @@ class OperationCancelled(Exception):
     so a single slow file (or a long retry backoff) cannot hold the worker
     thread past cancellation.
     """
+
+
+class DimensionMismatchError(ValueError):
+    """Raised when a query vector's width differs from the stored index.
+
+    The index was built at another embedding width (``LGREP_EMBED_DIM``
+    changed since), so its vectors cannot be compared with the query.
+    Searches surface the message; only indexing rebuilds the table
+    (``ChunkStore.reset_dimension``).
+    """
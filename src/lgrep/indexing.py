@@ -7,10 +7,11 @@ from __future__ import annotations
 
 import hashlib
 import os
-import threading  # noqa: TC003  # used at runtime by cancel_event.is_set()
+import threading
 import time
-import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass
+from itertools import islice
 from pathlib import Path
 from typing import TYPE_CHECKING
 
@@ -18,17 +19,48 @@ import structlog
 
 from lgrep.chunking import CodeChunker
 from lgrep.discovery import FileDiscovery
+from lgrep.embeddings import MAX_BATCH_SIZE
 from lgrep.exceptions import OperationCancelled
-from lgrep.storage import CodeChunk
+from lgrep.storage import CodeChunk, chunk_model_for
 
 if TYPE_CHECKING:
     from collections.abc import Callable
 
+    from lgrep.chunking import ChunkInfo
     from lgrep.embeddings import VoyageEmbedder
     from lgrep.storage import ChunkStore
 
 log = structlog.get_logger()
 
+# Files modified this recently are hashed but not recorded in the stat cache:
+# a second write within the filesystem's timestamp granularity could keep the
+# same (mtime_ns, size) with different content (git's "racily clean" case).
+_RACY_MTIME_NS = 2_000_000_000
+
+# Files indexed concurrently within a window (LGREP_INDEX_WORKERS). Each file
+# is read, chunked, embedded and stored independently; embedding calls are
+# network-bound and the embedder's token buckets keep the aggregate request
+# rate within Voyage's limits.
+DEFAULT_INDEX_WORKERS = 8
+
+# Ceiling on concurrent Voyage requests from one index window. Each worker's
+# embed_documents call may dispatch several batches at once, so workers get
+# an equal share: workers x per-file batches in flight stays at or below this.
+MAX_EMBED_REQUESTS_IN_FLIGHT = 16
+
+# Changed files at least this large are hashed on _HASH_POOL while they are
+# chunked, instead of before; smaller files hash faster than a handoff.
+OVERLAP_HASH_MIN_BYTES = 256 * 1024
+_HASH_POOL = ThreadPoolExecutor(
+    max_workers=min(4, os.cpu_count() or 1), thread_name_prefix="lgrep-hash"
+)
+
+# index_all_batched: chunk texts buffered before a wave is embedded and stored
+# (bounds peak memory on huge repositories), and files handed to each
+# CodeChunker.chunk_files call (amortizes worker-process startup).
+MAX_BUFFERED_CHUNKS = 100_000
+BATCHED_CHUNK_FILES = 1024
+
 # Re-exported for backward compatibility: callers that do
 # `from lgrep.indexing import OperationCancelled` (lifecycle.py, v1 tests)
 # keep working after the class moved to lgrep.exceptions to break the
@@ -62,6 +94,16 @@ class IndexWindowResult:
     files_indexed: int = 0
 
 
+def _workers_from_env() -> int:
+    raw = os.environ.get("LGREP_INDEX_WORKERS")
+    if not raw:
+        return DEFAULT_INDEX_WORKERS
+    try:
+        return int(raw)
+    except ValueError:
+        return DEFAULT_INDEX_WORKERS
+
+
 class Indexer:
     """Coordinates the full indexing pipeline."""
 
@@ -72,6 +114,8 @@ class Indexer:
         embedder: VoyageEmbedder,
         chunk_size: int = 500,
         perf_counter: Callable[[], float] | None = None,
+        batch_size: int = MAX_BATCH_SIZE,
+        workers: int | None = None,
     ) -> None:
         """Initialize the indexer.
 
@@ -83,14 +127,35 @@ class Indexer:
             perf_counter: Optional monotonic clock callable. Defaults to
                 ``time.perf_counter`` so production keeps wall-clock behavior;
                 tests may inject a deterministic advancing clock.
+            batch_size: Max chunks per embedding API call, clamped to
+                ``1..MAX_BATCH_SIZE``.
+            workers: Files indexed concurrently per window. Defaults to
+                ``LGREP_INDEX_WORKERS`` (8); 1 indexes files one at a time on
+                the calling thread.
         """
         self.project_path = Path(project_path).resolve()
         self.storage = storage
         self.embedder = embedder
         self.chunker = CodeChunker(chunk_size=chunk_size)
+        self.batch_size = max(1, min(batch_size, MAX_BATCH_SIZE))
+        if workers is None:
+            workers = _workers_from_env()
+        self.workers = max(1, workers)
+        # Per-file batches in flight, so all workers together stay within
+        # MAX_EMBED_REQUESTS_IN_FLIGHT.
+        self._file_max_in_flight = max(1, MAX_EMBED_REQUESTS_IN_FLIGHT // self.workers)
+        # Serializes the delete+add pair of each file so concurrent workers
+        # never interleave writes for the same table version.
+        self._storage_lock = threading.Lock()
         self.discovery = FileDiscovery(self.project_path)
         self._dedup_enabled = bool(os.environ.get("LGREP_WORKTREE_DEDUP"))
         self._perf_counter = perf_counter or time.perf_counter
+        # Read and updated by index workers, _HASH_POOL and watcher batches.
+        self._file_stats: dict[str, tuple[int, int, str]] | None = None
+        self._file_stats_dirty = False
+        self._file_stats_lock = threading.Lock()
+        # Orders flushes so an older snapshot never overwrites a newer one.
+        self._file_stats_flush_lock = threading.Lock()
 
         log.info("indexer_initialized", project=str(self.project_path))
 
@@ -139,6 +204,135 @@ class Indexer:
 
         return status
 
+    def index_all_batched(
+        self,
+        cancel_event: threading.Event | None = None,
+        max_buffered_chunks: int = MAX_BUFFERED_CHUNKS,
+    ) -> IndexStatus:
+        """Index every pending file, coalescing chunks across files.
+
+        :meth:`index_all` embeds each file's chunks in their own request(s),
+        so a repository of many small files costs one round-trip per file.
+        This chunks files in groups and embeds the accumulated texts together,
+        letting the embedder pack full token-aware batches. Work is flushed in
+        waves of at most ``max_buffered_chunks`` texts. Each wave is embedded
+        and stored on a background thread while the next one is chunked, so
+        CPU-bound parsing overlaps network-bound embedding; at most two waves
+        are held in memory. There is no wall-clock budget, so it suits
+        one-shot indexing rather than daemon windows.
+
+        Args:
+            cancel_event: Optional cooperative-cancellation primitive, checked
+                before each chunking group, embed and storage step.
+            max_buffered_chunks: Chunk texts buffered before a wave is flushed
+
+        Returns:
+            IndexStatus with cumulative results.
+
+        Raises:
+            OperationCancelled: if ``cancel_event`` is set.
+        """
+        start_time = self._perf_counter()
+        status = IndexStatus()
+        self._match_embedding_width()
+        pending = self.compute_pending_files()
+        zero_chunk_files: list[str] = []
+        wave: list[tuple[str, str, list[ChunkInfo]]] = []
+        buffered = 0
+        # Single worker: waves are embedded and stored in order, one at a time.
+        flusher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lgrep-wave")
+        flushing: list[Future] = []
+
+        def flush(wave: list[tuple[str, str, list[ChunkInfo]]]) -> None:
+            if flushing:
+                flushing.pop().result()  # re-raises the previous wave's failure
+            flushing.append(flusher.submit(self._flush_batched_wave, wave, status, cancel_event))
+
+        log.info("batched_index_started", project=str(self.project_path), files=len(pending))
+
+        try:
+            for offset in range(0, len(pending), BATCHED_CHUNK_FILES):
+                if cancel_event is not None and cancel_event.is_set():
+                    raise OperationCancelled("index_all_batched cancelled before chunking")
+                group = pending[offset : offset + BATCHED_CHUNK_FILES]
+                paths = [self.project_path / rel_path for rel_path in group]
+                # Hash before chunking: a file edited in between is then
+                # stored under its older hash and re-indexed next time.
+                hashes = [self._compute_file_hash(p, r) for p, r in zip(paths, group, strict=True)]
+                results = self.chunker.chunk_files(paths)
+                for rel_path, file_hash, result in zip(group, hashes, results, strict=True):
+                    if result.error:
+                        log.warning("indexing_file_failed", file=rel_path, error=result.error)
+                        continue
+                    status.file_count += 1
+                    if not result.chunks:
+                        with self._storage_lock:
+                            self.storage.delete_by_file(rel_path)
+                        zero_chunk_files.append(rel_path)
+                        continue
+                    wave.append((rel_path, file_hash, result.chunks))
+                    buffered += len(result.chunks)
+                    if buffered >= max_buffered_chunks:
+                        flush(wave)
+                        wave, buffered = [], 0
+            flush(wave)
+            flushing.pop().result()
+        finally:
+            flusher.shutdown(wait=True, cancel_futures=True)
+            self.storage.prepare_hybrid_indexes()
+            if zero_chunk_files:
+                self.storage.add_zero_chunk_files(zero_chunk_files)
+            self._flush_file_stats()
+
+        status.duration_ms = (self._perf_counter() - start_time) * 1000
+        log.info(
+            "batched_index_complete",
+            files=status.file_count,
+            chunks=status.chunk_count,
+            tokens=status.total_tokens,
+            duration_ms=status.duration_ms,
+        )
+        return status
+
+    def _flush_batched_wave(
+        self,
+        wave: list[tuple[str, str, list[ChunkInfo]]],
+        status: IndexStatus,
+        cancel_event: threading.Event | None,
+    ) -> None:
+        """Embed one wave of ``(rel_path, file_hash, chunks)`` and store it."""
+        if not wave:
+            return
+        if cancel_event is not None and cancel_event.is_set():
+            raise OperationCancelled("index_all_batched cancelled before embed")
+        texts = [chunk.text for _, _, chunks in wave for chunk in chunks]
+        embed_result = self.embedder.embed_documents(
+            texts, batch_size=self.batch_size, cancel_event=cancel_event
+        )
+
+        if cancel_event is not None and cancel_event.is_set():
+            raise OperationCancelled("index_all_batched cancelled before storage")
+        vectors = iter(embed_result.embeddings)
+        code_chunks: list[CodeChunk] = []
+        for rel_path, file_hash, chunks in wave:
+            file_vectors = list(islice(vectors, len(chunks)))
+            code_chunks.extend(self._build_code_chunks(chunks, file_vectors, rel_path, file_hash))
+        # One delete and one append per wave keep LanceDB fragments large.
+        with self._storage_lock:
+            self.storage.delete_by_files([rel_path for rel_path, _, _ in wave])
+            self.storage.add_chunks(code_chunks)
+            for rel_path, _, _ in wave:
+                self.storage.remove_zero_chunk_file(rel_path)
+
+        status.chunk_count += len(code_chunks)
+        status.total_tokens += embed_result.token_usage
+        log.info(
+            "batched_wave_indexed",
+            files=len(wave),
+            chunks=len(code_chunks),
+            tokens=embed_result.token_usage,
+        )
+
     def index_window(
         self,
         cancel_event: threading.Event | None = None,
@@ -175,6 +369,7 @@ class Indexer:
         status = IndexStatus()
 
         if pending_files is None:
+            self._match_embedding_width()
             log.info("index_window_computing_pending", project=str(self.project_path))
             pending_files = self.compute_pending_files()
         else:
@@ -185,63 +380,93 @@ class Indexer:
         remaining_files = list(pending_files)
         processed = False
 
-        for rel_path in pending_files:
-            if cancel_event is not None and cancel_event.is_set():
-                log.info(
-                    "index_window_cancelled",
-                    project=str(self.project_path),
-                    files_indexed=len(indexed_this_window),
-                    remaining_files=len(remaining_files),
-                )
-                self.storage.prepare_hybrid_indexes()
-                if zero_chunk_this_window:
-                    self.storage.add_zero_chunk_files(zero_chunk_this_window)
-                raise OperationCancelled("index_window cancelled by cancel_event")
-
-            # After the first file, respect the wall budget.  The first file
-            # is always processed so a window never yields with zero progress.
-            if processed and (self._perf_counter() - start_time) > wall_budget_s:
-                log.warning(
-                    "index_window_wall_clock_exceeded",
-                    project=str(self.project_path),
-                    budget_s=wall_budget_s,
-                    files_indexed=len(indexed_this_window),
-                    remaining_files=len(remaining_files),
-                )
-                break
+        def over_budget() -> bool:
+            if (self._perf_counter() - start_time) <= wall_budget_s:
+                return False
+            log.warning(
+                "index_window_wall_clock_exceeded",
+                project=str(self.project_path),
+                budget_s=wall_budget_s,
+                files_indexed=len(indexed_this_window),
+                remaining_files=len(remaining_files),
+            )
+            return True
 
-            file_path = self.project_path / rel_path
-            try:
-                file_status = self.index_file(file_path, cancel_event=cancel_event)
-            except OperationCancelled:
-                self.storage.prepare_hybrid_indexes()
-                if zero_chunk_this_window:
-                    self.storage.add_zero_chunk_files(zero_chunk_this_window)
-                raise
-            status.file_count += file_status.file_count
-            status.chunk_count += file_status.chunk_count
-            status.total_tokens += file_status.total_tokens
-            indexed_this_window.append(rel_path)
-            remaining_files.remove(rel_path)
-            if file_status.chunk_count == 0:
-                zero_chunk_this_window.append(rel_path)
-            else:
-                self.storage.remove_zero_chunk_file(rel_path)
-            processed = True
-
-            if (self._perf_counter() - start_time) > wall_budget_s:
-                log.warning(
-                    "index_window_wall_clock_exceeded",
-                    project=str(self.project_path),
-                    budget_s=wall_budget_s,
-                    files_indexed=len(indexed_this_window),
-                    remaining_files=len(remaining_files),
-                )
-                break
+        workers = min(self.workers, max(1, len(pending_files)))
+        executor = (
+            ThreadPoolExecutor(max_workers=workers, thread_name_prefix="lgrep-index")
+            if workers > 1
+            else None
+        )
+        in_flight: dict[Future[IndexStatus], str] = {}
+        next_index = 0
+        cancelled = budget_exceeded = False
+        try:
+            while True:
+                # Keep up to ``workers`` files in flight. Cancellation and the
+                # wall budget are checked before starting each file; the first
+                # file is always started so a window never yields with zero
+                # progress. Once either trips, in-flight files are drained.
+                while (
+                    not (cancelled or budget_exceeded)
+                    and len(in_flight) < workers
+                    and next_index < len(pending_files)
+                ):
+                    if cancel_event is not None and cancel_event.is_set():
+                        cancelled = True
+                        break
+                    if (processed or in_flight) and over_budget():
+                        budget_exceeded = True
+                        break
+                    rel_path = pending_files[next_index]
+                    next_index += 1
+                    in_flight[self._start_index_file(executor, rel_path, cancel_event)] = rel_path
+                if not in_flight:
+                    break
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    rel_path = in_flight.pop(future)
+                    file_status = future.result()
+                    status.file_count += file_status.file_count
+                    status.chunk_count += file_status.chunk_count
+                    status.total_tokens += file_status.total_tokens
+                    indexed_this_window.append(rel_path)
+                    remaining_files.remove(rel_path)
+                    if file_status.chunk_count == 0:
+                        zero_chunk_this_window.append(rel_path)
+                    else:
+                        with self._storage_lock:
+                            self.storage.remove_zero_chunk_file(rel_path)
+                    processed = True
+        except OperationCancelled:
+            for future in in_flight:
+                future.cancel()
+            self.storage.prepare_hybrid_indexes()
+            if zero_chunk_this_window:
+                self.storage.add_zero_chunk_files(zero_chunk_this_window)
+            raise
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+        if cancelled:
+            log.info(
+                "index_window_cancelled",
+                project=str(self.project_path),
+                files_indexed=len(indexed_this_window),
+                remaining_files=len(remaining_files),
+            )
+            self.storage.prepare_hybrid_indexes()
+            if zero_chunk_this_window:
+                self.storage.add_zero_chunk_files(zero_chunk_this_window)
+            self._flush_file_stats()
+            raise OperationCancelled("index_window cancelled by cancel_event")
 
         self.storage.prepare_hybrid_indexes()
         if zero_chunk_this_window:
             self.storage.add_zero_chunk_files(zero_chunk_this_window)
+        self._flush_file_stats()
 
         status.duration_ms = (self._perf_counter() - start_time) * 1000
 
@@ -263,6 +488,38 @@ class Indexer:
             files_indexed=len(indexed_this_window),
         )
 
+    def _start_index_file(
+        self,
+        executor: ThreadPoolExecutor | None,
+        rel_path: str,
+        cancel_event: threading.Event | None,
+    ) -> Future[IndexStatus]:
+        """Index one file on the pool, or inline when running single-threaded.
+
+        Inline runs keep the caller's thread (and its pooled tree-sitter
+        parsers) and return an already-completed future, so both modes share
+        one scheduling loop; inline failures propagate immediately.
+        """
+        file_path = self.project_path / rel_path
+        if executor is not None:
+            return executor.submit(self.index_file, file_path, cancel_event=cancel_event)
+        future: Future[IndexStatus] = Future()
+        future.set_result(self.index_file(file_path, cancel_event=cancel_event))
+        return future
+
+    def _match_embedding_width(self) -> None:
+        """Rebuild the table empty when it was indexed at another width.
+
+        Only full passes call this; every file then counts as pending, since
+        the hashes that would mark it unchanged went with the old table.
+        """
+        if self.storage.reset_dimension(self.embedder.output_dimension):
+            log.info(
+                "index_rebuilding_for_dimension",
+                project=str(self.project_path),
+                dimension=self.embedder.output_dimension,
+            )
+
     def compute_pending_files(self) -> list[str]:
         """Return the deterministic ordered list of files needing indexing.
 
@@ -304,17 +561,71 @@ class Indexer:
             if file_hash and stored_hashes.get(rel_path) == file_hash:
                 continue
             pending.append(rel_path)
+        self._flush_file_stats()
         pending.sort()
         return pending
 
     def _compute_file_hash(self, file_path: Path, rel_path: str) -> str:
-        """Compute SHA-256 hash of a file for cache invalidation."""
+        """Return the SHA-256 of a file for cache invalidation.
+
+        Files whose ``(mtime_ns, size)`` match the persisted stat cache reuse
+        the recorded digest instead of being re-read.
+        """
+        st, cached = self._lookup_file_hash(file_path, rel_path)
+        if cached is not None:
+            return cached
+        return self._hash_file(file_path, rel_path, st) if st is not None else ""
+
+    def _lookup_file_hash(
+        self, file_path: Path, rel_path: str
+    ) -> tuple[os.stat_result | None, str | None]:
+        """Stat a file and return ``(stat, digest from the stat cache or None)``.
+
+        The stat is None when the file cannot be stat'ed.
+        """
+        try:
+            st = file_path.stat()
+        except OSError as e:
+            log.debug("file_hash_failed", file=rel_path, error=str(e))
+            return None, None
+        with self._file_stats_lock:
+            cached = self._stat_cache().get(rel_path)
+        if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+            return st, cached[2]
+        return st, None
+
+    def _stat_cache(self) -> dict[str, tuple[int, int, str]]:
+        """Return the ``path -> (mtime_ns, size, sha256)`` cache, loading it once.
+
+        Callers hold ``_file_stats_lock``.
+        """
+        if self._file_stats is None:
+            self._file_stats = self.storage.get_file_stats()
+        return self._file_stats
+
+    def _hash_file(self, file_path: Path, rel_path: str, st: os.stat_result) -> str:
+        """Hash a file's contents and record the digest under its stat."""
         try:
-            content = file_path.read_bytes()
-            return hashlib.sha256(content).hexdigest()
+            with file_path.open("rb") as f:
+                digest = hashlib.file_digest(f, "sha256").hexdigest()
         except Exception as e:
             log.debug("file_hash_failed", file=rel_path, error=str(e))
             return ""
+        if time.time_ns() - st.st_mtime_ns >= _RACY_MTIME_NS:
+            with self._file_stats_lock:
+                self._stat_cache()[rel_path] = (st.st_mtime_ns, st.st_size, digest)
+                self._file_stats_dirty = True
+        return digest
+
+    def _flush_file_stats(self) -> None:
+        """Persist newly recorded file stats, if any."""
+        with self._file_stats_flush_lock:
+            with self._file_stats_lock:
+                if self._file_stats is None or not self._file_stats_dirty:
+                    return
+                snapshot = dict(self._file_stats)
+                self._file_stats_dirty = False
+            self.storage.set_file_stats(snapshot)
 
     def _build_code_chunks(
         self,
@@ -323,11 +634,19 @@ class Indexer:
         rel_path: str,
         file_hash: str,
     ) -> list[CodeChunk]:
-        """Create CodeChunk objects from chunk info and embedding vectors."""
+        """Create CodeChunk objects from chunk info and embedding vectors.
+
+        Chunk ids are derived from (file hash, path, chunk index) rather than
+        random UUIDs: unique within the store, free to compute, and stable
+        across re-indexing of unchanged content. The path keeps files with
+        identical content apart.
+        """
         now = time.time()
+        id_prefix = f"{file_hash[:16]}:{rel_path}:"
+        model = chunk_model_for(len(embeddings[0])) if embeddings else CodeChunk
         return [
-            CodeChunk(
-                id=str(uuid.uuid4()),
+            model(
+                id=f"{id_prefix}{i}",
                 file_path=rel_path,
                 chunk_index=i,
                 start_line=chunk_info.start_line,
@@ -340,6 +659,13 @@ class Indexer:
             for i, (chunk_info, vector) in enumerate(zip(chunk_infos, embeddings, strict=False))
         ]
 
+    def _unchanged(self, rel_path: str, file_hash: str) -> bool:
+        """Return True (and log) when storage already holds ``file_hash``."""
+        if self.storage.get_file_hash(rel_path) != file_hash:
+            return False
+        log.debug("file_unchanged_skipping", file=rel_path)
+        return True
+
     def index_file(
         self, file_path: str | Path, cancel_event: threading.Event | None = None
     ) -> IndexStatus:
@@ -365,39 +691,57 @@ class Indexer:
 
         rel_path = str(file_path.relative_to(self.project_path))
 
-        # Check if file has changed before doing expensive embedding
-        file_hash = self._compute_file_hash(file_path, rel_path)
-        if file_hash:
-            stored_hash = self.storage.get_file_hash(rel_path)
-            if stored_hash == file_hash:
-                log.debug("file_unchanged_skipping", file=rel_path)
-                return IndexStatus(file_count=1)
+        # Check if file has changed before doing expensive embedding. A stat
+        # cache hit or a small file is hashed up front; a large changed file
+        # is hashed on the hash pool while it is being chunked.
+        st, file_hash = self._lookup_file_hash(file_path, rel_path)
+        hash_future: Future[str] | None = None
+        if file_hash is None:
+            if st is None:
+                file_hash = ""
+            elif st.st_size >= OVERLAP_HASH_MIN_BYTES:
+                hash_future = _HASH_POOL.submit(self._hash_file, file_path, rel_path, st)
+            else:
+                file_hash = self._hash_file(file_path, rel_path, st)
+        if file_hash and self._unchanged(rel_path, file_hash):
+            return IndexStatus(file_count=1)
 
         # 1. Chunking
         chunk_result = self.chunker.chunk_file(file_path)
+        if hash_future is not None:
+            file_hash = hash_future.result()
+            if file_hash and self._unchanged(rel_path, file_hash):
+                return IndexStatus(file_count=1)
         if chunk_result.error:
             log.warning("indexing_file_failed", file=rel_path, error=chunk_result.error)
             return IndexStatus(file_count=0)
 
         if not chunk_result.chunks:
             # File exists but produced no chunks (e.g. empty or only comments)
-            self.storage.delete_by_file(rel_path)
+            with self._storage_lock:
+                self.storage.delete_by_file(rel_path)
             return IndexStatus(file_count=1)
 
         # 2. Embedding
         if cancel_event is not None and cancel_event.is_set():
             raise OperationCancelled("index_file cancelled before embed")
         texts = [c.text for c in chunk_result.chunks]
-        embed_result = self.embedder.embed_documents(texts, cancel_event=cancel_event)
+        embed_result = self.embedder.embed_documents(
+            texts,
+            batch_size=self.batch_size,
+            cancel_event=cancel_event,
+            max_in_flight=self._file_max_in_flight,
+        )
 
         # 3. Storage
         if cancel_event is not None and cancel_event.is_set():
             raise OperationCancelled("index_file cancelled before storage")
-        self.storage.delete_by_file(rel_path)
         code_chunks = self._build_code_chunks(
             chunk_result.chunks, embed_result.embeddings, rel_path, file_hash
         )
-        self.storage.add_chunks(code_chunks)
+        with self._storage_lock:
+            self.storage.delete_by_file(rel_path)
+            self.storage.add_chunks(code_chunks)
 
         status = IndexStatus(
             file_count=1,
@@ -414,3 +758,58 @@ class Indexer:
         )
 
         return status
+
+    def index_files(self, file_paths: list[str | Path]) -> IndexStatus:
+        """Re-index several changed files as one batch.
+
+        Applies the same unchanged-hash skip as :meth:`index_file`, then
+        embeds every changed file's chunks together and replaces them with a
+        single delete and a single append, so a burst of edits produces two
+        table versions instead of two per file.
+
+        Args:
+            file_paths: Absolute or relative paths of the files
+
+        Returns:
+            IndexStatus for the batch
+        """
+        start_time = self._perf_counter()
+        status = IndexStatus()
+        paths: list[Path] = []
+        rel_paths: list[str] = []
+        hashes: list[str] = []
+        for file_path in file_paths:
+            file_path = Path(file_path)
+            if not file_path.is_absolute():
+                file_path = self.project_path / file_path
+            rel_path = str(file_path.relative_to(self.project_path))
+            file_hash = self._compute_file_hash(file_path, rel_path)
+            if file_hash and self._unchanged(rel_path, file_hash):
+                status.file_count += 1
+                continue
+            paths.append(file_path)
+            rel_paths.append(rel_path)
+            hashes.append(file_hash)
+
+        wave: list[tuple[str, str, list[ChunkInfo]]] = []
+        empty: list[str] = []
+        # In-process: a watcher batch is too small to repay spawning a pool
+        # whose workers each re-import chonkie and tree-sitter.
+        results = self.chunker.chunk_files(paths, max_workers=1) if paths else []
+        for rel_path, file_hash, result in zip(rel_paths, hashes, results, strict=True):
+            if result.error:
+                log.warning("indexing_file_failed", file=rel_path, error=result.error)
+                continue
+            status.file_count += 1
+            if result.chunks:
+                wave.append((rel_path, file_hash, result.chunks))
+            else:
+                empty.append(rel_path)
+        if empty:
+            with self._storage_lock:
+                self.storage.delete_by_files(empty)
+        self._flush_batched_wave(wave, status, None)
+        self._flush_file_stats()
+
+        status.duration_ms = (self._perf_counter() - start_time) * 1000
+        return status
@@ -18,7 +18,11 @@ via HTTP and prints instructions for running lgrep as a persistent daemon.
 
 from __future__ import annotations
 
+import contextlib
+import copy
+import os
 import shutil
+import stat
 import sys
 from pathlib import Path
 
@@ -41,14 +45,42 @@ _PACKAGE_SKILL = _REPO_ROOT / "skills" / "lgrep" / "SKILL.md"
 
 
 def _config_path() -> Path:
-    """Resolve the OpenCode config file path (json or jsonc)."""
-    json_path = OPENCODE_CONFIG_DIR / "opencode.json"
-    jsonc_path = OPENCODE_CONFIG_DIR / "opencode.jsonc"
-    if json_path.exists():
-        return json_path
-    if jsonc_path.exists():
-        return jsonc_path
-    return json_path  # default to .json
+    """Resolve the OpenCode config file path (json or jsonc).
+
+    One directory scan answers both candidates instead of a stat per name.
+    """
+    names: set[str] = set()
+    with contextlib.suppress(OSError), os.scandir(OPENCODE_CONFIG_DIR) as entries:
+        names = {entry.name for entry in entries}
+    if "opencode.json" not in names and "opencode.jsonc" in names:
+        return OPENCODE_CONFIG_DIR / "opencode.jsonc"
+    return OPENCODE_CONFIG_DIR / "opencode.json"  # default to .json
+
+
+def _write_config(config_path: Path, config: dict) -> None:
+    """Write the OpenCode config atomically via a temp file + os.replace.
+
+    Readers (and a crash mid-write) see either the old or the new file, never
+    a truncated one. A symlinked config (e.g. from a dotfiles repo) is written
+    through to its target so the link survives, and the existing file's
+    permission bits carry over to the replacement.
+    """
+    target = config_path.resolve()
+    text = dump_jsonc_text(config, indent=2) + "\n"
+    tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    try:
+        mode = stat.S_IMODE(os.stat(target).st_mode)
+    except FileNotFoundError:
+        mode = None
+    try:
+        tmp.write_text(text, encoding="utf-8")
+        if mode is not None:
+            os.chmod(tmp, mode)
+        os.replace(tmp, target)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            tmp.unlink(missing_ok=True)
+        raise
 
 
 def _check_instructions_have_lgrep_policy(instructions: list[str]) -> bool:
@@ -167,6 +199,29 @@ def _print_daemon_instructions() -> None:
 # ---------------------------------------------------------------------------
 
 
+def _install_asset(source: Path, dest: Path, label: str) -> None:
+    """Copy a packaged asset to ``dest`` unless it already is that file.
+
+    Sameness is decided from one ``stat`` of each side (device + inode),
+    which also covers symlinked and hard-linked installs, instead of an
+    ``exists()`` check plus two ``resolve()`` symlink walks.
+    """
+    try:
+        source_stat = source.stat()
+    except OSError:
+        print(f"  [warn] {label} source not found at {source}, skipping")
+        return
+    try:
+        same_file = os.path.samestat(source_stat, dest.stat())
+    except OSError:
+        same_file = False
+    if same_file:
+        print(f"  [ok] {label} already at {dest} (same file)")
+    else:
+        shutil.copy2(source, dest)
+        print(f"  [ok] {label} copied to {dest}")
+
+
 def install() -> int:
     """Install lgrep into OpenCode (MCP + instruction + skill)."""
     print("Installing lgrep into OpenCode...")
@@ -180,32 +235,23 @@ def install() -> int:
 
     # 1. Copy always-loaded instruction file
     INSTRUCTION_DIR.mkdir(parents=True, exist_ok=True)
-    if not _PACKAGE_INSTRUCTION.exists():
-        print(f"  [warn] Instruction source not found at {_PACKAGE_INSTRUCTION}, skipping")
-    elif _PACKAGE_INSTRUCTION.resolve() == INSTRUCTION_PATH.resolve():
-        print(f"  [ok] Instruction already at {INSTRUCTION_PATH} (same file)")
-    else:
-        shutil.copy2(_PACKAGE_INSTRUCTION, INSTRUCTION_PATH)
-        print(f"  [ok] Instruction copied to {INSTRUCTION_PATH}")
+    _install_asset(_PACKAGE_INSTRUCTION, INSTRUCTION_PATH, "Instruction")
 
     # 2. Copy SKILL.md (skip if source and dest resolve to the same file)
     SKILL_DIR.mkdir(parents=True, exist_ok=True)
-    if not _PACKAGE_SKILL.exists():
-        print(f"  [warn] Skill source not found at {_PACKAGE_SKILL}, skipping")
-    elif _PACKAGE_SKILL.resolve() == SKILL_PATH.resolve():
-        print(f"  [ok] Skill already at {SKILL_PATH} (same file)")
-    else:
-        shutil.copy2(_PACKAGE_SKILL, SKILL_PATH)
-        print(f"  [ok] Skill copied to {SKILL_PATH}")
+    _install_asset(_PACKAGE_SKILL, SKILL_PATH, "Skill")
 
     # 3. Add MCP entry to opencode.json
     config_path = _config_path()
     config_path.parent.mkdir(parents=True, exist_ok=True)
 
-    if config_path.exists():
-        config = load_jsonc_text(config_path.read_text())
-    else:
+    try:
+        config = load_jsonc_text(config_path.read_bytes())
+    except FileNotFoundError:
         config = {"$schema": "https://opencode.ai/config.json"}
+        previous = None
+    else:
+        previous = copy.deepcopy(config)
 
     if "mcp" not in config:
         config["mcp"] = {}
@@ -227,14 +273,12 @@ def install() -> int:
     instructions = config.get("instructions", [])
     has_lgrep_policy = _check_instructions_have_lgrep_policy(instructions)
 
-    # Preserve the file extension: write as JSONC if the existing file was JSONC
-    if config_path.suffix == ".jsonc":
-        config_path.write_text(dump_jsonc_text(config, indent=2) + "\n")
+    if config == previous:
+        # Repeat install: leave the file (and any JSONC comments) untouched.
+        print(f"  [ok] MCP entry already current in {config_path}")
     else:
-        import json
-
-        config_path.write_text(json.dumps(config, indent=2) + "\n")
-    print(f"  [ok] MCP entry added to {config_path}")
+        _write_config(config_path, config)
+        print(f"  [ok] MCP entry added to {config_path}")
 
     if not has_lgrep_policy:
         print()
@@ -261,9 +305,9 @@ def _resolves_to_package_source(installed: Path, package_source: Path) -> bool:
     Protects uninstall() from dev-workflow symlinks. If a user has made
     ``~/.config/opencode/skills/lgrep`` (or the whole instructions dir) a
     symlink into a source checkout, ``SKILL_PATH.unlink()`` would destroy
-    the committed file in the repo. The symmetric install() guard at
-    ``_PACKAGE_SKILL.resolve() == SKILL_PATH.resolve()`` handles the copy
-    side; this helper provides the same invariant for the unlink side.
+    the committed file in the repo. The symmetric same-file guard in
+    ``_install_asset`` handles the copy side; this helper provides the same
+    invariant for the unlink side.
     """
     try:
         return installed.resolve() == package_source.resolve()
@@ -311,7 +355,7 @@ def uninstall() -> int:
     # 3. Remove MCP entry and installed instruction entry from opencode.json
     config_path = _config_path()
     if config_path.exists():
-        config = load_jsonc_text(config_path.read_text())
+        config = load_jsonc_text(config_path.read_bytes())
         if "mcp" in config and "lgrep" in config["mcp"]:
             del config["mcp"]["lgrep"]
         else:
@@ -326,12 +370,7 @@ def uninstall() -> int:
         else:
             print(f"  [skip] No lgrep instruction entry in {config_path}")
 
-        if config_path.suffix == ".jsonc":
-            config_path.write_text(dump_jsonc_text(config, indent=2) + "\n")
-        else:
-            import json
-
-            config_path.write_text(json.dumps(config, indent=2) + "\n")
+        _write_config(config_path, config)
         print(f"  [ok] Config updated at {config_path}")
     else:
         print(f"  [skip] {config_path} not found")
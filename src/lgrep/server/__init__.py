@@ -4,17 +4,18 @@ from __future__ import annotations
 
 import asyncio
 import functools
+import logging
 import os
 import time
 from importlib import import_module
-from pathlib import Path
 
 import structlog
 from mcp.server.fastmcp import FastMCP
 
 log = structlog.get_logger()
 
-# Guard against unbounded memory growth.
+# Guard against unbounded memory growth; the least-recently-used idle project
+# is unloaded to make room beyond this.
 MAX_PROJECTS = 20
 AUTO_INDEX_MAX_ATTEMPTS = 2
 AUTO_INDEX_RETRY_BASE_DELAY_S = 0.1
@@ -22,6 +23,13 @@ AUTO_INDEX_RETRY_BASE_DELAY_S = 0.1
 # Server-side timeout for tool operations.
 TOOL_TIMEOUT_S = float(os.environ.get("LGREP_TOOL_TIMEOUT_S", "45"))
 
+# The filtering logger drops events below LGREP_LOG_LEVEL only after the
+# call site has built its kwargs. Per-call INFO/DEBUG events on the tool paths
+# check these first so filtered deployments skip that work entirely.
+_LOG_LEVEL = getattr(logging, os.environ.get("LGREP_LOG_LEVEL", "INFO").upper(), logging.INFO)
+_INFO_ON = _LOG_LEVEL <= logging.INFO
+_DEBUG_ON = _LOG_LEVEL <= logging.DEBUG
+
 
 def time_tool(func):
     """Decorator to time tool execution, log results, and enforce timeout."""
@@ -32,8 +40,9 @@ def time_tool(func):
         tool_name = func.__name__
         try:
             result = await asyncio.wait_for(func(*args, **kwargs), timeout=TOOL_TIMEOUT_S)
-            duration = round((time.monotonic() - start) * 1000, 2)
-            log.info(f"{tool_name}_completed", duration_ms=duration)
+            if _INFO_ON:
+                duration = round((time.monotonic() - start) * 1000, 2)
+                log.info(f"{tool_name}_completed", duration_ms=duration)
             return result
         except TimeoutError:
             duration = round((time.monotonic() - start) * 1000, 2)
@@ -115,6 +124,7 @@ from lgrep.server.lifecycle import (  # noqa: E402
     _ensure_project_initialized,
     _ensure_search_project_state,
     _get_project_stats,
+    _resolve_project_path,
     _shutdown,
     _startup,
     _stop_watcher,
@@ -175,7 +185,7 @@ def remove_project(app_ctx: LgrepContext, path: str) -> dict:
     """
     log.info("lgrep_remove", project=path)
 
-    project_path = str(Path(path).resolve())
+    project_path = _resolve_project_path(path)
     state = app_ctx.projects.get(project_path)
     if not state:
         return {"removed": False, "message": "Project not loaded", "project": project_path}
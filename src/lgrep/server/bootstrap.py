@@ -5,35 +5,53 @@ from __future__ import annotations
 import logging
 import os
 import sys
+from typing import TYPE_CHECKING
 
+import anyio
 import structlog
 
+if TYPE_CHECKING:
+    import asyncio
+    from collections.abc import Callable
+
 # Transport kind recorded by ``run_server`` and read lazily by the lifespan.
 # Kept as a module attribute rather than an environment variable so diagnostics
 # can report the actual startup transport without creating a side channel that
 # other code could mistake for configuration.
 _startup_transport: str | None = None
 
+# Set by ``_configure_logging`` after the first ``run_server`` in this process.
+_logging_configured = False
+
 
 def get_startup_transport() -> str | None:
     """Return the transport kind recorded by ``run_server``, if any."""
     return _startup_transport
 
 
-def run_server(transport: str = "stdio", host: str = "127.0.0.1", port: int = 6285) -> int:
-    """Start the MCP server.
+def _json_renderer() -> structlog.processors.JSONRenderer:
+    """Return the log line renderer, backed by orjson when it is installed."""
+    try:
+        import orjson  # optional extra: pip install "lgrep[orjson]"
+    except ImportError:
+        return structlog.processors.JSONRenderer()
 
-    Args:
-        transport: Transport protocol - "stdio" or "streamable-http".
-        host: Host to bind to (only for HTTP transport).
-        port: Port to bind to (only for HTTP transport).
-    """
-    global _startup_transport
+    def serialize(event_dict: dict, **kwargs: object) -> str:
+        return orjson.dumps(event_dict, default=kwargs.get("default")).decode()
+
+    return structlog.processors.JSONRenderer(serializer=serialize)
 
-    # Import here to avoid circular imports at module load time
-    from lgrep.server import mcp
 
-    # Configure structlog for JSON output
+def _configure_logging() -> None:
+    """Configure structlog for JSON output on stderr, once per process.
+
+    Re-entering ``run_server`` keeps the existing processor chain and
+    filtering logger class instead of rebuilding them.
+    """
+    global _logging_configured
+
+    if _logging_configured:
+        return
     log_level = getattr(
         logging,
         os.environ.get("LGREP_LOG_LEVEL", "INFO").upper(),
@@ -43,12 +61,48 @@ def run_server(transport: str = "stdio", host: str = "127.0.0.1", port: int = 62
         processors=[
             structlog.stdlib.add_log_level,
             structlog.processors.TimeStamper(fmt="iso"),
-            structlog.processors.JSONRenderer(),
+            _json_renderer(),
         ],
         wrapper_class=structlog.make_filtering_bound_logger(log_level),
         logger_factory=structlog.WriteLoggerFactory(file=sys.stderr),
     )
+    _logging_configured = True
+
+
+def _uvloop_factory(transport: str) -> Callable[[], asyncio.AbstractEventLoop] | None:
+    """Return uvloop's loop factory for the HTTP transport when it is installed.
+
+    Only ``streamable-http`` benefits: it multiplexes many clients over
+    sockets, where uvloop's cheaper callbacks and socket I/O show. stdio
+    serves a single client over pipes and keeps the stdlib loop.
+    ``LGREP_UVLOOP=0`` (or ``false``/``no``/``off``) opts out. The factory is handed to the server's own
+    runner, so the process-wide event-loop policy is left untouched.
+    """
+    if transport != "streamable-http":
+        return None
+    if os.environ.get("LGREP_UVLOOP", "1").strip().lower() in ("0", "false", "no", "off"):
+        return None
+    try:
+        import uvloop  # optional extra: pip install "lgrep[uvloop]"
+    except ImportError:
+        return None
+    return uvloop.new_event_loop
+
+
+def run_server(transport: str = "stdio", host: str = "127.0.0.1", port: int = 6285) -> int:
+    """Start the MCP server.
+
+    Args:
+        transport: Transport protocol - "stdio" or "streamable-http".
+        host: Host to bind to (only for HTTP transport).
+        port: Port to bind to (only for HTTP transport).
+    """
+    global _startup_transport
+
+    # Import here to avoid circular imports at module load time
+    from lgrep.server import mcp
 
+    _configure_logging()
     log = structlog.get_logger()
     log.info("lgrep_mcp_server_starting", transport=transport, host=host, port=port)
 
@@ -59,7 +113,15 @@ def run_server(transport: str = "stdio", host: str = "127.0.0.1", port: int = 62
     if transport == "streamable-http":
         mcp.settings.host = host
         mcp.settings.port = port
-        mcp.run(transport="streamable-http")
+        loop_factory = _uvloop_factory(transport)
+        if loop_factory is not None:
+            log.info("uvloop_enabled")
+            anyio.run(
+                mcp.run_streamable_http_async,
+                backend_options={"loop_factory": loop_factory},
+            )
+        else:
+            mcp.run(transport="streamable-http")
     else:
         mcp.run(transport="stdio")
     return 0
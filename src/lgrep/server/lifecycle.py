@@ -3,9 +3,13 @@
 from __future__ import annotations
 
 import asyncio
+import contextvars
+import functools
 import os
+import stat
 import threading
 import time
+import weakref
 from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
 from pathlib import Path
@@ -16,12 +20,14 @@ import structlog
 from lgrep.embeddings import VoyageEmbedder
 from lgrep.indexing import Indexer, OperationCancelled
 from lgrep.server.runtime import RuntimeSupervisor
+from lgrep.server.search_cache import SearchCache
 from lgrep.storage import (
     ChunkStore,
     canonical_repo_key,
     discover_cached_projects,
     get_project_db_path,
     has_disk_cache,
+    open_default_embedding_cache,
 )
 from lgrep.watcher import FileWatcher
 
@@ -29,7 +35,7 @@ if TYPE_CHECKING:
     from collections.abc import AsyncIterator, Callable
     from typing import Any
 
-    from mcp.server.fastmcp import FastMCP
+    from mcp.server.fastmcp import Context, FastMCP
 
 log = structlog.get_logger()
 
@@ -46,17 +52,90 @@ MAX_PROJECTS: int = 20  # overridden by __init__.py import
 AUTO_INDEX_MAX_ATTEMPTS: int = 2  # overridden by __init__.py import
 AUTO_INDEX_RETRY_BASE_DELAY_S: float = 0.1  # overridden by __init__.py import
 
+# Per-project stats reads in flight at once for a deep all-projects status.
+STATUS_CONCURRENCY = 8
+# Stats reads are reused for this long while the store has not been written
+# through this process, so bursts of status polls share one scan.
+STATUS_CACHE_TTL_S = 2.0
+# Absolute tool paths resolved within this window reuse the earlier realpath,
+# so a retargeted symlink or a recreated directory is picked up within it.
+RESOLVE_CACHE_TTL_S = 2.0
+RESOLVE_CACHE_SIZE = 256
+
 
 # ---------------------------------------------------------------------------
 # Error helper
 # ---------------------------------------------------------------------------
 
 
+# Fixed error messages. Responses stay plain dicts that FastMCP serializes
+# once on the way out, so only the message text is worth sharing.
+_INIT_FAILED = "Failed to initialize project."
+_NO_API_KEY = "VOYAGE_API_KEY not set."
+
+
 def _error_response(message: str) -> dict:
     """Create a structured error response dict (ToolError shape)."""
     return {"error": message}
 
 
+_resolve_cache: dict[str, tuple[str, float]] = {}
+_resolve_cache_lock = threading.Lock()
+
+
+def _resolve_absolute(path: str) -> str:
+    """Return ``os.path.realpath(path)``, reusing results younger than the TTL.
+
+    Agents repeat the same absolute path on every call, and a burst of tool
+    calls shares one resolution. Entries expire after ``RESOLVE_CACHE_TTL_S``
+    rather than living for the process: a symlink pointed elsewhere, or a
+    directory deleted and recreated, would otherwise keep mapping to the old
+    project. The cost is that such a change can go unseen for up to one TTL.
+    """
+    now = time.monotonic()
+    with _resolve_cache_lock:
+        cached = _resolve_cache.get(path)
+    if cached is not None and now < cached[1]:
+        return cached[0]
+    resolved = os.path.realpath(path)
+    with _resolve_cache_lock:
+        _resolve_cache.pop(path, None)
+        if len(_resolve_cache) >= RESOLVE_CACHE_SIZE:
+            # Insertion order is expiry order, so the first entry is the oldest.
+            del _resolve_cache[next(iter(_resolve_cache))]
+        _resolve_cache[path] = (resolved, now + RESOLVE_CACHE_TTL_S)
+    return resolved
+
+
+def _resolve_project_path(path: str) -> str:
+    """Return the resolved project key for a tool's ``path`` argument.
+
+    ``os.path.realpath`` walks every component; agents pass the same absolute
+    path on every call, so those results are briefly memoized (see
+    ``_resolve_absolute``). Relative paths depend
+    on the working directory and are always resolved afresh. Unlike
+    ``Path.resolve`` it does not stat the result, which ``_validate_dir``
+    does anyway for paths that need it.
+    """
+    if os.path.isabs(path):
+        return _resolve_absolute(path)
+    return os.path.realpath(path)
+
+
+def _validate_dir(project_path: Path, raw_path: str) -> dict | None:
+    """Return an error response unless ``project_path`` is a directory.
+
+    A single ``os.stat`` answers both "exists" and "is a directory".
+    """
+    try:
+        is_dir = stat.S_ISDIR(os.stat(project_path).st_mode)
+    except OSError:
+        is_dir = False
+    if is_dir:
+        return None
+    return _error_response(f"Path does not exist or is not a directory: {raw_path}")
+
+
 # ---------------------------------------------------------------------------
 # Data classes
 # ---------------------------------------------------------------------------
@@ -75,6 +154,18 @@ class ProjectState:
     ``pending_index_files`` holds the deterministic remaining work from an
     interrupted bounded index window.  When it is non-empty, the next index
     window resumes from this list instead of re-walking the repository.
+
+    ``last_used`` is the ``time.monotonic()`` of the most recent lookup; at
+    ``MAX_PROJECTS`` the idle project with the oldest value is evicted.
+
+    ``search_cache`` remembers recent search results by query vector so a
+    near-identical query skips the LanceDB search.
+
+    ``inflight_searches`` maps ``(query, limit, hybrid)`` to the running
+    search task so identical concurrent searches share it.
+
+    ``stats_cache`` holds the last ``(read at, write_version, chunks, files)``
+    stats read, reused within ``STATUS_CACHE_TTL_S``.
     """
 
     db: ChunkStore
@@ -83,6 +174,10 @@ class ProjectState:
     watching: bool = False
     latest_indexed_at: float | None = None
     pending_index_files: list[str] | None = None
+    last_used: float = field(default_factory=time.monotonic)
+    search_cache: SearchCache = field(default_factory=SearchCache)
+    inflight_searches: dict[tuple[str, int, bool], asyncio.Future] = field(default_factory=dict)
+    stats_cache: tuple[float, int, int, int] | None = None
 
 
 @dataclass
@@ -111,7 +206,11 @@ class LgrepContext:
     runtime: RuntimeSupervisor = field(default_factory=RuntimeSupervisor)
     _lock: asyncio.Lock = field(default_factory=asyncio.Lock)
     _indexing_events: dict[str, asyncio.Event] = field(default_factory=dict)
+    # Single-flight project initialization, keyed by canonical repo key.
+    _init_futures: dict[str, asyncio.Future] = field(default_factory=dict)
     _bg_reindex_tasks: dict[str, asyncio.Task] = field(default_factory=dict)
+    # Watcher stops and store releases of LRU-evicted projects still running.
+    _eviction_tasks: set[asyncio.Task] = field(default_factory=set)
 
 
 # ---------------------------------------------------------------------------
@@ -166,27 +265,57 @@ async def _shutdown(ctx: LgrepContext) -> None:
         while time.monotonic() < deadline and ctx.runtime.snapshot_active_jobs():
             await asyncio.sleep(0.01)
     ctx._bg_reindex_tasks.clear()
+    if ctx._eviction_tasks:
+        await asyncio.gather(*ctx._eviction_tasks, return_exceptions=True)
 
     # Iterate canonical states (deduped) to stop each watcher exactly once.
     # Fall back to projects when _canonical_to_state is empty (legacy / pre-dedup).
+    # Each stop joins an observer thread, so the joins run concurrently.
     seen_states: set[int] = set()
+    to_stop: list[tuple[str, ProjectState]] = []
     for proj_path, state in ctx.projects.items():
         if id(state) in seen_states:
             continue
         seen_states.add(id(state))
-        _stop_watcher(state, proj_path)
+        if state.watcher and state.watching:
+            to_stop.append((proj_path, state))
+    if to_stop:
+        await asyncio.gather(
+            *(asyncio.to_thread(_stop_watcher, state, proj_path) for proj_path, state in to_stop)
+        )
 
     ctx.projects.clear()
     ctx._canonical_to_state.clear()
     ctx.runtime.shutdown(cancel_futures=True)
+    if ctx.embedder is not None:
+        ctx.embedder.close()
     ctx.embedder = None
     log.info("lgrep_shutdown_complete")
 
 
+# The running server's LgrepContext, published by ``app_lifespan``. Request
+# handlers are spawned inside the lifespan, so they inherit it.
+_APP_CTX: contextvars.ContextVar[LgrepContext] = contextvars.ContextVar("lgrep_app_ctx")
+
+
+def _app_context(ctx: Context | None) -> LgrepContext | None:
+    """Return the LgrepContext for a tool call.
+
+    Reads the lifespan-published context first and falls back to the tool's
+    ``ctx.request_context.lifespan_context`` (tests and embedders that call
+    tools directly). Returns None when neither is available.
+    """
+    app_ctx = _APP_CTX.get(None)
+    if app_ctx is None and ctx is not None:
+        app_ctx = ctx.request_context.lifespan_context
+    return app_ctx
+
+
 @asynccontextmanager
 async def app_lifespan(server: FastMCP) -> AsyncIterator[LgrepContext]:
     """Manage application lifecycle with optional eager warming."""
     ctx = await _startup(server)
+    token = _APP_CTX.set(ctx)
     await _warm_projects(ctx)
     sweep_task = asyncio.create_task(_schedule_startup_sweep(ctx))
     try:
@@ -194,6 +323,7 @@ async def app_lifespan(server: FastMCP) -> AsyncIterator[LgrepContext]:
     finally:
         sweep_task.cancel()
         await _shutdown(ctx)
+        _APP_CTX.reset(token)
 
 
 async def _schedule_startup_sweep(ctx: LgrepContext) -> None:
@@ -260,8 +390,12 @@ async def _ensure_project_initialized(
 ) -> ProjectState | dict:
     """Look up or create a ProjectState for the given path.
 
-    Uses double-checked locking: fast lock-free path for already-cached projects,
-    asyncio.Lock only for first-time initialization.
+    Fast path for already-cached projects is a single dict lookup.
+    First-time initialization is single-flight per canonical repo: the first
+    caller registers a future in ``app_ctx._init_futures`` and builds the
+    state, while concurrent callers for the same repo await that future. The
+    bookkeeping runs between awaits on the event loop, so it takes no lock and
+    initializing one project never queues requests for an unrelated one.
 
     When ``LGREP_WORKTREE_DEDUP`` is enabled, this function shares ProjectState
     across worktree paths of the same repo: the first path to initialize creates
@@ -274,69 +408,196 @@ async def _ensure_project_initialized(
     path_key = str(project_path)
 
     # Fast path: already initialized by this exact path (no lock needed)
-    if path_key in app_ctx.projects:
-        return app_ctx.projects[path_key]
+    state = app_ctx.projects.get(path_key)
+    if state is not None:
+        state.last_used = time.monotonic()
+        return state
 
-    # Slow path: need to create or alias (under lock to prevent duplicate entries)
-    async with app_ctx._lock:
-        # Double-check after acquiring lock
-        if path_key in app_ctx.projects:
-            return app_ctx.projects[path_key]
-
-        # Compute canonical key — when dedup is on, this collapses worktrees
-        # of the same repo to a single shared state. When dedup is off,
-        # canonical_repo_key returns Path.resolve(), so each path is its own key.
-        canonical_str = str(canonical_repo_key(Path(project_path)))
-
-        # Alias path: another path already initialized the same canonical repo.
-        # Share the existing ProjectState — DO NOT create a duplicate.
-        existing_state = app_ctx._canonical_to_state.get(canonical_str)
-        if existing_state is not None:
-            app_ctx.projects[path_key] = existing_state
-            log.info(
-                "project_aliased",
-                project=path_key,
-                canonical=canonical_str,
-            )
-            return existing_state
+    # Compute canonical key — when dedup is on, this collapses worktrees
+    # of the same repo to a single shared state. When dedup is off,
+    # canonical_repo_key returns the resolved path, so each path is its own key.
+    canonical_str = str(canonical_repo_key(Path(project_path)))
+
+    # Everything from here to the first await runs without yielding to the
+    # event loop, so the bookkeeping below needs no lock: the first caller's
+    # future is registered before any other coroutine can look for it.
+
+    # Alias path: another path already initialized the same canonical repo.
+    # Share the existing ProjectState — DO NOT create a duplicate.
+    existing_state = app_ctx._canonical_to_state.get(canonical_str)
+    if existing_state is not None:
+        app_ctx.projects[path_key] = existing_state
+        log.info(
+            "project_aliased",
+            project=path_key,
+            canonical=canonical_str,
+        )
+        return existing_state
 
+    pending = app_ctx._init_futures.get(canonical_str)
+    if pending is None:
         # Check MAX_PROJECTS limit (counts canonical projects, not aliases)
-        count = len(app_ctx._canonical_to_state)
+        count = len(app_ctx._canonical_to_state) + len(app_ctx._init_futures)
         if count >= MAX_PROJECTS:
-            return _error_response(
-                f"Maximum project limit ({MAX_PROJECTS}) reached. "
-                "Restart the server or use the CLI to evict unused projects."
-            )
+            if _evict_lru_project(app_ctx) is None:
+                return _error_response(
+                    f"Maximum project limit ({MAX_PROJECTS}) reached and every loaded "
+                    "project is busy. Restart the server or use the CLI to evict "
+                    "unused projects."
+                )
+            count -= 1
         if count >= int(MAX_PROJECTS * 0.8):
             log.warning("approaching_project_limit", current=count, max=MAX_PROJECTS)
 
         if not app_ctx.voyage_api_key:
-            return _error_response("VOYAGE_API_KEY not set.")
+            return _error_response(_NO_API_KEY)
 
-        try:
-            # Create shared embedder on first use
-            if app_ctx.embedder is None:
-                app_ctx.embedder = VoyageEmbedder(api_key=app_ctx.voyage_api_key)
-
-            db_path = get_project_db_path(project_path)
-            db = ChunkStore(db_path, project_path=path_key)
-            indexer = Indexer(
-                project_path=project_path,
-                storage=db,
-                embedder=app_ctx.embedder,
-            )
-            state = ProjectState(db=db, indexer=indexer)
-            app_ctx.projects[path_key] = state
-            app_ctx._canonical_to_state[canonical_str] = state
-            log.info(
-                "project_initialized",
-                project=path_key,
-                canonical=canonical_str,
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        app_ctx._init_futures[canonical_str] = future
+
+    if pending is not None:
+        shared = await asyncio.shield(pending)
+        if isinstance(shared, ProjectState):
+            app_ctx.projects.setdefault(path_key, shared)
+        return shared
+
+    result: ProjectState | dict = _error_response(_INIT_FAILED)
+    try:
+        result = await _create_project_state(app_ctx, project_path, canonical_str)
+    finally:
+        app_ctx._init_futures.pop(canonical_str, None)
+        future.set_result(result)
+    return result
+
+
+def _evict_lru_project(app_ctx: LgrepContext) -> str | None:
+    """Unload the least-recently-used idle project; call only between awaits.
+
+    Projects with an index run or background reindex in flight on any of their
+    paths are never chosen. The project leaves the registry immediately; its
+    watcher stop (an observer join) and store release run on a tracked task,
+    off the event loop. Returns the evicted canonical key, or None when every
+    loaded project is busy.
+    """
+    busy = app_ctx._indexing_events.keys() | app_ctx._bg_reindex_tasks.keys()
+    paths_by_state: dict[int, list[str]] = {}
+    for path, state in app_ctx.projects.items():
+        paths_by_state.setdefault(id(state), []).append(path)
+
+    idle = [
+        (state.last_used, canonical)
+        for canonical, state in app_ctx._canonical_to_state.items()
+        if busy.isdisjoint(paths_by_state.get(id(state), ()))
+    ]
+    if not idle:
+        return None
+    _, canonical = min(idle)
+    state = app_ctx._canonical_to_state.pop(canonical)
+    paths = paths_by_state.get(id(state), [])
+    for path in paths:
+        del app_ctx.projects[path]
+    task = asyncio.get_running_loop().create_task(_release_evicted_state(app_ctx, state, canonical))
+    app_ctx._eviction_tasks.add(task)
+    task.add_done_callback(app_ctx._eviction_tasks.discard)
+    log.info("project_evicted", canonical=canonical, paths=len(paths), reason="lru")
+    return canonical
+
+
+async def _release_evicted_state(
+    app_ctx: LgrepContext, state: ProjectState, canonical: str
+) -> None:
+    """Stop an evicted project's watcher, then close its store once unused.
+
+    Searches already running against the state finish first. The store is
+    left open when the project was re-initialized meanwhile and reuses it
+    (see ``_open_chunk_store``).
+    """
+    if state.watcher and state.watching:
+        await asyncio.to_thread(_stop_watcher, state, canonical)
+    searches = list(state.inflight_searches.values())
+    if searches:
+        # asyncio.wait never cancels the searches, even if this task is.
+        await asyncio.wait(searches)
+    state.search_cache.clear()
+    state.stats_cache = None
+    if any(other.db is state.db for other in app_ctx._canonical_to_state.values()):
+        return
+    try:
+        state.db.close()
+    except Exception as e:
+        log.warning("chunk_store_close_failed", project=canonical, error=str(e))
+
+
+# Live ChunkStores by LanceDB directory. A project evicted or re-initialized
+# while a search still holds its store reuses that connection instead of
+# opening a second one against the same table.
+_chunk_stores: weakref.WeakValueDictionary[str, ChunkStore] = weakref.WeakValueDictionary()
+_chunk_stores_lock = threading.Lock()
+
+
+def _open_chunk_store(db_path: Path, project_path: str, dimension: int) -> ChunkStore:
+    """Return the live ChunkStore for ``db_path``, opening one if none is held.
+
+    ``dimension`` only sizes a new table: an existing one keeps its width, and
+    searches against it fail with a reindex-required error rather than
+    dropping it. The open itself runs outside the lock so distinct projects
+    initialize in parallel; if two threads race on one path, the first
+    registered store wins.
+    """
+    key = str(db_path)
+    with _chunk_stores_lock:
+        store = _chunk_stores.get(key)
+    if store is not None:
+        return store
+    opened = ChunkStore(db_path, project_path=project_path, dimension=dimension)
+    with _chunk_stores_lock:
+        store = _chunk_stores.get(key)
+        if store is not None:
+            return store
+        _chunk_stores[key] = opened
+    return opened
+
+
+def _build_project(project_path: Path, embedder: VoyageEmbedder) -> tuple[ChunkStore, Indexer]:
+    """Open the project's ChunkStore and Indexer (blocking LanceDB I/O)."""
+    db = _open_chunk_store(
+        get_project_db_path(project_path), str(project_path), embedder.output_dimension
+    )
+    return db, Indexer(project_path=project_path, storage=db, embedder=embedder)
+
+
+async def _create_project_state(
+    app_ctx: LgrepContext, project_path: Path, canonical_str: str
+) -> ProjectState | dict:
+    """Build and register a new ProjectState (single-flight owner only)."""
+    path_key = str(project_path)
+    try:
+        # Create shared embedder on first use
+        if app_ctx.embedder is None:
+            app_ctx.embedder = VoyageEmbedder(
+                api_key=app_ctx.voyage_api_key, cache=open_default_embedding_cache()
             )
-            return state
-        except Exception as e:
-            log.exception("initialization_failed", project=path_key, error=str(e))
-            return _error_response("Failed to initialize project.")
+
+        db, indexer = await _run_blocking_or_thread(
+            app_ctx.runtime,
+            "project_init",
+            "_ensure_project_initialized",
+            path_key,
+            functools.partial(_build_project, project_path, app_ctx.embedder),
+        )
+    except Exception as e:
+        log.exception("initialization_failed", project=path_key, error=str(e))
+        return _error_response(_INIT_FAILED)
+
+    state = ProjectState(db=db, indexer=indexer)
+    app_ctx.projects[path_key] = state
+    app_ctx._canonical_to_state[canonical_str] = state
+    log.info(
+        "project_initialized",
+        project=path_key,
+        canonical=canonical_str,
+    )
+    return state
 
 
 async def _run_blocking_or_thread(
@@ -361,22 +622,26 @@ async def _get_project_stats(
     directly into the typed result without missing-key validation errors.
     """
     try:
-        chunks = await _run_blocking_or_thread(
-            runtime,
-            "status_count_chunks",
-            "_get_project_stats",
-            proj_path,
-            state.db.count_chunks,
-        )
-        files_set = await _run_blocking_or_thread(
-            runtime,
-            "status_indexed_files",
-            "_get_project_stats",
-            proj_path,
-            state.db.get_indexed_files,
-        )
+        version = state.db.write_version
+        cached = state.stats_cache
+        if (
+            cached is not None
+            and cached[1] == version
+            and time.monotonic() - cached[0] < STATUS_CACHE_TTL_S
+        ):
+            _, _, chunks, files = cached
+        else:
+            chunks, files_set = await _run_blocking_or_thread(
+                runtime,
+                "status_project_stats",
+                "_get_project_stats",
+                proj_path,
+                state.db.get_stats,
+            )
+            files = len(files_set)
+            state.stats_cache = (time.monotonic(), version, chunks, files)
         return {
-            "files": len(files_set),
+            "files": files,
             "chunks": chunks,
             "watching": state.watching,
             "project": proj_path,
@@ -395,6 +660,25 @@ async def _get_project_stats(
         }
 
 
+async def _gather_project_stats(
+    projects: dict[str, ProjectState],
+    runtime: RuntimeSupervisor | None = None,
+    limit: int = STATUS_CONCURRENCY,
+) -> list[dict]:
+    """Get stats for every project concurrently, at most ``limit`` in flight.
+
+    Results keep the iteration order of ``projects``; per-project failures
+    are reported in each entry's ``error`` field by ``_get_project_stats``.
+    """
+    sem = asyncio.Semaphore(limit)
+
+    async def _bounded(proj_path: str, state: ProjectState) -> dict:
+        async with sem:
+            return await _get_project_stats(proj_path, state, runtime)
+
+    return list(await asyncio.gather(*(_bounded(p, s) for p, s in list(projects.items()))))
+
+
 async def _finish_single_flight_indexing(
     app_ctx: LgrepContext, project_path: str, event: asyncio.Event
 ) -> None:
@@ -649,9 +933,10 @@ async def _auto_index_project_single_flight(
 
 async def _ensure_search_project_state(app_ctx: LgrepContext, path: str) -> ProjectState | dict:
     """Resolve project path and ensure a ready ProjectState for search."""
-    project_path = str(Path(path).resolve())
+    project_path = _resolve_project_path(path)
     state = app_ctx.projects.get(project_path)
     if state:
+        state.last_used = time.monotonic()
         return state
 
     if has_disk_cache(project_path):
@@ -660,8 +945,9 @@ async def _ensure_search_project_state(app_ctx: LgrepContext, path: str) -> Proj
         return result
 
     path_obj = Path(project_path)
-    if not path_obj.exists() or not path_obj.is_dir():
-        return _error_response(f"Path does not exist or is not a directory: {path}")
+    invalid = _validate_dir(path_obj, path)
+    if invalid is not None:
+        return invalid
 
     return await _auto_index_project_single_flight(app_ctx, project_path, path_obj)
 
@@ -688,6 +974,21 @@ async def _warm_project(app_ctx: LgrepContext, project_path: Path) -> dict:
                 "detail": result.get("error", str(result)),
             }
 
+        # Touch the vector and FTS index pages now so the first search is
+        # not the one that pays for faulting them in.
+        start = time.perf_counter()
+        try:
+            await _run_blocking_or_thread(
+                app_ctx.runtime, "db_prewarm", "_warm_project", path_str, result.db.prewarm
+            )
+            log.info(
+                "project_prewarmed",
+                project=path_str,
+                warmup_ms=round((time.perf_counter() - start) * 1000, 2),
+            )
+        except Exception as e:
+            log.debug("project_prewarm_failed", project=path_str, error=str(e))
+
         # Start watcher if auto-watch is enabled
         auto_watch = os.environ.get("LGREP_AUTO_WATCH", "").lower() in ("true", "1", "yes")
         if auto_watch and not result.watching:
@@ -89,11 +89,14 @@ class SearchChunk(_SearchChunkRequired, total=False):
     Optional fidelity keys (may be absent):
       - ``start_line`` / ``end_line``: original chunk line range.
       - ``match_type``: ``"hybrid"`` | ``"vector"`` | ``"keyword"``.
+      - ``truncated``: ``True`` when ``content`` was cut to
+        ``LGREP_MAX_SNIPPET_BYTES``; absent otherwise.
     """
 
     start_line: int  # optional fidelity — original range start
     end_line: int  # optional fidelity — original range end
     match_type: str  # optional fidelity — "hybrid" | "vector" | "keyword"
+    truncated: bool  # optional — content clipped to LGREP_MAX_SNIPPET_BYTES
 
 
 class FileOutline(TypedDict):
@@ -26,6 +26,24 @@ T = TypeVar("T")
 DEFAULT_WORKER_MAX_THREADS = 4
 DEFAULT_HISTORY_LIMIT = 100
 
+# Short interactive LanceDB work (search, status, staleness probes, opening a
+# project's table on first use, prewarming it at startup) runs on its own pool so it never queues
+# behind long indexing jobs that occupy every general worker.  The calls
+# mostly wait on disk, so the pool is sized above the core count.
+DEFAULT_DB_MAX_THREADS = min(32, (os.cpu_count() or 1) * 4)
+DB_JOB_KINDS = frozenset(
+    {
+        "staleness_check",
+        "search_hybrid",
+        "search_vector",
+        "db_latest_indexed_at",
+        "status_project_stats",
+        "status_disk_cache_stats",
+        "project_init",
+        "db_prewarm",
+    }
+)
+
 
 class JobStatus(StrEnum):
     """Lifecycle state for a blocking daemon job."""
@@ -95,7 +113,11 @@ class RuntimeSupervisor:
     """Owns bounded execution and lifecycle state for blocking work."""
 
     def __init__(
-        self, *, max_workers: int | None = None, history_limit: int = DEFAULT_HISTORY_LIMIT
+        self,
+        *,
+        max_workers: int | None = None,
+        history_limit: int = DEFAULT_HISTORY_LIMIT,
+        db_max_workers: int = DEFAULT_DB_MAX_THREADS,
     ):
         if max_workers is None:
             max_workers = _worker_limit_from_env()
@@ -103,6 +125,8 @@ class RuntimeSupervisor:
             raise ValueError("max_workers must be >= 1")
         if history_limit < 1:
             raise ValueError("history_limit must be >= 1")
+        if db_max_workers < 1:
+            raise ValueError("db_max_workers must be >= 1")
 
         self.max_workers = max_workers
         self.history_limit = history_limit
@@ -110,6 +134,11 @@ class RuntimeSupervisor:
             max_workers=max_workers,
             thread_name_prefix="lgrep-worker",
         )
+        self.db_max_workers = db_max_workers
+        self._db_executor = ThreadPoolExecutor(
+            max_workers=db_max_workers,
+            thread_name_prefix="lgrep-db",
+        )
         self._counter = itertools.count(1)
         self._lock = threading.RLock()
         self._active: dict[str, RuntimeJob] = {}
@@ -128,6 +157,10 @@ class RuntimeSupervisor:
     ) -> T:
         """Run a synchronous function under bounded, observable supervision.
 
+        Kinds in ``DB_JOB_KINDS`` run on the dedicated ``lgrep-db`` pool;
+        everything else (indexing, maintenance, symbol work) shares the
+        general ``lgrep-worker`` pool.
+
         Args:
             kind: Job kind label for diagnostics (e.g. "index_all", "search_vector").
             caller: Tool name that initiated the work.
@@ -148,7 +181,8 @@ class RuntimeSupervisor:
             self._mark_started(job.id)
             return fn(*args, **kwargs)
 
-        future = self._executor.submit(invoke)
+        executor = self._db_executor if kind in DB_JOB_KINDS else self._executor
+        future = executor.submit(invoke)
         with self._lock:
             job.future = future
         future.add_done_callback(
@@ -194,6 +228,7 @@ class RuntimeSupervisor:
                     if job.id in self._active and job.status not in TERMINAL_STATUSES:
                         job.status = JobStatus.CANCEL_REQUESTED
         self._executor.shutdown(wait=False, cancel_futures=cancel_futures)
+        self._db_executor.shutdown(wait=False, cancel_futures=cancel_futures)
 
     def _create_job(self, *, kind: str, caller: str, project: str | None) -> RuntimeJob:
         job_id = f"job-{next(self._counter):08d}"
@@ -0,0 +1,213 @@
+"""Per-project cache of recently served semantic search results.
+
+Agents iterating on a task tend to re-ask the same question, verbatim or in
+slightly different words.  ``SearchCache`` answers verbatim repeats from an
+exact-match table before the query is even embedded, and otherwise compares
+the query vector against recent searches, handing back the earlier result
+when it is close enough by cosine similarity instead of running another
+LanceDB search.
+
+Entries are only valid for the ``ChunkStore.write_version`` they were computed
+against; any write to the store clears the cache on the next lookup.
+"""
+
+from __future__ import annotations
+
+import itertools
+import os
+from collections import OrderedDict
+from typing import Any
+
+import numpy as np
+
+try:
+    import simsimd
+except ImportError:
+    simsimd = None  # optional extra: pip install "lgrep[simsimd]"
+
+DEFAULT_SEMCACHE_SIZE = 64
+DEFAULT_SEMCACHE_THRESHOLD = 0.97
+EXACT_CACHE_SIZE = 256
+
+
+def _size_from_env() -> int:
+    raw = os.environ.get("LGREP_SEMCACHE_SIZE")
+    if not raw:
+        return DEFAULT_SEMCACHE_SIZE
+    try:
+        value = int(raw)
+    except ValueError:
+        return DEFAULT_SEMCACHE_SIZE
+    return max(0, value)
+
+
+def _threshold_from_env() -> float:
+    raw = os.environ.get("LGREP_SEMCACHE_THRESHOLD")
+    if not raw:
+        return DEFAULT_SEMCACHE_THRESHOLD
+    try:
+        return float(raw)
+    except ValueError:
+        return DEFAULT_SEMCACHE_THRESHOLD
+
+
+def _int8_from_env() -> bool:
+    value = os.environ.get("LGREP_SEMCACHE_INT8", "1").strip().lower()
+    return value not in ("0", "false", "no", "off")
+
+
+def _normalize(vector: list[float]) -> np.ndarray | None:
+    unit = np.asarray(vector, dtype=np.float32)
+    norm = float(np.linalg.norm(unit))
+    if norm == 0.0:
+        return None
+    return unit / norm
+
+
+def _quantize(unit: np.ndarray) -> tuple[np.ndarray, float]:
+    """Return int8 codes for a non-zero unit vector and the scale undoing them."""
+    scale = float(np.abs(unit).max()) / 127
+    return np.rint(unit / scale).astype(np.int8), scale
+
+
+def _mode(hybrid: bool, limit: int) -> int:
+    """Pack ``(hybrid, limit)`` into one int so entries filter with a compare."""
+    return limit * 2 + int(hybrid)
+
+
+class SearchCache:
+    """Bounded LRUs of recent search results for one project.
+
+    ``get_exact`` is a dict lookup on ``(query, limit, hybrid)`` over at most
+    ``EXACT_CACHE_SIZE`` entries.  ``get`` scores every remembered query
+    vector with one matrix-vector product over a preallocated
+    ``(max_size, dim)`` matrix; only entries with the same ``hybrid`` and
+    ``limit`` can match.  All methods are synchronous and run on the event
+    loop, so no lock is needed.
+
+    Remembered vectors are stored as int8 codes with a per-row scale, a
+    quarter of the float32 footprint.  The rounding moves cosine scores by
+    well under 0.01, far below the gap between a paraphrase and an unrelated
+    query.  With the optional ``simsimd`` package the query is quantized too
+    and scored by its int8 cosine kernel straight off the codes; otherwise
+    NumPy widens the codes for a float product.  ``int8=False`` (or
+    ``LGREP_SEMCACHE_INT8=0``) keeps float32 unit vectors instead, for
+    comparing scores against the exact cosine.
+    """
+
+    def __init__(
+        self,
+        max_size: int | None = None,
+        threshold: float | None = None,
+        int8: bool | None = None,
+    ) -> None:
+        self.max_size = _size_from_env() if max_size is None else max_size
+        self.threshold = _threshold_from_env() if threshold is None else threshold
+        self.int8 = _int8_from_env() if int8 is None else int8
+        self._version: int | None = None
+        self._clock = itertools.count(1)
+        # Slot arrays, allocated on the first put once the width is known.
+        self._codes: np.ndarray | None = None
+        self._scales = np.zeros(max(self.max_size, 0), dtype=np.float32)
+        self._modes = np.zeros(max(self.max_size, 0), dtype=np.int64)
+        self._last_used = np.zeros(max(self.max_size, 0), dtype=np.int64)
+        self._results: list[dict[str, Any] | None] = [None] * max(self.max_size, 0)
+        self._count = 0
+        self._exact: OrderedDict[tuple[str, int, bool], dict[str, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _sync_version(self, version: int) -> None:
+        if version != self._version:
+            self._drop_vectors()
+            self._exact.clear()
+            self._version = version
+
+    def _drop_vectors(self) -> None:
+        self._count = 0
+        self._results = [None] * max(self.max_size, 0)
+
+    def get_exact(
+        self, query: str, *, hybrid: bool, limit: int, version: int
+    ) -> dict[str, Any] | None:
+        """Return the stored result for this exact query, if any."""
+        if self.max_size <= 0:
+            return None
+        self._sync_version(version)
+        key = (query, limit, hybrid)
+        result = self._exact.get(key)
+        if result is not None:
+            self._exact.move_to_end(key)
+        return result
+
+    def get(
+        self, vector: list[float], *, hybrid: bool, limit: int, version: int
+    ) -> dict[str, Any] | None:
+        """Return the stored result for the most similar prior query, if any."""
+        if self.max_size <= 0:
+            return None
+        self._sync_version(version)
+        if self._count == 0 or self._codes is None:
+            return None
+        unit = _normalize(vector)
+        if unit is None or unit.shape[0] != self._codes.shape[1]:
+            return None
+        count = self._count
+        if simsimd is not None:
+            # Cosine ignores the per-row scales, so the codes compare directly.
+            query = _quantize(unit)[0] if self.int8 else unit
+            distances = simsimd.cdist(query[None, :], self._codes[:count], metric="cosine")
+            scores = 1.0 - np.asarray(distances)[0]
+        else:
+            scores = (self._codes[:count] @ unit) * self._scales[:count]
+        scores[self._modes[:count] != _mode(hybrid, limit)] = -np.inf
+        best = int(scores.argmax())
+        if scores[best] < self.threshold:
+            return None
+        self._last_used[best] = next(self._clock)
+        return self._results[best]
+
+    def put(
+        self,
+        query: str,
+        vector: list[float],
+        result: dict[str, Any],
+        *,
+        hybrid: bool,
+        limit: int,
+        version: int,
+    ) -> None:
+        """Remember ``result`` as the answer for ``query``/``vector`` at ``version``."""
+        if self.max_size <= 0:
+            return
+        self._sync_version(version)
+        self._exact[(query, limit, hybrid)] = result
+        self._exact.move_to_end((query, limit, hybrid))
+        while len(self._exact) > EXACT_CACHE_SIZE:
+            self._exact.popitem(last=False)
+        unit = _normalize(vector)
+        if unit is None:
+            return
+        if self._codes is None or self._codes.shape[1] != unit.shape[0]:
+            dtype = np.int8 if self.int8 else np.float32
+            self._codes = np.empty((self.max_size, unit.shape[0]), dtype=dtype)
+            self._drop_vectors()
+        if self._count < self.max_size:
+            slot = self._count
+            self._count += 1
+        else:
+            slot = int(self._last_used.argmin())
+        if self.int8:
+            # unit is non-zero, so its largest component is too.
+            self._codes[slot], self._scales[slot] = _quantize(unit)
+        else:
+            self._codes[slot], self._scales[slot] = unit, 1.0
+        self._modes[slot] = _mode(hybrid, limit)
+        self._last_used[slot] = next(self._clock)
+        self._results[slot] = result
+
+    def clear(self) -> None:
+        self._drop_vectors()
+        self._exact.clear()
+        self._version = None
@@ -8,13 +8,14 @@ from __future__ import annotations
 
 import os
 import time
-from typing import TYPE_CHECKING, Annotated
+from typing import Annotated
 
 from mcp.server.fastmcp import Context  # noqa: TC002
 from mcp.types import ToolAnnotations
 from pydantic import Field
 
 from lgrep.server import mcp, time_tool
+from lgrep.server.lifecycle import _app_context
 from lgrep.server.responses import (  # noqa: TC001
     DiagnosticsResult,
     LoadedProjectEntry,
@@ -22,9 +23,6 @@ from lgrep.server.responses import (  # noqa: TC001
 )
 from lgrep.server.runtime import JobStatus
 
-if TYPE_CHECKING:
-    from lgrep.server.lifecycle import LgrepContext
-
 
 @mcp.tool(
     description=(
@@ -52,9 +50,7 @@ async def lgrep_diagnostics(
     disk work. Never includes secrets, environment variables, or raw
     tracebacks.
     """
-    app_ctx: LgrepContext | None = None
-    if ctx is not None:
-        app_ctx = ctx.request_context.lifespan_context
+    app_ctx = _app_context(ctx)
 
     # Process info
     pid = os.getpid()
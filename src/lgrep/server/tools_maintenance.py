@@ -19,6 +19,7 @@ from mcp.types import ToolAnnotations
 from pydantic import Field
 
 from lgrep.server import mcp, time_tool
+from lgrep.server.lifecycle import _app_context
 from lgrep.server.responses import (
     PruneOrphansResult,  # noqa: TC001 — FastMCP evaluates return annotation at runtime
     PruneSymbolsResult,  # noqa: TC001
@@ -40,9 +41,7 @@ async def _run_blocking(
     *args,
     **kwargs,
 ):
-    app_ctx = None
-    if ctx is not None:
-        app_ctx = ctx.request_context.lifespan_context
+    app_ctx = _app_context(ctx)
     if app_ctx is not None:
         return await app_ctx.runtime.run_blocking(
             kind,
@@ -114,8 +113,8 @@ async def prune_orphans(
     """
     t0 = time.monotonic()
     active_set: list[str] = []
-    if ctx is not None:
-        app_ctx = ctx.request_context.lifespan_context
+    app_ctx = _app_context(ctx)
+    if app_ctx is not None:
         active_set = list(app_ctx.projects.keys())
 
     effective_dry_run = dry_run
@@ -169,8 +168,8 @@ async def prune_symbols(
     """
     t0 = time.monotonic()
     active_set: list[str] = []
-    if ctx is not None:
-        app_ctx = ctx.request_context.lifespan_context
+    app_ctx = _app_context(ctx)
+    if app_ctx is not None:
         active_set = list(app_ctx.projects.keys())
 
     effective_dry_run = dry_run
@@ -252,8 +251,8 @@ async def invalidate_worktree_cache(
     )
 
     # Remove invalidated paths from in-memory server state
-    if ctx is not None:
-        app_ctx = ctx.request_context.lifespan_context
+    app_ctx = _app_context(ctx)
+    if app_ctx is not None:
         from pathlib import Path
 
         for entry in entries:
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import os
 import time
@@ -12,15 +13,20 @@ from mcp.server.fastmcp import Context  # noqa: TC002
 from mcp.types import ToolAnnotations
 from pydantic import Field
 
-from lgrep.server import log, mcp, time_tool
+from lgrep.exceptions import DimensionMismatchError
+from lgrep.server import _DEBUG_ON, _INFO_ON, log, mcp, time_tool
 from lgrep.server.lifecycle import (
     LgrepContext,
     ProjectState,
+    _app_context,
     _ensure_project_initialized,
     _ensure_search_project_state,
+    _gather_project_stats,
     _get_project_stats,
+    _resolve_project_path,
     _schedule_background_reindex,
     _stop_watcher,
+    _validate_dir,
 )
 from lgrep.server.responses import (
     IndexSemanticResult,
@@ -40,11 +46,48 @@ if TYPE_CHECKING:
     from collections.abc import Callable
     from typing import Any
 
+_CONTEXT_MISSING = "Internal error: Context missing"
+_QUERY_MISSING = "Internal error: query or q is required"
+_NO_API_KEY = "VOYAGE_API_KEY not set. Cannot perform semantic search."
+
+# Chunk text returned per search hit is capped at this many UTF-8 bytes; 0
+# returns whole chunks.
+DEFAULT_MAX_SNIPPET_BYTES = 2048
+
+
+def _snippet_bytes_from_env() -> int:
+    raw = os.environ.get("LGREP_MAX_SNIPPET_BYTES")
+    if not raw:
+        return DEFAULT_MAX_SNIPPET_BYTES
+    try:
+        return max(0, int(raw))
+    except ValueError:
+        return DEFAULT_MAX_SNIPPET_BYTES
+
+
+MAX_SNIPPET_BYTES = _snippet_bytes_from_env()
+
 # ---------------------------------------------------------------------------
 # Internal helpers
 # ---------------------------------------------------------------------------
 
 
+def _clip_snippet(content: str, max_bytes: int) -> str | None:
+    """Return ``content`` cut to ``max_bytes`` UTF-8 bytes, or None if it fits.
+
+    The cut falls on the last line break inside the budget when there is one,
+    so a clipped snippet still ends on a whole line.
+    """
+    if max_bytes <= 0 or len(content) * 4 <= max_bytes:
+        return None
+    encoded = content.encode("utf-8")
+    if len(encoded) <= max_bytes:
+        return None
+    clipped = encoded[:max_bytes].decode("utf-8", errors="ignore")
+    line_end = clipped.rfind("\n")
+    return clipped[: line_end + 1] if line_end > 0 else clipped
+
+
 async def _run_blocking(
     app_ctx: LgrepContext,
     kind: str,
@@ -170,10 +213,11 @@ def _check_staleness(state: ProjectState) -> tuple[bool, int]:
                 )
                 return False, 0
             try:
-                content = fp.read_bytes()
+                # Streamed like Indexer._hash_file, rather than read whole.
+                with fp.open("rb") as f:
+                    current_hash = hashlib.file_digest(f, "sha256").hexdigest()
             except OSError:
                 continue
-            current_hash = hashlib.sha256(content).hexdigest()
             if stored.get(rel) != current_hash:
                 return True, len(suspects)
 
@@ -192,9 +236,38 @@ async def _execute_search(
     hybrid: bool,
     project_path: str,
 ) -> SearchSemanticResult | ToolError:
-    """Run embedding + storage search and return structured result."""
+    """Run embedding + storage search and return structured result.
+
+    Identical searches (same query, limit and mode) already in flight for
+    the project share the running one's result instead of repeating it.
+    """
     if app_ctx.embedder is None:
-        return error_response("VOYAGE_API_KEY not set. Cannot perform semantic search.")
+        return error_response(_NO_API_KEY)
+    key = (query, limit, hybrid)
+    task = state.inflight_searches.get(key)
+    if task is None:
+        # Register before the first await, so the check-and-set needs no lock.
+        task = asyncio.ensure_future(
+            _run_search(app_ctx, state, query, limit, hybrid, project_path)
+        )
+        state.inflight_searches[key] = task
+        task.add_done_callback(lambda _: state.inflight_searches.pop(key, None))
+    elif _DEBUG_ON:
+        log.debug("search_joined_inflight", project=project_path)
+    # Shielded so one caller timing out does not cancel the search for the
+    # others joined to it.
+    return await asyncio.shield(task)
+
+
+async def _run_search(
+    app_ctx: LgrepContext,
+    state: ProjectState,
+    query: str,
+    limit: int,
+    hybrid: bool,
+    project_path: str,
+) -> SearchSemanticResult | ToolError:
+    """Body of ``_execute_search`` for the caller that owns the search."""
     try:
         # Auto-staleness pre-flight: cheap mtime gate, then hash check on the
         # suspect subset only. If drift is confirmed, re-index synchronously
@@ -217,7 +290,21 @@ async def _execute_search(
             # Serve the current (possibly stale) index immediately. The reindex
             # itself is NOT awaited — only the cheap scheduler (lock + create_task).
 
+        # Read the version before searching so a write racing the search
+        # invalidates the entry instead of being masked by it.
+        version = state.db.write_version
+        cached = state.search_cache.get_exact(query, hybrid=hybrid, limit=limit, version=version)
+        if cached is not None:
+            if _DEBUG_ON:
+                log.debug("search_cache_exact_hit", project=project_path)
+            return SearchSemanticResult(**cached)
+
         query_vector = await app_ctx.embedder.embed_query_async(query)
+        cached = state.search_cache.get(query_vector, hybrid=hybrid, limit=limit, version=version)
+        if cached is not None:
+            if _DEBUG_ON:
+                log.debug("search_cache_hit", project=project_path)
+            return SearchSemanticResult(**{**cached, "query": query})
         if hybrid:
             results = await _run_blocking(
                 app_ctx,
@@ -241,8 +328,9 @@ async def _execute_search(
             )
         # Explicit key mapping: construct SearchChunk dicts with line_number
         # mapped from SearchResult.start_line, preserving fidelity fields.
-        chunks = [
-            {
+        chunks = []
+        for r in results.results:
+            chunk = {
                 "file_path": r.file_path,
                 "line_number": r.start_line,
                 "content": r.content,
@@ -251,15 +339,25 @@ async def _execute_search(
                 "end_line": r.end_line,
                 "match_type": r.match_type,
             }
-            for r in results.results
-        ]
-        return SearchSemanticResult(
+            clipped = _clip_snippet(r.content, MAX_SNIPPET_BYTES)
+            if clipped is not None:
+                chunk["content"] = clipped
+                chunk["truncated"] = True
+            chunks.append(chunk)
+        result = SearchSemanticResult(
             results=chunks,
             total=len(chunks),
             query=query,
             path=project_path,
             engine="hybrid" if hybrid else "vector",
         )
+        state.search_cache.put(
+            query, query_vector, result, hybrid=hybrid, limit=limit, version=version
+        )
+        return result
+    except DimensionMismatchError as e:
+        log.warning("search_dimension_mismatch", project=project_path, error=str(e))
+        return error_response(str(e))
     except Exception as e:
         log.exception("search_failed", project=project_path, error=str(e))
         return error_response("Search failed. Check server logs for details.")
@@ -314,16 +412,16 @@ async def search_semantic(
     query = query or q
     limit = m if m is not None else limit
 
-    log.info("lgrep_search_semantic", query=query, project=path, limit=limit, hybrid=hybrid)
+    if _INFO_ON:
+        log.info("lgrep_search_semantic", query=query, project=path, limit=limit, hybrid=hybrid)
 
     if not query:
-        return error_response("Internal error: query or q is required")
-
-    if not ctx:
-        return error_response("Internal error: Context missing")
+        return error_response(_QUERY_MISSING)
 
-    app_ctx: LgrepContext = ctx.request_context.lifespan_context
-    project_path = str(Path(path).resolve())
+    app_ctx = _app_context(ctx)
+    if app_ctx is None:
+        return error_response(_CONTEXT_MISSING)
+    project_path = _resolve_project_path(path)
 
     result = await _ensure_search_project_state(app_ctx, path)
     if isinstance(result, dict) and "error" in result:
@@ -358,17 +456,18 @@ async def index_semantic(
     Returns:
         Indexing status including file count, chunk count, and duration.
     """
-    log.info("lgrep_index_semantic", project=path)
-
-    if not ctx:
-        return error_response("Internal error: Context missing")
+    if _INFO_ON:
+        log.info("lgrep_index_semantic", project=path)
 
-    app_ctx: LgrepContext = ctx.request_context.lifespan_context
+    app_ctx = _app_context(ctx)
+    if app_ctx is None:
+        return error_response(_CONTEXT_MISSING)
 
     # Validate path
-    project_path = Path(path).resolve()
-    if not project_path.exists() or not project_path.is_dir():
-        return error_response(f"Path does not exist or is not a directory: {path}")
+    project_path = Path(_resolve_project_path(path))
+    invalid = _validate_dir(project_path, path)
+    if invalid is not None:
+        return invalid
 
     # Initialize components if project not yet cached
     result = await _ensure_project_initialized(app_ctx, project_path)
@@ -408,7 +507,8 @@ async def index_semantic(
 @mcp.tool(
     description=(
         "Return semantic index status and stats (files, chunks, watcher state). "
-        "Use with a path for one repo, or omit path for all loaded repos. "
+        "Use with a path for one repo, or omit path for all loaded repos "
+        "(set deep=true to include counts for each). "
         "MCP tool call only; do not invoke via shell."
     ),
     annotations=ToolAnnotations(readOnlyHint=True, idempotentHint=True, openWorldHint=False),
@@ -419,58 +519,74 @@ async def status_semantic(
         str,
         Field(description="Optional absolute repository path; omit to list all loaded projects."),
     ] = "",
+    deep: Annotated[
+        bool,
+        Field(
+            description=(
+                "With no path, read file/chunk counts for every loaded project "
+                "instead of the cheap memory-only summary."
+            )
+        ),
+    ] = False,
     ctx: Context | None = None,
 ) -> StatusSemanticResult | StatusAllProjectsResult | ToolError:
     """Get index status and statistics.
 
     Args:
         path: Absolute path to project (optional). If omitted, returns stats for all indexed projects.
+        deep: With no path, gather per-project counts concurrently (bounded)
+            instead of the memory-only summary.
 
     Returns:
         Index stats: files, chunks, watching status.
     """
-    log.info("lgrep_status_semantic", project=path or "(all)")
-
-    if not ctx:
-        return error_response("Internal error: Context missing")
+    if _INFO_ON:
+        log.info("lgrep_status_semantic", project=path or "(all)")
 
-    app_ctx: LgrepContext = ctx.request_context.lifespan_context
+    app_ctx = _app_context(ctx)
+    if app_ctx is None:
+        return error_response(_CONTEXT_MISSING)
 
     if path:
         # Single-project status
-        project_path = str(Path(path).resolve())
+        project_path = _resolve_project_path(path)
         state = app_ctx.projects.get(project_path)
 
-        # Fallback: read stats directly from disk cache (no API key needed)
+        # Fallback: read stats directly from disk cache (no API key needed).
+        # The cache probe runs in the worker too: with LGREP_WORKTREE_DEDUP
+        # resolving the cache dir shells out to git.
         if not state:
-            if has_disk_cache(project_path):
+
+            def _read_disk_stats() -> tuple[int, int] | None:
+                if not has_disk_cache(project_path):
+                    return None
                 log.info("status_reading_disk_cache", project=project_path)
-                try:
-
-                    def _read_disk_stats():
-                        db_path = get_project_db_path(project_path)
-                        store = ChunkStore(db_path, project_path=project_path)
-                        chunks = store.count_chunks()
-                        files_set = store.get_indexed_files()
-                        return len(files_set), chunks
-
-                    file_count, chunk_count = await _run_blocking(
-                        app_ctx,
-                        "status_disk_cache_stats",
-                        "status_semantic",
-                        project_path,
-                        _read_disk_stats,
-                    )
-                    return StatusSemanticResult(
-                        files=file_count,
-                        chunks=chunk_count,
-                        watching=False,
-                        project=project_path,
-                        disk_cache=True,
-                        error=None,
-                    )
-                except Exception as e:
-                    log.warning("disk_cache_read_failed", project=project_path, error=str(e))
+                db_path = get_project_db_path(project_path)
+                store = ChunkStore(db_path, project_path=project_path)
+                chunks, files_set = store.get_stats()
+                return len(files_set), chunks
+
+            try:
+                disk_stats = await _run_blocking(
+                    app_ctx,
+                    "status_disk_cache_stats",
+                    "status_semantic",
+                    project_path,
+                    _read_disk_stats,
+                )
+            except Exception as e:
+                log.warning("disk_cache_read_failed", project=project_path, error=str(e))
+                disk_stats = None
+            if disk_stats is not None:
+                file_count, chunk_count = disk_stats
+                return StatusSemanticResult(
+                    files=file_count,
+                    chunks=chunk_count,
+                    watching=False,
+                    project=project_path,
+                    disk_cache=True,
+                    error=None,
+                )
 
             return StatusSemanticResult(
                 files=0, chunks=0, watching=False, project=project_path, disk_cache=None, error=None
@@ -490,6 +606,10 @@ async def status_semantic(
     if not app_ctx.projects:
         return StatusAllProjectsResult(projects=[])
 
+    if deep:
+        stats = await _gather_project_stats(app_ctx.projects, app_ctx.runtime)
+        return StatusAllProjectsResult(projects=[StatusSemanticResult(**entry) for entry in stats])
+
     # Cheap memory-only summary: no global LanceDB/database fanout by default.
     projects_status = [
         _cheap_project_status(proj_path, state) for proj_path, state in app_ctx.projects.items()
@@ -523,24 +643,31 @@ async def watch_start_semantic(
     Returns:
         Watching status.
     """
-    log.info("lgrep_watch_start_semantic", project=path)
+    if _INFO_ON:
+        log.info("lgrep_watch_start_semantic", project=path)
+
+    app_ctx = _app_context(ctx)
+    if app_ctx is None:
+        return error_response(_CONTEXT_MISSING)
 
-    if not ctx:
-        return error_response("Internal error: Context missing")
+    path_key = _resolve_project_path(path)
 
-    app_ctx: LgrepContext = ctx.request_context.lifespan_context
+    # A live watcher already holds the directory; answer without touching disk.
+    state = app_ctx.projects.get(path_key)
+    if state is not None and state.watching and state.watcher:
+        return WatchStartResult(path=path_key, watching=True, message="Already watching")
 
     # 1. Validate path
-    project_path = Path(path).resolve()
-    if not project_path.exists() or not project_path.is_dir():
-        return error_response(f"Path does not exist or is not a directory: {path}")
+    project_path = Path(path_key)
+    invalid = _validate_dir(project_path, path)
+    if invalid is not None:
+        return invalid
 
     # 2. Initialize project components if needed
     result = await _ensure_project_initialized(app_ctx, project_path)
     if isinstance(result, dict):
         return result  # Already a ToolError dict from lifecycle
     state = result
-    path_key = str(project_path)
 
     # 3. Start watcher
     if state.watching and state.watcher:
@@ -584,16 +711,16 @@ async def watch_stop_semantic(
     Returns:
         Stopped status.
     """
-    log.info("lgrep_watch_stop_semantic", project=path or "(all)")
-
-    if not ctx:
-        return error_response("Internal error: Context missing")
+    if _INFO_ON:
+        log.info("lgrep_watch_stop_semantic", project=path or "(all)")
 
-    app_ctx: LgrepContext = ctx.request_context.lifespan_context
+    app_ctx = _app_context(ctx)
+    if app_ctx is None:
+        return error_response(_CONTEXT_MISSING)
 
     if path:
         # Stop a specific project's watcher
-        project_path = str(Path(path).resolve())
+        project_path = _resolve_project_path(path)
         state = app_ctx.projects.get(project_path)
         if not state or not state.watching or not state.watcher:
             return WatchStopResult(stopped=True, project=None, message="Not watching")
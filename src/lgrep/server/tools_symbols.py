@@ -5,7 +5,6 @@ from __future__ import annotations
 import asyncio
 import time
 from functools import partial
-from pathlib import Path
 from typing import Annotated
 
 from mcp.server.fastmcp import Context  # noqa: TC002
@@ -13,6 +12,7 @@ from mcp.types import ToolAnnotations
 from pydantic import Field
 
 from lgrep.server import mcp, time_tool
+from lgrep.server.lifecycle import _app_context, _resolve_project_path
 from lgrep.server.responses import (
     GetFileOutlineResult,
     GetFileTreeResult,
@@ -371,12 +371,12 @@ async def search_text(
     Returns:
         Results list and meta envelope.
     """
-    if ctx is not None:
-        app_ctx = ctx.request_context.lifespan_context
+    app_ctx = _app_context(ctx)
+    if app_ctx is not None:
         result = await app_ctx.runtime.run_blocking(
             "search_text",
             "search_text",
-            str(Path(path).resolve()),
+            _resolve_project_path(path),
             _search_text,
             query,
             path,
@@ -533,9 +533,9 @@ async def search_references(
     Returns:
         Candidate occurrences, candidate names, disclaimer, and meta envelope.
     """
-    resolved_path = str(Path(path).resolve())
-    if ctx is not None:
-        app_ctx = ctx.request_context.lifespan_context
+    resolved_path = _resolve_project_path(path)
+    app_ctx = _app_context(ctx)
+    if app_ctx is not None:
         # Bind the tool arguments before crossing the supervisor boundary.
         # run_blocking() owns the names kind/caller/project/fn/cancel_event, so a
         # bare kind= kwarg would bind to the supervisor's own job-kind parameter.
@@ -16,9 +16,14 @@ from lgrep.storage._chunk_store import (  # noqa: F401
     SearchResult,
     SearchResults,
     canonical_repo_key,
+    chunk_model_for,
     discover_cached_projects,
     get_project_db_path,
     has_disk_cache,
     read_project_meta,
     write_project_meta,
 )
+from lgrep.storage.embedding_cache import (  # noqa: F401
+    EmbeddingCache,
+    open_default_embedding_cache,
+)
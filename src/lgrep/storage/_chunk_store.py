@@ -7,21 +7,30 @@ Supports hybrid search (vector + FTS) with RRF reranking.
 from __future__ import annotations
 
 import contextlib
+import functools
 import hashlib
 import json
+import math
 import os
 import subprocess
+import threading
 import time
 from dataclasses import dataclass, field
+from itertools import chain
 from pathlib import Path
 from typing import TYPE_CHECKING
 
 import lancedb
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
 import structlog
 from lancedb.pydantic import LanceModel, Vector
 from lancedb.rerankers import RRFReranker
 from pydantic import Field
 
+from lgrep.exceptions import DimensionMismatchError
+
 if TYPE_CHECKING:
     from lancedb import DBConnection
     from lancedb.table import Table
@@ -37,10 +46,22 @@ EMBEDDING_DIM = 1024
 # Table name
 CHUNKS_TABLE = "chunks"
 
+# Paths per ``file_path IN (...)`` predicate in ``delete_by_files``, keeping
+# each predicate a manageable size for LanceDB's SQL parser.
+DELETE_BATCH_SIZE = 500
+
+# Retrain the vector index once the table has grown this much since it was
+# built; until then new rows are found by the flat scan of the unindexed tail.
+VECTOR_INDEX_REBUILD_GROWTH = 1.2
+
 # File storing paths known to produce zero chunks, so staleness checks do not
 # keep re-attempting them after a complete index window.
 _ZERO_CHUNK_FILES_FILENAME = "zero_chunk_files.json"
 
+# File mapping relative paths to the (mtime_ns, size, sha256) they had when
+# last hashed, so unchanged files can skip re-reading on freshness checks.
+_FILE_STATS_FILENAME = "file_stats.json"
+
 
 def _escape_sql_string(value: str) -> str:
     """Escape a string for use in a LanceDB SQL predicate.
@@ -69,6 +90,58 @@ class CodeChunk(LanceModel):
     indexed_at: float = Field(description="Unix timestamp of indexing")
 
 
+@functools.cache
+def chunk_model_for(dimension: int) -> type[CodeChunk]:
+    """Return the CodeChunk model whose vector column is ``dimension`` wide.
+
+    ``CodeChunk`` itself is returned for the default width; other widths
+    (truncated Matryoshka embeddings) get a cached subclass.
+    """
+    if dimension == EMBEDDING_DIM:
+        return CodeChunk
+    return type(
+        f"CodeChunk{dimension}",
+        (CodeChunk,),
+        {
+            "__module__": __name__,
+            "__annotations__": {"vector": Vector(dimension)},
+            "vector": Field(description="Voyage Code 3 embedding"),
+        },
+    )
+
+
+def _vector_dimension(schema: pa.Schema) -> int:
+    """Return the fixed width of the ``vector`` column in ``schema``."""
+    return schema.field("vector").type.list_size
+
+
+def _chunks_to_arrow(chunks: list[CodeChunk]) -> pa.Table:
+    """Build the chunks table column by column.
+
+    Vectors are packed into one contiguous float32 buffer instead of going
+    through per-row ``model_dump`` dicts that LanceDB would re-infer.
+    """
+    schema = type(chunks[0]).to_arrow_schema() if chunks else CodeChunk.to_arrow_schema()
+    columns = []
+    for schema_field in schema:
+        if schema_field.name == "vector":
+            flat = pa.array(chain.from_iterable(c.vector for c in chunks), type=pa.float32())
+            columns.append(pa.FixedSizeListArray.from_arrays(flat, _vector_dimension(schema)))
+        else:
+            values = [getattr(c, schema_field.name) for c in chunks]
+            columns.append(pa.array(values, type=schema_field.type))
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+def _result_rows(results: pa.Table) -> list[dict]:
+    """Convert search hits to row dicts, leaving the vectors in Arrow.
+
+    Callers never read a hit's embedding, and ``to_list()`` would materialize
+    it as ``dimension`` Python floats per row.
+    """
+    return results.select([name for name in results.column_names if name != "vector"]).to_pylist()
+
+
 @dataclass
 class SearchResult:
     """A single search result."""
@@ -101,7 +174,8 @@ def canonical_repo_key(project_path: Path) -> Path:
     Uses ``--path-format=absolute`` to guarantee absolute output
     (Git >= 2.30, January 2021).
     """
-    resolved = project_path.resolve()
+    # realpath rather than Path.resolve, which stats the result afterwards.
+    resolved = Path(os.path.realpath(project_path))
 
     if not os.environ.get("LGREP_WORKTREE_DEDUP"):
         return resolved
@@ -138,6 +212,12 @@ def canonical_repo_key(project_path: Path) -> Path:
     return resolved
 
 
+@functools.lru_cache(maxsize=256)
+def _path_hash(key: str) -> str:
+    """Return the cache directory name for a canonical project key."""
+    return hashlib.sha256(key.encode()).hexdigest()[:12]
+
+
 def get_project_db_path(project_path: str | Path) -> Path:
     """Get the database path for a project.
 
@@ -152,7 +232,7 @@ def get_project_db_path(project_path: str | Path) -> Path:
         Path to the project's LanceDB directory
     """
     key = canonical_repo_key(Path(project_path))
-    path_hash = hashlib.sha256(str(key).encode()).hexdigest()[:12]
+    path_hash = _path_hash(str(key))
 
     cache_dir = Path(os.environ.get("LGREP_CACHE_DIR", DEFAULT_CACHE_DIR))
     return cache_dir / path_hash
@@ -326,13 +406,30 @@ def discover_cached_projects(max_results: int = 20) -> list[str]:
     return [path for _, path in entries[:max_results]]
 
 
+def _vector_index_params(row_count: int, dimension: int) -> dict[str, int]:
+    """Size IVF-PQ for the table: ~sqrt(n) partitions, 16 dims per sub-vector."""
+    params = {"num_partitions": max(1, math.isqrt(row_count))}
+    if dimension >= 16 and dimension % 16 == 0:
+        params["num_sub_vectors"] = dimension // 16
+    return params
+
+
 class ChunkStore:
     """LanceDB-backed storage for code chunks.
 
     Provides vector and hybrid search over indexed code chunks.
+
+    ``write_version`` is bumped by every chunk write through this store, so
+    callers can tell whether results they derived earlier are still current.
+    Writes made by another process against the same directory are not seen.
     """
 
-    def __init__(self, db_path: str | Path, project_path: str | Path | None = None) -> None:
+    def __init__(
+        self,
+        db_path: str | Path,
+        project_path: str | Path | None = None,
+        dimension: int | None = None,
+    ) -> None:
         """Initialize the chunk store.
 
         Args:
@@ -345,8 +442,14 @@ class ChunkStore:
                 may pass ``None`` to skip metadata persistence — no
                 `project_meta.json` is created in that case. Writing the
                 hash dir as project_path would corrupt orphan detection.
+            dimension: Embedding width for a new table (``EMBEDDING_DIM``
+                when ``None``). An existing table always keeps its own
+                width, which ``self.dimension`` then reports; opening a
+                store never drops data. Only the indexer rebuilds a table of
+                another width, through ``reset_dimension``.
         """
         self.db_path = Path(db_path)
+        self.dimension = dimension or EMBEDDING_DIM
         # NOTE: when project_path is None we intentionally keep
         # self._project_path as None so the metadata side-effect is
         # skipped below. Do not fall back to db_path — it would record
@@ -374,8 +477,16 @@ class ChunkStore:
             self.db = lancedb.connect(str(self.db_path))
 
         self._table: Table | None = None
+        # Per-thread float32 buffer that query vectors are copied into, so
+        # LanceDB reads one contiguous array instead of a list of floats.
+        self._query_buffers = threading.local()
+        self.write_version = 0
         self._fts_indexed = False
         self._vector_indexed = False
+        # Row count the vector index was trained on; None until known.
+        self._vector_indexed_rows: int | None = None
+        # (write_version, row count) from the last count at that version.
+        self._row_count: tuple[int, int] | None = None
         self._persist_meta()
 
         log.info("chunk_store_connected", db_path=str(self.db_path))
@@ -404,10 +515,7 @@ class ChunkStore:
                 log.debug("chunk_table_opened", rows=self._table.count_rows())
             except (FileNotFoundError, ValueError) as _not_found:
                 # Table doesn't exist yet — normal first-run path
-                self._table = self.db.create_table(
-                    CHUNKS_TABLE,
-                    schema=CodeChunk.to_arrow_schema(),
-                )
+                self._table = self._create_table()
                 created = True
                 log.info("chunk_table_created")
             except Exception as open_err:
@@ -421,16 +529,50 @@ class ChunkStore:
                     self.db.drop_table(CHUNKS_TABLE, ignore_missing=True)
                 except Exception as drop_err:
                     log.debug("drop_table_also_failed", error=str(drop_err))
-                self._table = self.db.create_table(
-                    CHUNKS_TABLE,
-                    schema=CodeChunk.to_arrow_schema(),
-                )
+                self._table = self._create_table()
                 created = True
                 log.info("chunk_table_recreated_after_corruption")
             if not created:
+                self.dimension = _vector_dimension(self._table.schema)
                 self._probe_existing_indexes()
         return self._table
 
+    def _create_table(self) -> Table:
+        """Create an empty chunks table at ``self.dimension``."""
+        self.write_version += 1
+        return self.db.create_table(
+            CHUNKS_TABLE,
+            schema=chunk_model_for(self.dimension).to_arrow_schema(),
+        )
+
+    def reset_dimension(self, dimension: int) -> bool:
+        """Recreate the table empty if it holds vectors of another width.
+
+        Called by the indexer before a full pass: vectors of different widths
+        cannot be compared, so the index has to be rebuilt from scratch.
+        Search paths never call this.
+
+        Returns:
+            True if the table was dropped and recreated
+        """
+        existing = _vector_dimension(self.table.schema)
+        if existing == dimension:
+            return False
+        log.warning(
+            "chunk_table_dimension_changed",
+            db_path=str(self.db_path),
+            table_dimension=existing,
+            dimension=dimension,
+            action="dropping and recreating table",
+        )
+        self.db.drop_table(CHUNKS_TABLE, ignore_missing=True)
+        self.dimension = dimension
+        self._table = self._create_table()
+        self._fts_indexed = False
+        self._vector_indexed = False
+        self._vector_indexed_rows = None
+        return True
+
     def _probe_existing_indexes(self) -> None:
         """Best-effort probe for indexes persisted by LanceDB.
 
@@ -464,9 +606,8 @@ class ChunkStore:
         if not chunks:
             return 0
 
-        # Convert to dicts for LanceDB
-        data = [chunk.model_dump() for chunk in chunks]
-        self.table.add(data)
+        self.table.add(_chunks_to_arrow(chunks))
+        self.write_version += 1
 
         log.info("chunks_added", count=len(chunks))
         return len(chunks)
@@ -483,12 +624,13 @@ class ChunkStore:
         if not chunks:
             return 0
 
-        data = [chunk.model_dump() for chunk in chunks]
+        data = _chunks_to_arrow(chunks)
 
         # Use merge_insert for upsert
         self.table.merge_insert(
             "id"
         ).when_matched_update_all().when_not_matched_insert_all().execute(data)
+        self.write_version += 1
 
         log.info("chunks_upserted", count=len(chunks))
         return len(chunks)
@@ -502,15 +644,44 @@ class ChunkStore:
         Returns:
             Number of chunks deleted (approximate)
         """
-        before_count = self.table.count_rows()
+        before_count = self.count_chunks()
         safe_path = _escape_sql_string(file_path)
         self.table.delete(f"file_path = '{safe_path}'")
+        self.write_version += 1
         after_count = self.table.count_rows()
+        self._row_count = (self.write_version, after_count)
 
         deleted = before_count - after_count
         log.info("chunks_deleted", file_path=file_path, count=deleted)
         return deleted
 
+    def delete_by_files(self, file_paths: list[str]) -> int:
+        """Delete all chunks for several files with batched ``IN`` predicates.
+
+        One table delete per ``DELETE_BATCH_SIZE`` paths, instead of one per
+        file.
+
+        Args:
+            file_paths: Relative paths of the files
+
+        Returns:
+            Number of chunks deleted (approximate)
+        """
+        if not file_paths:
+            return 0
+        before_count = self.count_chunks()
+        for start in range(0, len(file_paths), DELETE_BATCH_SIZE):
+            batch = file_paths[start : start + DELETE_BATCH_SIZE]
+            quoted = ", ".join(f"'{_escape_sql_string(path)}'" for path in batch)
+            self.table.delete(f"file_path IN ({quoted})")
+        self.write_version += 1
+        after_count = self.table.count_rows()
+        self._row_count = (self.write_version, after_count)
+
+        deleted = before_count - after_count
+        log.info("chunks_deleted", files=len(file_paths), count=deleted)
+        return deleted
+
     def ensure_fts_index(self) -> None:
         """Ensure the FTS index exists on the content column."""
         if not self._fts_indexed:
@@ -522,19 +693,62 @@ class ChunkStore:
                 log.warning("fts_index_failed", error=str(e))
 
     def prepare_hybrid_indexes(self, vector_index_row_threshold: int = 1000) -> None:
-        """Prepare hybrid-search indexes outside the live query path."""
+        """Prepare hybrid-search indexes outside the live query path.
+
+        The IVF-PQ vector index is trained the first time the table grows
+        past ``vector_index_row_threshold`` rows.  Later reindexes keep it
+        (``replace=False``); rows added since are still found by LanceDB's
+        flat scan of the unindexed tail.  Once the table has grown by
+        ``VECTOR_INDEX_REBUILD_GROWTH`` since training, the index is rebuilt
+        with partitions sized for the new row count.
+        """
         self.ensure_fts_index()
-        row_count = self.table.count_rows()
-        if row_count > vector_index_row_threshold and not self._vector_indexed:
-            try:
-                self.table.create_index(
-                    metric="cosine",
-                    vector_column_name="vector",
-                )
-                self._vector_indexed = True
-                log.info("vector_index_created", rows=row_count)
-            except Exception as idx_err:
-                log.debug("vector_index_create_skipped", error=str(idx_err))
+        row_count = self.count_chunks()
+        if self._vector_indexed:
+            if self._vector_indexed_rows is None:
+                # Index found on disk: measure growth from here.
+                self._vector_indexed_rows = row_count
+            if row_count <= self._vector_indexed_rows * VECTOR_INDEX_REBUILD_GROWTH:
+                return
+        elif row_count <= vector_index_row_threshold:
+            return
+        rebuild = self._vector_indexed
+        try:
+            self.table.create_index(
+                metric="cosine",
+                vector_column_name="vector",
+                replace=rebuild,
+                **_vector_index_params(row_count, self.dimension),
+            )
+            self._vector_indexed = True
+            self._vector_indexed_rows = row_count
+            log.info("vector_index_created", rows=row_count, rebuild=rebuild)
+        except Exception as idx_err:
+            # Most often the index already exists on disk from an earlier run.
+            self._probe_existing_indexes()
+            log.debug("vector_index_create_skipped", error=str(idx_err))
+
+    def _query_array(self, query_vector: list[float]) -> np.ndarray:
+        """Copy ``query_vector`` into this thread's reusable float32 buffer.
+
+        The buffer is overwritten by the next search on the same thread, so
+        the returned array must not outlive the query it is passed to.
+
+        Raises:
+            DimensionMismatchError: if the table holds vectors of another width
+        """
+        if len(query_vector) != self.dimension:
+            raise DimensionMismatchError(
+                f"Index holds {self.dimension}-dim embeddings but the query is "
+                f"{len(query_vector)}-dim (LGREP_EMBED_DIM changed?). Reindex required: "
+                "run lgrep_index or 'lgrep index-semantic'."
+            )
+        buffer = getattr(self._query_buffers, "buffer", None)
+        if buffer is None or buffer.shape[0] != len(query_vector):
+            buffer = np.empty(len(query_vector), dtype=np.float32)
+            self._query_buffers.buffer = buffer
+        buffer[:] = query_vector
+        return buffer
 
     def search_hybrid(
         self,
@@ -566,11 +780,11 @@ class ChunkStore:
         reranker = RRFReranker()
         raw_results = (
             self.table.search(query_type="hybrid")
-            .vector(query_vector)
+            .vector(self._query_array(query_vector))
             .text(query_text)
             .rerank(reranker)
             .limit(limit)
-            .to_list()
+            .to_arrow()
         )
 
         elapsed_ms = (time.perf_counter() - start) * 1000
@@ -584,13 +798,13 @@ class ChunkStore:
                 score=r.get("_relevance_score", r.get("_distance", 0.0)),
                 match_type="hybrid",
             )
-            for r in raw_results
+            for r in _result_rows(raw_results)
         ]
 
         return SearchResults(
             results=results,
             query_time_ms=elapsed_ms,
-            total_chunks=self.table.count_rows(),
+            total_chunks=self.count_chunks(),
         )
 
     def search_vector(
@@ -609,7 +823,7 @@ class ChunkStore:
         """
         start = time.perf_counter()
 
-        raw_results = self.table.search(query_vector).limit(limit).to_list()
+        raw_results = self.table.search(self._query_array(query_vector)).limit(limit).to_arrow()
 
         elapsed_ms = (time.perf_counter() - start) * 1000
 
@@ -622,18 +836,51 @@ class ChunkStore:
                 score=r.get("_distance", 0.0),
                 match_type="vector",
             )
-            for r in raw_results
+            for r in _result_rows(raw_results)
         ]
 
         return SearchResults(
             results=results,
             query_time_ms=elapsed_ms,
-            total_chunks=self.table.count_rows(),
+            total_chunks=self.count_chunks(),
         )
 
+    def prewarm(self) -> bool:
+        """Fault in index pages with throwaway queries so the first real
+        search does not pay the cold-cache cost.
+
+        Issues a k=1 vector search and, when the FTS index is ready, a
+        one-token full-text search.  Failures are logged and ignored.
+
+        Returns:
+            True if the table had rows to warm
+        """
+        if self.count_chunks() == 0:
+            return False
+        probe = [1.0] + [0.0] * (self.dimension - 1)
+        try:
+            self.table.search(probe).limit(1).to_list()
+        except Exception as e:
+            log.debug("prewarm_vector_failed", error=str(e))
+        if self._fts_indexed:
+            try:
+                self.table.search("def", query_type="fts").limit(1).to_list()
+            except Exception as e:
+                log.debug("prewarm_fts_failed", error=str(e))
+        return True
+
     def count_chunks(self) -> int:
-        """Get total chunk count."""
-        return self.table.count_rows()
+        """Get total chunk count.
+
+        Memoized per ``write_version`` so searches do not ask LanceDB for the
+        row count on every call; any write through this store invalidates it.
+        """
+        cached = self._row_count
+        if cached is not None and cached[0] == self.write_version:
+            return cached[1]
+        count = self.table.count_rows()
+        self._row_count = (self.write_version, count)
+        return count
 
     def get_file_hash(self, file_path: str) -> str | None:
         """Get the stored hash for a file, if it exists."""
@@ -659,18 +906,34 @@ class ChunkStore:
 
         Uses column projection to avoid loading vectors into memory.
         For 75k chunks, this loads only the file_path column instead of
-        the entire table (including 1024-dim vectors).
+        the entire table (including 1024-dim vectors), and dedupes it in
+        Arrow so only one Python string per file is created.
         """
         try:
             arrow_table = (
-                self.table.search().select(["file_path"]).limit(self.table.count_rows()).to_arrow()
+                self.table.search().select(["file_path"]).limit(self.count_chunks()).to_arrow()
             )
-            file_paths = arrow_table.column("file_path").to_pylist()
-            return set(file_paths)
+            return set(pc.unique(arrow_table.column("file_path")).to_pylist())
         except Exception as e:
             log.debug("get_indexed_files_failed", error=str(e))
             return set()
 
+    def get_stats(self) -> tuple[int, set[str]]:
+        """Return ``(chunk count, indexed file paths)`` from one projected scan.
+
+        Status reporting needs both; the ``file_path`` projection's row count
+        is the chunk count, so this replaces ``count_chunks`` followed by
+        ``get_indexed_files`` (which counts rows again to size its scan).
+        """
+        try:
+            arrow_table = self.table.search().select(["file_path"]).limit(None).to_arrow()
+            file_paths = arrow_table.column("file_path")
+            self._row_count = (self.write_version, arrow_table.num_rows)
+            return arrow_table.num_rows, set(pc.unique(file_paths).to_pylist())
+        except Exception as e:
+            log.debug("get_stats_failed", error=str(e))
+            return self.count_chunks(), set()
+
     def get_file_hashes(self) -> dict[str, str]:
         """Return a mapping of indexed file paths to their stored content hashes.
 
@@ -685,7 +948,7 @@ class ChunkStore:
         Returns an empty dict on error or when the table is empty.
         """
         try:
-            count = self.table.count_rows()
+            count = self.count_chunks()
             if count == 0:
                 return {}
             arrow_table = (
@@ -759,6 +1022,34 @@ class ChunkStore:
         except Exception as e:
             log.warning("remove_zero_chunk_file_failed", error=str(e))
 
+    def get_file_stats(self) -> dict[str, tuple[int, int, str]]:
+        """Return the persisted ``path -> (mtime_ns, size, sha256)`` hash cache.
+
+        Returns an empty dict when the sidecar is missing or unreadable.
+        """
+        try:
+            path = self.db_path / _FILE_STATS_FILENAME
+            if not path.is_file():
+                return {}
+            data = json.loads(path.read_text(encoding="utf-8"))
+            return {
+                rel: (int(mtime_ns), int(size), str(digest))
+                for rel, (mtime_ns, size, digest) in data.get("files", {}).items()
+            }
+        except Exception as e:
+            log.debug("get_file_stats_failed", error=str(e))
+            return {}
+
+    def set_file_stats(self, stats: dict[str, tuple[int, int, str]]) -> None:
+        """Replace the persisted hash cache. Failures are logged and ignored."""
+        try:
+            path = self.db_path / _FILE_STATS_FILENAME
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps({"files": stats}), encoding="utf-8")
+            tmp_path.replace(path)
+        except Exception as e:
+            log.warning("set_file_stats_failed", error=str(e))
+
     def get_latest_indexed_at(self) -> float:
         """Return the most-recent ``indexed_at`` timestamp across all chunks.
 
@@ -768,7 +1059,7 @@ class ChunkStore:
         forces a full check rather than a false-fresh result).
         """
         try:
-            count = self.table.count_rows()
+            count = self.count_chunks()
             if count == 0:
                 return 0.0
             arrow_table = self.table.search().select(["indexed_at"]).limit(count).to_arrow()
@@ -778,10 +1069,20 @@ class ChunkStore:
             log.debug("get_latest_indexed_at_failed", error=str(e))
             return 0.0
 
+    def close(self) -> None:
+        """Release the open table handle and per-thread query buffers.
+
+        The store stays usable: the next access reopens the table.
+        """
+        self._table = None
+        self._query_buffers = threading.local()
+
     def clear(self) -> None:
         """Clear all chunks from the store."""
         self.db.drop_table(CHUNKS_TABLE, ignore_missing=True)
         self._table = None
+        self.write_version += 1
         self._fts_indexed = False
         self._vector_indexed = False
+        self._vector_indexed_rows = None
         log.info("chunk_store_cleared")
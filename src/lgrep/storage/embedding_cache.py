@@ -0,0 +1,146 @@
+"""Persistent, content-addressed embedding cache.
+
+Maps ``sha256(model | input_type | text)`` to a float16-packed vector in a
+single SQLite file under the lgrep cache root, shared by every project and
+process. Re-embedding text that was embedded before (an unchanged chunk in a
+rebuilt index, a repeated query) becomes a local lookup instead of a billed
+Voyage call.
+
+The cache is strictly best-effort: any SQLite error is logged and treated as
+a miss, so embedding never fails because of it.
+
+Vectors are stored as float16, half the size of float32. Voyage embeddings are
+unit-normalized, so the rounding (relative error below 0.001 per component)
+leaves cosine rankings unchanged; integer output dtypes round-trip exactly.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+import structlog
+
+from lgrep.storage._chunk_store import DEFAULT_CACHE_DIR
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+log = structlog.get_logger()
+
+EMBEDDING_CACHE_FILENAME = "embeddings.sqlite3"
+
+# Rows kept before the oldest inserts are pruned. At 1024 float16 dimensions
+# this is roughly 400 MB on disk.
+DEFAULT_MAX_ENTRIES = 200_000
+
+# Stay well under SQLITE_MAX_VARIABLE_NUMBER on older SQLite builds (999).
+_LOOKUP_CHUNK = 500
+
+
+def embedding_cache_key(model: str, input_type: str, text: str) -> bytes:
+    """Return the content-addressed cache key for one embedding input."""
+    return hashlib.sha256(f"{model}|{input_type}|".encode() + text.encode()).digest()
+
+
+def open_default_embedding_cache() -> EmbeddingCache | None:
+    """Open the shared cache under ``LGREP_CACHE_DIR``.
+
+    Returns None when disabled with ``LGREP_EMBED_CACHE=0`` or when the
+    database cannot be opened.
+    """
+    if os.environ.get("LGREP_EMBED_CACHE", "1").strip().lower() in ("0", "false", "no", "off"):
+        return None
+    cache_dir = Path(os.environ.get("LGREP_CACHE_DIR", DEFAULT_CACHE_DIR))
+    try:
+        return EmbeddingCache(cache_dir / EMBEDDING_CACHE_FILENAME)
+    except (OSError, sqlite3.Error) as e:
+        log.warning("embedding_cache_open_failed", path=str(cache_dir), error=str(e))
+        return None
+
+
+class EmbeddingCache:
+    """SQLite-backed map from cache key to embedding vector.
+
+    Thread-safe: one connection guarded by a lock, shared by the concurrent
+    batch dispatcher and every project using the same embedder. WAL mode lets
+    a CLI run and a server share the file.
+    """
+
+    def __init__(self, path: str | Path, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        """Open (creating if needed) the cache database.
+
+        Args:
+            path: SQLite database file
+            max_entries: Approximate row cap; oldest inserts are pruned beyond it
+        """
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vec BLOB NOT NULL)"
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def keys_for(model: str, input_type: str, texts: list[str]) -> list[bytes]:
+        """Return the cache key for each text, in order."""
+        return [embedding_cache_key(model, input_type, text) for text in texts]
+
+    def get_many(self, keys: list[bytes]) -> dict[bytes, list[float]]:
+        """Return the cached vectors for whichever of ``keys`` are present."""
+        found: dict[bytes, list[float]] = {}
+        unique = list(dict.fromkeys(keys))
+        try:
+            with self._lock:
+                for start in range(0, len(unique), _LOOKUP_CHUNK):
+                    part = unique[start : start + _LOOKUP_CHUNK]
+                    rows = self._conn.execute(
+                        "SELECT key, vec FROM embeddings WHERE key IN "
+                        f"({','.join('?' * len(part))})",
+                        part,
+                    ).fetchall()
+                    for key, blob in rows:
+                        found[key] = np.frombuffer(blob, np.float16).astype(np.float32).tolist()
+        except sqlite3.Error as e:
+            log.warning("embedding_cache_read_failed", error=str(e))
+            return {}
+        return found
+
+    def put_many(self, items: Iterable[tuple[bytes, list[float]]]) -> None:
+        """Store vectors, ignoring keys that are already cached."""
+        rows = [(key, np.asarray(vec, dtype=np.float16).tobytes()) for key, vec in items]
+        if not rows:
+            return
+        try:
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO embeddings (key, vec) VALUES (?, ?)", rows
+                )
+                self._prune()
+                self._conn.commit()
+        except sqlite3.Error as e:
+            log.warning("embedding_cache_write_failed", error=str(e))
+
+    def _prune(self) -> None:
+        """Drop the oldest rows once the rowid span exceeds ``max_entries``."""
+        low, high = self._conn.execute("SELECT min(rowid), max(rowid) FROM embeddings").fetchone()
+        if low is not None and high - low + 1 > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE rowid <= ?", (high - self.max_entries,)
+            )
+
+    def close(self) -> None:
+        """Close the underlying connection."""
+        with self._lock:
+            self._conn.close()
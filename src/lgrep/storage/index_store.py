@@ -32,6 +32,11 @@ from typing import ClassVar
 
 import structlog
 
+try:
+    import orjson
+except ImportError:  # optional extra: pip install "lgrep[orjson]"
+    orjson = None
+
 log = structlog.get_logger()
 
 # Default symbol index storage directory. Importable so sibling modules
@@ -102,6 +107,24 @@ def _unique_temp_path(target: Path) -> Path:
     return target.with_name(f"{target.stem}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp")
 
 
+def _dumps_index(data: dict) -> bytes:
+    """Serialize an index body compactly, with orjson when it is installed.
+
+    orjson writes non-ASCII as UTF-8 where the stdlib escapes it; both forms
+    decode to the same index.
+    """
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+
+def _loads_index(raw: bytes) -> object:
+    """Parse an index body; orjson's decode error subclasses the stdlib one."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
 def _sidecar_for_index(index_file: Path) -> Path:
     """Return the sidecar path paired with an ``index_{key}.json`` file."""
     return index_file.with_name(f"{index_file.stem}.meta.json")
@@ -320,7 +343,7 @@ class IndexStore:
             # pretty-print padding was 19.1% of stored bytes (~480MB of 2.5GB).
             # json.loads is whitespace-agnostic, so existing pretty-printed
             # indexes remain readable with no migration.
-            tmp.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+            tmp.write_bytes(_dumps_index(data))
             # os.replace (not Path.rename): os.rename passes flags=0 on Windows
             # and raises FileExistsError when the target already exists, which
             # breaks re-indexing there. os.replace overwrites atomically on
@@ -377,7 +400,7 @@ class IndexStore:
                 if cached_mtime_ns == stat.st_mtime_ns and cached_size == stat.st_size:
                     return cached_index
 
-            data = json.loads(index_file.read_text(encoding="utf-8"))
+            data = _loads_index(index_file.read_bytes())
             index = CodeIndex(
                 repo_path=data["repo_path"],
                 files=data.get("files", {}),
@@ -412,7 +435,7 @@ class IndexStore:
             if repo_path is None:
                 # Missing / corrupt / foreign-key sidecar: authoritative path.
                 try:
-                    data = json.loads(index_file.read_text(encoding="utf-8"))
+                    data = _loads_index(index_file.read_bytes())
                 except (json.JSONDecodeError, OSError):
                     continue
                 if not isinstance(data, dict):
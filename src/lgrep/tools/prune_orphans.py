@@ -126,11 +126,22 @@ def _dir_size(path: Path) -> int:
         total += path.lstat().st_size
     except OSError:
         return 0
-    for child in path.rglob("*"):
+    # os.scandir rather than rglob: one getdents per directory and no Path
+    # per entry; lance caches hold thousands of small fragment files.
+    stack = [str(path)]
+    while stack:
         try:
-            total += child.lstat().st_size
+            with os.scandir(stack.pop()) as it:
+                entries = list(it)
         except OSError:
             continue
+        for entry in entries:
+            try:
+                total += entry.stat(follow_symlinks=False).st_size
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+            except OSError:
+                continue
     return total
 
 
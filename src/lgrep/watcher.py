@@ -26,7 +26,15 @@ log = structlog.get_logger()
 
 
 class IndexingHandler(FileSystemEventHandler):
-    """Handles file system events by triggering re-indexing."""
+    """Handles file system events by triggering re-indexing.
+
+    Changed paths collect in ``pending_files`` and removed paths in
+    ``pending_deletes`` until no new event has arrived for ``debounce_ms``.
+    The removals are then applied with one ``ChunkStore.delete_by_files``
+    call and the changes re-indexed with one ``Indexer.index_files`` call, so
+    a branch switch or formatter run costs one embedding batch and a couple
+    of table writes rather than several per file.
+    """
 
     def __init__(
         self,
@@ -47,7 +55,9 @@ class IndexingHandler(FileSystemEventHandler):
         self.loop = loop
         self.debounce_ms = debounce_ms
         self.runtime = runtime
-        self.pending_files: dict[Path, asyncio.TimerHandle] = {}
+        self.pending_files: set[Path] = set()
+        self.pending_deletes: set[Path] = set()
+        self._flush_handle: asyncio.TimerHandle | None = None
 
     def on_modified(self, event):
         """Handle file modification."""
@@ -68,9 +78,13 @@ class IndexingHandler(FileSystemEventHandler):
         path = Path(event.src_path)
         log.info("file_deleted", path=str(path))
 
-        # Schedule async delete so the sync storage I/O runs in a thread,
-        # not on the event loop.
-        self.loop.call_soon_threadsafe(lambda: self.loop.create_task(self._async_delete_file(path)))
+        self.loop.call_soon_threadsafe(self._schedule_delete, path)
+
+    def _schedule_delete(self, path: Path):
+        """Move a deleted file from the pending batch to the pending deletes."""
+        self.pending_files.discard(path)
+        self.pending_deletes.add(path)
+        self._restart_flush()
 
     def _schedule_index(self, path: Path):
         """Schedule a file for re-indexing (called from watchdog thread)."""
@@ -87,53 +101,70 @@ class IndexingHandler(FileSystemEventHandler):
         if self.indexer.discovery.is_ignored(path):
             return
 
-        # Cancel existing timer for this file if any
-        if path in self.pending_files:
-            self.pending_files[path].cancel()
+        # A file recreated inside the window is re-indexed, not deleted
+        self.pending_deletes.discard(path)
+        self.pending_files.add(path)
+        self._restart_flush()
 
-        # Schedule new timer
-        handle = self.loop.call_later(
+    def _restart_flush(self):
+        """Restart the shared debounce window (called on loop thread)."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        self._flush_handle = self.loop.call_later(
             self.debounce_ms / 1000.0,
-            lambda: self.loop.create_task(self._do_index(path)),
+            lambda: self.loop.create_task(self._do_index()),
         )
-        self.pending_files[path] = handle
 
-    async def _do_index(self, path: Path):
-        """Perform the actual indexing."""
-        if path in self.pending_files:
-            del self.pending_files[path]
+    async def _do_index(self):
+        """Apply the deletes and re-index the changes from the debounce window."""
+        deleted = sorted(self.pending_deletes)
+        paths = sorted(self.pending_files)
+        self.pending_deletes = set()
+        self.pending_files = set()
+        self._flush_handle = None
+        if deleted:
+            await self._delete_files(deleted)
+        if not paths:
+            return
 
-        log.info("incremental_index_triggered", file=str(path))
+        log.info("incremental_index_triggered", files=len(paths))
         try:
             if self.runtime is not None:
                 await self.runtime.run_blocking(
-                    "watch_index_file",
+                    "watch_index_files",
                     "IndexingHandler._do_index",
                     str(self.indexer.project_path),
-                    self.indexer.index_file,
-                    path,
+                    self.indexer.index_files,
+                    paths,
                 )
             else:
-                await self.loop.run_in_executor(None, self.indexer.index_file, path)
+                await self.loop.run_in_executor(None, self.indexer.index_files, paths)
         except Exception as e:
-            log.error("incremental_index_failed", file=str(path), error=str(e))
-
-    async def _async_delete_file(self, path: Path):
-        """Delete file from index in a worker thread."""
+            log.error("incremental_index_failed", files=[str(p) for p in paths], error=str(e))
+
+    async def _delete_files(self, paths: list[Path]):
+        """Delete the chunks of every removed file in one worker-thread call."""
+        project_path = self.indexer.project_path
+        rel_paths = [
+            str(p.relative_to(project_path)) for p in paths if p.is_relative_to(project_path)
+        ]
+        if not rel_paths:
+            return
         try:
-            rel_path = str(path.relative_to(self.indexer.project_path))
             if self.runtime is not None:
                 await self.runtime.run_blocking(
-                    "watch_delete_file",
-                    "IndexingHandler._async_delete_file",
-                    str(self.indexer.project_path),
-                    self.indexer.storage.delete_by_file,
-                    rel_path,
+                    "watch_delete_files",
+                    "IndexingHandler._delete_files",
+                    str(project_path),
+                    self.indexer.storage.delete_by_files,
+                    rel_paths,
                 )
             else:
-                await self.loop.run_in_executor(None, self.indexer.storage.delete_by_file, rel_path)
+                await self.loop.run_in_executor(
+                    None, self.indexer.storage.delete_by_files, rel_paths
+                )
         except Exception as e:
-            log.error("delete_from_index_failed", file=str(path), error=str(e))
+            log.error("delete_from_index_failed", files=rel_paths, error=str(e))
 
 
 class FileWatcher:
@@ -7,6 +7,7 @@ Verifies that the startup transport is preserved for diagnostics without using
 from __future__ import annotations
 
 import os
+import sys
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -62,3 +63,67 @@ class TestBootstrapTransportPlumbing:
 
         assert bootstrap_module.get_startup_transport() == "stdio"
         assert "LGREP_TRANSPORT" not in os.environ
+
+    @pytest.mark.parametrize(
+        ("transport", "env", "uses_uvloop"),
+        [
+            ("streamable-http", None, True),
+            ("streamable-http", "0", False),
+            ("streamable-http", "false", False),
+            ("streamable-http", "Off", False),
+            ("stdio", None, False),
+        ],
+    )
+    def test_uvloop_only_for_http_transport(
+        self, monkeypatch: pytest.MonkeyPatch, transport, env, uses_uvloop
+    ):
+        fake_uvloop = MagicMock()
+        monkeypatch.setitem(sys.modules, "uvloop", fake_uvloop)
+        if env is None:
+            monkeypatch.delenv("LGREP_UVLOOP", raising=False)
+        else:
+            monkeypatch.setenv("LGREP_UVLOOP", env)
+
+        with (
+            patch("lgrep.server.mcp.run") as mock_run,
+            patch.object(bootstrap_module.anyio, "run") as mock_anyio_run,
+        ):
+            bootstrap_module.run_server(transport=transport)
+
+        fake_uvloop.install.assert_not_called()
+        assert mock_anyio_run.called is uses_uvloop
+        assert mock_run.called is not uses_uvloop
+        if uses_uvloop:
+            options = mock_anyio_run.call_args.kwargs["backend_options"]
+            assert options == {"loop_factory": fake_uvloop.new_event_loop}
+        bootstrap_module._startup_transport = None
+
+
+class TestLoggingSetup:
+    def test_json_renderer_matches_stdlib_output(self):
+        """The orjson-backed renderer emits the same JSON, including repr fallbacks."""
+        import json
+        from pathlib import Path
+
+        import structlog
+
+        event = {"event": "search_completed", "path": Path("/tmp/ü"), "duration_ms": 1.5}
+        rendered = bootstrap_module._json_renderer()(None, "info", dict(event))
+
+        assert isinstance(rendered, str)
+        stdlib = structlog.processors.JSONRenderer()(None, "info", dict(event))
+        assert json.loads(rendered) == json.loads(stdlib)
+
+    def test_run_server_configures_logging_once(self, monkeypatch: pytest.MonkeyPatch):
+        """Re-entering run_server keeps the existing structlog configuration."""
+        monkeypatch.setattr(bootstrap_module, "_logging_configured", False)
+
+        with (
+            patch("lgrep.server.mcp.run"),
+            patch("structlog.configure") as mock_configure,
+        ):
+            bootstrap_module.run_server()
+            bootstrap_module.run_server()
+
+        mock_configure.assert_called_once()
+        assert bootstrap_module._logging_configured is True
@@ -1,7 +1,10 @@
 """Tests for code chunking."""
 
+import os
+import sys
 import tempfile
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
@@ -47,6 +50,43 @@ class TestDetectLanguage:
         assert detect_language("file.PY") == "python"
         assert detect_language("file.Js") == "javascript"
 
+    def test_language_names_are_interned(self):
+        """Exact-case and lowercased hits should return the same interned string."""
+        assert detect_language("a.py") is detect_language("b.PY") is sys.intern("python")
+
+    def test_path_objects_and_dotfiles(self):
+        """Should accept Path objects and treat dotfiles as extensionless."""
+        assert detect_language(Path("/src/app.ts")) == "typescript"
+        assert detect_language(".py") is None
+        assert detect_language("pkg.py/README") is None
+
+
+class TestLineIndex:
+    """Tests for the shared line-offset index."""
+
+    def test_line_starts_and_lookup(self):
+        """Should record line starts and map offsets to 1-indexed lines."""
+        from lgrep.chunking import _LineIndex
+
+        index = _LineIndex("ab\ncde\n\nf")
+
+        assert list(index.iter_lines()) == ["ab", "cde", "", "f"]
+        assert len(index) == 4
+        assert index.starts == [0, 3, 7, 8, 10]
+        assert index.line_at(0) == 1
+        assert index.line_at(2) == 1
+        assert index.line_at(3) == 2
+        assert index.line_at(7) == 3
+        assert index.line_at(9) == 4
+
+    def test_group_lines_respects_chunk_size(self):
+        """Should split line ranges at the token budget, keeping oversized lines whole."""
+        from lgrep.chunking import _group_lines
+
+        assert _group_lines([1, 1, 1, 1], 4) == [(1, 2, 4), (3, 4, 4)]
+        assert _group_lines([10, 0], 4) == [(1, 1, 11), (2, 2, 1)]
+        assert _group_lines([], 4) == [(1, 1, 0)]
+
 
 class TestChunkInfo:
     """Tests for ChunkInfo dataclass."""
@@ -143,6 +183,50 @@ class Greeter:
         finally:
             Path(temp_path).unlink()
 
+    def test_read_file_content_matches_text_mode(self, chunker, tmp_path):
+        """Raw reads should decode and normalize newlines like read_text."""
+        path = tmp_path / "mixed.py"
+        path.write_bytes(b"a = 1\r\nb = '\xff'\rc = 3\n" + b"x" * 70000)
+
+        assert chunker._read_file_content(path) == path.read_text(
+            encoding="utf-8", errors="replace"
+        )
+        (tmp_path / "empty.py").write_bytes(b"")
+        assert chunker._read_file_content(tmp_path / "empty.py") == ""
+
+    def test_binary_and_oversized_files_yield_no_chunks(self, tmp_path):
+        """Binary and oversized files should be skipped before chunking, unless disabled."""
+        binary = tmp_path / "blob.py"
+        binary.write_bytes(b"x = 1\n\x00\x01\x02")
+        large = tmp_path / "large.py"
+        large.write_text("x = 1\n" * 100)
+
+        guarded = CodeChunker(max_bytes=64)
+        for path in (binary, large):
+            result = guarded.chunk_file(path)
+            assert result.error is None
+            assert result.chunks == []
+
+        permissive = CodeChunker(max_bytes=None, skip_binary=False)
+        assert permissive._read_file_content(large) == large.read_text()
+        assert permissive._read_file_content(binary).startswith("x = 1")
+
+    def test_unchanged_small_files_served_from_content_cache(self, chunker, tmp_path):
+        """Re-chunking an unchanged file should skip the read; edits should miss the cache."""
+        path = tmp_path / "cached.py"
+        path.write_text("def cached():\n    return 1\n")
+        first = chunker.chunk_file(path)
+
+        with patch.object(chunker, "_read_file_content", wraps=chunker._read_file_content) as spy:
+            assert chunker.chunk_file(path).chunks == first.chunks
+            assert spy.call_count == 0
+
+            path.write_text("def cached():\n    return 2\n")
+            stat = path.stat()
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+            assert "return 2" in chunker.chunk_file(path).chunks[0].text
+            assert spy.call_count == 1
+
     def test_chunk_missing_file(self, chunker):
         """Should return error for missing files."""
         result = chunker.chunk_file("/nonexistent/file.py")
@@ -164,6 +248,135 @@ def second_function():
             assert chunk.start_line >= 1
             assert chunk.end_line >= chunk.start_line
 
+    def test_chunkers_pooled_across_instances(self):
+        """Should reuse one parser per (language, chunk_size) on the same thread."""
+        first = CodeChunker(chunk_size=321)
+        second = CodeChunker(chunk_size=321)
+        parser = first._get_chunker("python")
+        assert parser is not None
+        assert second._get_chunker("python") is parser
+        assert CodeChunker(chunk_size=123)._get_chunker("python") is not parser
+
+    def test_close_drops_pooled_chunkers(self):
+        """Should rebuild parsers lazily after close()."""
+        chunker = CodeChunker(chunk_size=322)
+        parser = chunker._get_chunker("python")
+        chunker.close()
+        assert chunker._get_chunker("python") is not parser
+
+    def test_fallback_chunks_slice_original_lines(self):
+        """Fallback chunks should be exact line ranges of the source text."""
+        chunker = CodeChunker(chunk_size=20)
+        lines = [f"word{i} " * (i % 4 + 1) for i in range(40)]
+        content = "\n".join(lines)
+
+        chunks = chunker._fallback_chunk(content)
+
+        assert len(chunks) > 1
+        assert chunks[0].start_line == 1
+        assert chunks[-1].end_line == len(lines)
+        for prev, nxt in zip(chunks, chunks[1:], strict=False):
+            assert nxt.start_line == prev.end_line + 1
+        for chunk in chunks:
+            expected = "\n".join(lines[chunk.start_line - 1 : chunk.end_line])
+            assert chunk.text == expected
+
+    def test_process_chunks_line_numbers_for_repeated_text(self, chunker):
+        """Should map identical chunk texts to successive locations."""
+        from types import SimpleNamespace
+
+        block = "def handler(event):\n    return process(event, retries=3)"
+        content = f"{block}\n\n{block}\n"
+        raw = [
+            SimpleNamespace(text=block + "\n\n", token_count=20),
+            SimpleNamespace(text=block + "\n", token_count=20),
+        ]
+
+        chunks = chunker._process_chunks(raw, content)
+
+        assert [(c.start_line, c.end_line) for c in chunks] == [(1, 2), (4, 5)]
+
+    def test_process_chunks_uses_start_index(self, chunker):
+        """Should trust Chonkie start_index offsets when they match content."""
+        from types import SimpleNamespace
+
+        content = "# header\n\ndef body(value):\n    return value + 1\n"
+        text = "def body(value):\n    return value + 1"
+        start = content.index(text)
+        raw = [SimpleNamespace(text="\n" + text, token_count=20, start_index=start - 1)]
+
+        chunks = chunker._process_chunks(raw, content)
+
+        assert (chunks[0].start_line, chunks[0].end_line) == (3, 4)
+
+    def test_process_chunks_shared_prefix_does_not_misanchor(self, chunker):
+        """A chunk whose prefix also starts an earlier block should map to its own lines."""
+        from types import SimpleNamespace
+
+        prefix = "# Generated by the build system. Do not edit by hand.\n"
+        first = prefix + "def first():\n    return 1"
+        second = prefix + "def second():\n    return 2"
+        content = f"{first}\n\n{second}\n"
+        raw = [SimpleNamespace(text=second, token_count=20)]
+
+        chunks = chunker._process_chunks(raw, content)
+
+        assert (chunks[0].start_line, chunks[0].end_line) == (5, 7)
+
+    def test_chunk_files_preserves_order(self, chunker, tmp_path):
+        """Should return one result per path, in input order, across processes."""
+        paths = []
+        for i in range(10):
+            path = tmp_path / f"mod_{i}.py"
+            path.write_text(f"def function_{i}(value):\n    return value * {i} + {i}\n")
+            paths.append(path)
+
+        results = chunker.chunk_files(paths, max_workers=2)
+
+        assert [r.file_path for r in results] == [str(p) for p in paths]
+        for i, result in enumerate(results):
+            assert result.error is None
+            assert f"function_{i}" in "".join(c.text for c in result.chunks)
+
+    def test_chunk_files_pool_honours_size_and_binary_guards(self, tmp_path):
+        """Worker processes should filter files like the parent chunker."""
+        paths = []
+        for i in range(8):
+            path = tmp_path / f"mod_{i}.py"
+            path.write_text(f"def function_{i}(value):\n    return value * {i} + {i}\n")
+            paths.append(path)
+        large = tmp_path / "large.py"
+        large.write_text("def large():\n    return 1\n" * 20)
+        binary = tmp_path / "blob.py"
+        binary.write_bytes(b"def blob():\n    return 1\n\x00\x01")
+        paths += [large, binary]
+
+        guarded = CodeChunker(max_bytes=256).chunk_files(paths, max_workers=2)
+        permissive = CodeChunker(max_bytes=None, skip_binary=False).chunk_files(
+            paths, max_workers=2
+        )
+
+        assert all(result.chunks for result in guarded[:8])
+        assert guarded[8].chunks == []
+        assert guarded[9].chunks == []
+        assert permissive[8].chunks
+
+    def test_chunk_files_small_batch_in_process(self, chunker, tmp_path, monkeypatch):
+        """Should skip the process pool for small batches."""
+        import concurrent.futures
+
+        def _fail(*args, **kwargs):
+            raise AssertionError("process pool should not be used")
+
+        monkeypatch.setattr(concurrent.futures, "ProcessPoolExecutor", _fail)
+        path = tmp_path / "one.py"
+        path.write_text("def one():\n    return 1\n")
+
+        results = chunker.chunk_files([path])
+
+        assert len(results) == 1
+        assert results[0].language == "python"
+
 
 class TestCodeChunkResult:
     """Tests for CodeChunkResult dataclass."""
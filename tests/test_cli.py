@@ -2,9 +2,12 @@
 
 import json
 import os
+import sys
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
+import pytest
+
 from lgrep.cli import _cmd_gc, _cmd_init_ignore, _cmd_prune_symbols, main
 from lgrep.cli import _cmd_index_semantic as _cmd_index
 from lgrep.cli import _cmd_prune_orphans as _cmd_prune_orphans
@@ -42,6 +45,43 @@ class TestCLIDispatch:
         err = capsys.readouterr().err
         assert "Unknown" in err
 
+    def test_command_table_handlers_exist(self):
+        """Every dispatch-table entry should name a callable handler in lgrep.cli."""
+        import lgrep.cli as cli
+
+        for command, handler_name in cli._COMMANDS.items():
+            assert callable(getattr(cli, handler_name, None)), command
+
+    def test_main_dispatches_install_opencode(self):
+        """'lgrep install-opencode' should call the installer."""
+        with (
+            patch("sys.argv", ["lgrep", "install-opencode"]),
+            patch("lgrep.install_opencode.install", return_value=0) as mock_install,
+        ):
+            rc = main()
+        assert rc == 0
+        mock_install.assert_called_once_with()
+
+    def test_subcommands_filter_debug_logs(self, capsys, monkeypatch):
+        """Subcommands should drop structlog events below LGREP_LOG_LEVEL."""
+        import structlog
+
+        monkeypatch.setenv("LGREP_LOG_LEVEL", "INFO")
+
+        def noisy(args):
+            structlog.get_logger().debug("noisy_debug_event")
+            return 0
+
+        try:
+            with (
+                patch("sys.argv", ["lgrep", "index-semantic"]),
+                patch("lgrep.cli._cmd_index_semantic", side_effect=noisy),
+            ):
+                assert main() == 0
+        finally:
+            structlog.reset_defaults()
+        assert "noisy_debug_event" not in capsys.readouterr().out
+
     def test_main_dispatches_to_search(self):
         """'lgrep search-semantic' should dispatch to _cmd_search_semantic."""
         with (
@@ -97,6 +137,7 @@ class TestCLIDispatch:
         with (
             patch("sys.argv", ["lgrep"]),
             patch("lgrep.server.run_server", return_value=0) as mock_run,
+            patch.dict("os.environ"),
         ):
             rc = main()
 
@@ -119,12 +160,27 @@ class TestCLIDispatch:
                 ],
             ),
             patch("lgrep.server.run_server", return_value=0) as mock_run,
+            patch.dict("os.environ"),
         ):
             rc = main()
 
         assert rc == 0
         mock_run.assert_called_once_with(transport="streamable-http", host="127.0.0.1", port=6388)
 
+    def test_main_server_limits_native_threads(self):
+        """Starting the server defaults BLAS/OpenMP pools to one thread, keeping user values."""
+        with (
+            patch("sys.argv", ["lgrep"]),
+            patch("lgrep.server.run_server", return_value=0),
+            patch.dict("os.environ", {"MKL_NUM_THREADS": "4"}),
+        ):
+            os.environ.pop("OMP_NUM_THREADS", None)
+            os.environ.pop("OPENBLAS_NUM_THREADS", None)
+            main()
+            assert os.environ["OMP_NUM_THREADS"] == "1"
+            assert os.environ["OPENBLAS_NUM_THREADS"] == "1"
+            assert os.environ["MKL_NUM_THREADS"] == "4"
+
     def test_main_invalid_transport(self, capsys):
         """Invalid transport should return a validation error."""
         with patch("sys.argv", ["lgrep", "--transport", "http"]):
@@ -226,6 +282,44 @@ class TestCmdSearchExecution:
         assert data["results"][0]["file_path"] == "a.py"
         assert data["query_time_ms"] == 5.0
 
+    def test_dumps_output_matches_with_and_without_orjson(self, monkeypatch):
+        """The orjson fast path and the stdlib fallback decode to the same payload."""
+        from lgrep.cli import _dumps
+
+        results = SearchResults(
+            results=[SearchResult("ü.py", 1, 2, 'x = "é"\n', 0.5, "vector")],
+            query_time_ms=1.5,
+            total_chunks=3,
+        )
+        fast = json.loads(_dumps(results))
+        monkeypatch.setitem(sys.modules, "orjson", None)
+        with patch("dataclasses.asdict", side_effect=AssertionError("no asdict copy")):
+            slow = json.loads(_dumps(results))
+
+        assert fast == slow
+        assert slow["results"][0]["content"] == 'x = "é"\n'
+        assert json.loads(_dumps({1: "a"})) == {"1": "a"}
+        with pytest.raises(TypeError, match="Path"):
+            _dumps({"p": Path("x")})
+
+    def test_stdlib_dumps_checks_each_dataclass_type_once(self, monkeypatch):
+        """The fallback hook classifies a type once, however many results share it."""
+        import dataclasses
+
+        import lgrep.cli as cli
+
+        results = SearchResults(
+            results=[SearchResult(f"{i}.py", i, i, "x", 0.5, "vector") for i in range(5)]
+        )
+        monkeypatch.setitem(sys.modules, "orjson", None)
+        monkeypatch.setattr(cli, "_DATACLASS_TYPES", {})
+        with patch("dataclasses.is_dataclass", wraps=dataclasses.is_dataclass) as check:
+            data = json.loads(cli._dumps(results))
+            json.loads(cli._dumps(results))
+
+        assert len(data["results"]) == 5
+        assert check.call_count == 2
+
     @patch("lgrep.embeddings.VoyageEmbedder")
     @patch("lgrep.storage.ChunkStore")
     @patch("lgrep.storage.get_project_db_path")
@@ -448,6 +542,30 @@ class TestCmdIndexExecution:
         call_kwargs = mock_indexer_cls.call_args
         assert call_kwargs[1]["chunk_size"] == 250
 
+    @patch("lgrep.indexing.Indexer")
+    @patch("lgrep.embeddings.VoyageEmbedder")
+    @patch("lgrep.storage.ChunkStore")
+    @patch("lgrep.storage.get_project_db_path")
+    def test_index_custom_batch_size(
+        self,
+        mock_get_path,
+        mock_store_cls,
+        mock_embedder_cls,
+        mock_indexer_cls,
+        capsys,
+        monkeypatch,
+        tmp_path,
+    ):
+        """--batch-size N should pass the embedding batch size to Indexer."""
+        monkeypatch.setenv("VOYAGE_API_KEY", "test-key")
+        mock_indexer = MagicMock()
+        mock_indexer.index_all.return_value = IndexStatus()
+        mock_indexer_cls.return_value = mock_indexer
+
+        rc = _cmd_index(["--batch-size", "64", str(tmp_path)])
+        assert rc == 0
+        assert mock_indexer_cls.call_args[1]["batch_size"] == 64
+
     @patch("lgrep.indexing.Indexer")
     @patch("lgrep.embeddings.VoyageEmbedder")
     @patch("lgrep.storage.ChunkStore")
@@ -85,3 +85,33 @@ async def test_sync_exception_is_terminal_and_summarized():
     assert recent[-1]["error"] == "ValueError: boom with details"
 
     supervisor.shutdown(cancel_futures=True)
+
+
+@pytest.mark.asyncio
+async def test_db_reads_do_not_queue_behind_saturated_workers():
+    supervisor = RuntimeSupervisor(max_workers=1, history_limit=10)
+    release = threading.Event()
+
+    indexing = asyncio.ensure_future(
+        supervisor.run_blocking(
+            kind="index_all",
+            caller="test",
+            project="/tmp/project",
+            fn=lambda: release.wait(timeout=2),
+        )
+    )
+    thread_name = await asyncio.wait_for(
+        supervisor.run_blocking(
+            kind="search_hybrid",
+            caller="test",
+            project="/tmp/project",
+            fn=lambda: threading.current_thread().name,
+        ),
+        timeout=1,
+    )
+
+    assert thread_name.startswith("lgrep-db")
+    release.set()
+    assert await indexing is True
+
+    supervisor.shutdown(cancel_futures=True)
@@ -1,5 +1,6 @@
 """Tests for file discovery."""
 
+import os
 import tempfile
 from pathlib import Path
 
@@ -77,6 +78,98 @@ class TestFileDiscovery:
         assert discovery.is_ignored(temp_project / "node_modules" / "index.js") is True
         assert discovery.is_ignored(temp_project / "tests" / "test_main.py") is True
 
+    def test_is_ignored_str_matches_path_api(self, temp_project):
+        """The string fast path should agree with is_ignored for abs, relative and escaping paths."""
+        discovery = FileDiscovery(temp_project)
+
+        for candidate in ("src/main.py", "node_modules/index.js", "tests", "../outside.py"):
+            expected = discovery.is_ignored(Path(candidate))
+            assert discovery.is_ignored_str(candidate) is expected
+            assert discovery.is_ignored_str(str(temp_project / candidate)) is expected
+        assert discovery.is_ignored_str("../outside.py") is True
+        assert discovery.is_ignored_str("src/main.py") is False
+
+    def test_ignore_rules_support_negation_and_nesting(self, tmp_path):
+        """Should honor gitignore negation and directory-only patterns at depth."""
+        (tmp_path / "pkg" / "logs").mkdir(parents=True)
+        (tmp_path / "pkg" / "logs" / "run.log").write_text("log")
+        (tmp_path / "pkg" / "keep.log").write_text("keep")
+        (tmp_path / "pkg" / "drop.log").write_text("drop")
+        (tmp_path / "pkg" / "mod.py").write_text("x = 1")
+        (tmp_path / ".gitignore").write_text("*.log\n!keep.log\nlogs/\n")
+
+        discovery = FileDiscovery(tmp_path)
+        rel_files = {f.relative_to(tmp_path).as_posix() for f in discovery.find_files()}
+
+        assert "pkg/mod.py" in rel_files
+        assert "pkg/keep.log" in rel_files
+        assert "pkg/drop.log" not in rel_files
+        assert "pkg/logs/run.log" not in rel_files
+        assert discovery.is_ignored(tmp_path / "pkg" / "logs") is True
+        assert discovery.is_ignored(tmp_path / "pkg" / "keep.log") is False
+
+    def test_is_ignored_inherits_excluded_parent_directory(self, tmp_path):
+        """Files under an excluded directory stay ignored, as in git and find_files."""
+        (tmp_path / "gen" / "sub").mkdir(parents=True)
+        (tmp_path / "gen" / "sub" / "keep.py").write_text("x = 1")
+        (tmp_path / ".gitignore").write_text("gen/\n!gen/sub/keep.py\n")
+
+        discovery = FileDiscovery(tmp_path)
+
+        assert discovery.is_ignored(tmp_path / "gen" / "sub" / "keep.py") is True
+        assert discovery._dir_ignore_cache["gen/"] is True
+        assert list(discovery.find_files()) == [tmp_path / ".gitignore"]
+
+    def test_lgrepignore_negation_cannot_unignore_gitignored(self, tmp_path):
+        """Ignore files are independent: either one can exclude a path."""
+        (tmp_path / "gen.py").write_text("x = 1")
+        (tmp_path / ".gitignore").write_text("gen.py\n")
+        (tmp_path / ".lgrepignore").write_text("!gen.py\n")
+
+        discovery = FileDiscovery(tmp_path)
+
+        assert discovery.is_ignored(tmp_path / "gen.py") is True
+        assert tmp_path / "gen.py" not in list(discovery.find_files())
+
+    def test_skip_dirs_pruned_before_rule_matching(self, temp_project):
+        """Skip-listed directory names should never reach the ignore-rule matcher."""
+        discovery = FileDiscovery(temp_project)
+        matched_batches = []
+        original = discovery._match_ignore_rules
+
+        def recording(rel_paths):
+            matched_batches.append(list(rel_paths))
+            return original(rel_paths)
+
+        discovery._match_ignore_rules = recording
+        files = list(discovery.find_files())
+
+        assert temp_project / "src" / "main.py" in files
+        seen = {p for batch in matched_batches for p in batch}
+        assert "node_modules/" not in seen
+        assert "dist/" not in seen
+        assert "src/" in seen
+
+    def test_find_files_order_and_symlinked_dirs(self, tmp_path):
+        """Should walk top-down like os.walk and never yield or enter dir symlinks."""
+        (tmp_path / "a").mkdir()
+        (tmp_path / "a" / "one.py").write_text("x = 1")
+        (tmp_path / "b").mkdir()
+        (tmp_path / "b" / "two.py").write_text("x = 2")
+        (tmp_path / "top.py").write_text("x = 0")
+        (tmp_path / "link_to_a").symlink_to(tmp_path / "a", target_is_directory=True)
+
+        discovery = FileDiscovery(tmp_path)
+        found = [f.relative_to(tmp_path).as_posix() for f in discovery.find_files()]
+
+        expected = []
+        for root, dirs, files in os.walk(tmp_path):
+            dirs[:] = [d for d in dirs if d != "link_to_a"]
+            rel_root = Path(root).relative_to(tmp_path)
+            expected.extend((rel_root / f).as_posix() for f in files)
+        assert found == expected
+        assert sorted(found) == ["a/one.py", "b/two.py", "top.py"]
+
 
 class TestLgrepignoreScaffold:
     def test_scaffold_creates_default_file(self, tmp_path):
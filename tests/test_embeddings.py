@@ -4,7 +4,8 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
-from lgrep.embeddings import EmbeddingResult, VoyageEmbedder
+from lgrep.embeddings import EmbeddingResult, TokenBucket, VoyageEmbedder
+from lgrep.storage.embedding_cache import EmbeddingCache
 
 
 class TestVoyageEmbedder:
@@ -35,6 +36,16 @@ class TestVoyageEmbedder:
             assert embedder.api_key == "env-key"
             mock_client.assert_called_once_with(api_key="env-key")
 
+    def test_single_token_aware_definition(self) -> None:
+        """Every importer should get the one token-aware VoyageEmbedder."""
+        import lgrep.embeddings as embeddings
+        from lgrep.server import lifecycle
+
+        assert embeddings.MAX_BATCH_TOKENS > 0
+        assert VoyageEmbedder.__module__ == "lgrep.embeddings"
+        assert lifecycle.VoyageEmbedder is VoyageEmbedder
+        assert callable(VoyageEmbedder._shrink_token_budget)
+
     def test_embed_documents_empty(self) -> None:
         """Should handle empty document list."""
         with patch("voyageai.Client"):
@@ -45,6 +56,76 @@ class TestVoyageEmbedder:
             assert result.token_usage == 0
             assert result.model == "voyage-code-3"
 
+    def test_int8_output_dtype(self, tmp_path) -> None:
+        """int8 should be requested from Voyage, returned as floats, and cached apart."""
+        mock_response = MagicMock()
+        mock_response.embeddings = [[-3, 127], [0, 5]]
+        mock_response.total_tokens = 10
+        cache = EmbeddingCache(tmp_path / "embeddings.sqlite3")
+
+        with patch("voyageai.Client") as mock_client_class:
+            mock_client = mock_client_class.return_value
+            mock_client.embed.return_value = mock_response
+
+            embedder = VoyageEmbedder(api_key="test-key", cache=cache, output_dtype="INT8")
+            result = embedder.embed_documents(["doc1", "doc2"])
+
+            assert result.embeddings == [[-3.0, 127.0], [0.0, 5.0]]
+            assert all(isinstance(x, float) for x in result.embeddings[0])
+            mock_client.embed.assert_called_once_with(
+                texts=["doc1", "doc2"],
+                model="voyage-code-3",
+                input_type="document",
+                output_dtype="int8",
+            )
+            float_keys = cache.keys_for("voyage-code-3", "document", ["doc1"])
+            assert cache.get_many(float_keys) == {}
+
+        with pytest.raises(ValueError, match="Unsupported output dtype"):
+            VoyageEmbedder(api_key="test-key", output_dtype="binary")
+
+    def test_output_dimension(self) -> None:
+        """A truncated width should be requested from Voyage and read from the env."""
+        mock_response = MagicMock()
+        mock_response.embeddings = [[0.1] * 512]
+        mock_response.total_tokens = 5
+
+        with (
+            patch.dict("os.environ", {"LGREP_EMBED_DIM": "512"}),
+            patch("voyageai.Client") as mock_client_class,
+        ):
+            mock_client = mock_client_class.return_value
+            mock_client.embed.return_value = mock_response
+
+            embedder = VoyageEmbedder(api_key="test-key")
+            assert embedder.output_dimension == 512
+            assert len(embedder.embed_query("find auth")) == 512
+            mock_client.embed.assert_called_once_with(
+                texts=["find auth"],
+                model="voyage-code-3",
+                input_type="query",
+                output_dimension=512,
+            )
+
+        with pytest.raises(ValueError, match="Unsupported output dimension"):
+            VoyageEmbedder(api_key="test-key", output_dimension=300)
+
+    def test_bad_env_knobs_fall_back_to_defaults(self) -> None:
+        """Unparseable width and query-batching env values should use the defaults."""
+        from lgrep.embeddings import (
+            DEFAULT_DIMENSIONS,
+            DEFAULT_QUERY_BATCH_SIZE,
+            DEFAULT_QUERY_BATCH_WAIT_MS,
+        )
+
+        env = {"LGREP_EMBED_DIM": "wide", "LGREP_EMBED_BATCH": "lots", "LGREP_EMBED_WAIT_MS": "5ms"}
+        with patch.dict("os.environ", env), patch("voyageai.Client"):
+            embedder = VoyageEmbedder(api_key="test-key")
+
+        assert embedder.output_dimension == DEFAULT_DIMENSIONS
+        assert embedder.query_batch_size == DEFAULT_QUERY_BATCH_SIZE
+        assert embedder.query_batch_wait_s == DEFAULT_QUERY_BATCH_WAIT_MS / 1000
+
     def test_embed_documents_single_batch(self) -> None:
         """Should embed documents in a single batch."""
         mock_response = MagicMock()
@@ -86,6 +167,86 @@ class TestVoyageEmbedder:
             assert mock_client.embed.call_count == 3
             assert result.token_usage == 150  # 3 batches * 50 tokens
 
+    def test_embed_documents_concurrent_batches_keep_input_order(self) -> None:
+        """Batches dispatched concurrently should be reassembled in input order."""
+        import threading
+        import time
+
+        in_flight = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def fake_embed(texts, model, input_type):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            # Earlier batches finish last.
+            time.sleep(0.05 if texts[0] == "doc0" else 0.01)
+            with lock:
+                in_flight -= 1
+            response = MagicMock()
+            response.embeddings = [[float(t[3:])] for t in texts]
+            response.total_tokens = len(texts)
+            return response
+
+        with patch("voyageai.Client") as mock_client_class:
+            mock_client = MagicMock()
+            mock_client.embed.side_effect = fake_embed
+            mock_client_class.return_value = mock_client
+
+            embedder = VoyageEmbedder(api_key="test-key", max_in_flight=3)
+            docs = [f"doc{i}" for i in range(12)]
+            result = embedder.embed_documents(docs, batch_size=2)
+
+        assert result.embeddings == [[float(i)] for i in range(12)]
+        assert result.token_usage == 12
+        assert mock_client.embed.call_count == 6
+        assert 1 < peak <= 3
+
+    def test_embed_documents_per_call_in_flight_cap(self) -> None:
+        """A caller's max_in_flight lowers the embedder's own concurrency."""
+        import threading
+        import time
+
+        lock = threading.Lock()
+        in_flight = peak = 0
+
+        def fake_embed(texts, **kwargs):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.01)
+            with lock:
+                in_flight -= 1
+            response = MagicMock()
+            response.embeddings = [[0.0] for _ in texts]
+            response.total_tokens = len(texts)
+            return response
+
+        with patch("voyageai.Client") as mock_client_class:
+            mock_client_class.return_value.embed.side_effect = fake_embed
+            embedder = VoyageEmbedder(api_key="test-key", max_in_flight=3)
+            result = embedder.embed_documents(
+                [f"doc{i}" for i in range(6)], batch_size=1, max_in_flight=1
+            )
+
+        assert len(result.embeddings) == 6
+        assert peak == 1
+
+    def test_embed_documents_concurrent_failure_propagates(self) -> None:
+        """A failing batch should surface its error from a concurrent dispatch."""
+        with patch("voyageai.Client") as mock_client_class:
+            mock_client = MagicMock()
+            mock_client.embed.side_effect = ConnectionError("permanent failure")
+            mock_client_class.return_value = mock_client
+
+            with patch("time.sleep"):
+                embedder = VoyageEmbedder(api_key="test-key", max_in_flight=2)
+                with pytest.raises(ConnectionError, match="permanent failure"):
+                    embedder.embed_documents(["doc1", "doc2", "doc3"], batch_size=1)
+
     def test_embed_query(self) -> None:
         """Should embed a single query."""
         mock_response = MagicMock()
@@ -107,6 +268,34 @@ class TestVoyageEmbedder:
                 input_type="query",
             )
 
+    def test_concurrent_identical_async_queries_share_one_call(self) -> None:
+        """Identical queries in flight together should make a single API call."""
+        import asyncio
+
+        calls = []
+
+        async def fake_fetch(texts):
+            calls.extend(texts)
+            await asyncio.sleep(0.01)
+            return [[0.5] * 4 for _ in texts], 3 * len(texts)
+
+        async def search_concurrently(embedder):
+            return await asyncio.gather(
+                embedder.embed_query_async("find auth"),
+                embedder.embed_query_async("find auth"),
+                embedder.embed_query_async("other"),
+            )
+
+        with patch("voyageai.Client"):
+            embedder = VoyageEmbedder(api_key="test-key")
+            embedder._embed_queries_with_fast_retry_async = fake_fetch
+            results = asyncio.run(search_concurrently(embedder))
+
+        assert results == [[0.5] * 4] * 3
+        assert sorted(calls) == ["find auth", "other"]
+        assert embedder.total_tokens_used == 6
+        assert embedder._inflight_queries == {}
+
     def test_cost_warning_at_5_dollar_threshold(self) -> None:
         """Should log warning when cost exceeds $5 threshold."""
         mock_response = MagicMock()
@@ -238,6 +427,204 @@ class TestVoyageEmbedder:
                 # Fast retry: QUERY_MAX_RETRIES = 2
                 assert mock_client.embed.call_count == 2
 
+    def test_batch_token_budget_adapts_to_rejections(self) -> None:
+        """Token-limit errors halve the batch budget; success streaks grow it back."""
+        import lgrep.embeddings as embeddings_module
+
+        def fake_embed(*, texts, **kwargs):
+            if len(texts) > 1:
+                raise RuntimeError("Request exceeds max allowed tokens per batch")
+            response = MagicMock()
+            response.embeddings = [[0.1] * 1024]
+            response.total_tokens = 1
+            return response
+
+        with patch("voyageai.Client") as mock_client_class:
+            mock_client = MagicMock()
+            mock_client.embed.side_effect = fake_embed
+            mock_client_class.return_value = mock_client
+
+            embedder = VoyageEmbedder(api_key="test-key", max_in_flight=1)
+            assert embedder.batch_token_budget == embeddings_module.INITIAL_BATCH_TOKENS
+            result = embedder.embed_documents(["a", "b"])
+            assert len(result.embeddings) == 2
+            assert embedder.batch_token_budget == embeddings_module.INITIAL_BATCH_TOKENS // 2
+
+            embedder.embed_documents(["x"] * 8, batch_size=1)
+            assert embedder.batch_token_budget == int(
+                embeddings_module.INITIAL_BATCH_TOKENS // 2 * embeddings_module.TOKEN_BUDGET_GROWTH
+            )
+
+    def test_repeated_queries_served_from_memory(self) -> None:
+        """Repeat queries should skip the API; the least recently used is evicted."""
+        mock_response = MagicMock()
+        mock_response.embeddings = [[0.5] * 1024]
+        mock_response.total_tokens = 10
+
+        with patch("voyageai.Client") as mock_client_class:
+            mock_client = MagicMock()
+            mock_client.embed.return_value = mock_response
+            mock_client_class.return_value = mock_client
+
+            embedder = VoyageEmbedder(api_key="test-key")
+            with patch("lgrep.embeddings.QUERY_CACHE_SIZE", 2):
+                for query in ("a", "b", "a", "c", "a", "b"):
+                    embedder.embed_query(query)
+
+        sent = [call.kwargs["texts"] for call in mock_client.embed.call_args_list]
+        assert sent == [["a"], ["b"], ["c"], ["b"]]
+        assert embedder.total_tokens_used == 40
+
+    def test_embedding_cache_serves_hits_and_embeds_only_misses(self, tmp_path) -> None:
+        """Cached texts should skip the API; only distinct misses are embedded."""
+        cache = EmbeddingCache(tmp_path / "embeddings.sqlite3")
+
+        def fake_embed(*, texts, **kwargs):
+            response = MagicMock()
+            response.embeddings = [[float(len(t))] * 4 for t in texts]
+            response.total_tokens = 10 * len(texts)
+            return response
+
+        with patch("voyageai.Client") as mock_client_class:
+            mock_client = MagicMock()
+            mock_client.embed.side_effect = fake_embed
+            mock_client_class.return_value = mock_client
+
+            embedder = VoyageEmbedder(api_key="test-key", cache=cache)
+            first = embedder.embed_documents(["a", "bb"])
+            second = embedder.embed_documents(["bb", "ccc", "ccc", "a"])
+            query_vectors = [embedder.embed_query("q"), embedder.embed_query("q")]
+
+        assert first.embeddings == [[1.0] * 4, [2.0] * 4]
+        assert second.embeddings == [[2.0] * 4, [3.0] * 4, [3.0] * 4, [1.0] * 4]
+        assert second.token_usage == 10
+        sent = [call.kwargs["texts"] for call in mock_client.embed.call_args_list]
+        assert sent == [["a", "bb"], ["ccc"], ["q"]]
+        assert query_vectors[0] == query_vectors[1] == [1.0] * 4
+
+    def test_async_queries_persist_across_embedders(self, tmp_path) -> None:
+        """A restarted server answers previously seen queries from disk, and
+        a mixed batch sends only the unseen queries to the API."""
+        import asyncio
+
+        def fake_embed(*, texts, **kwargs):
+            response = MagicMock()
+            response.embeddings = [[float(len(t))] * 4 for t in texts]
+            response.total_tokens = len(texts)
+            return response
+
+        async def ask(embedder, *queries):
+            return await asyncio.gather(*(embedder.embed_query_async(q) for q in queries))
+
+        with patch("voyageai.Client") as mock_client_class:
+            mock_client = MagicMock()
+            mock_client.embed.side_effect = fake_embed
+            mock_client_class.return_value = mock_client
+
+            first = VoyageEmbedder(api_key="test-key", cache=EmbeddingCache(tmp_path / "e.db"))
+            asyncio.run(ask(first, "auth"))
+            first.close()
+            second = VoyageEmbedder(api_key="test-key", cache=EmbeddingCache(tmp_path / "e.db"))
+            results = asyncio.run(ask(second, "auth", "db pool"))
+            second.close()
+
+        assert results == [[4.0] * 4, [7.0] * 4]
+        sent = [call.kwargs["texts"] for call in mock_client.embed.call_args_list]
+        assert sent == [["auth"], ["db pool"]]
+        assert second.total_tokens_used == 1
+
+
+class TestPackBatches:
+    """Tests for token-aware batch packing."""
+
+    def test_matches_greedy_packing(self) -> None:
+        """Bisection packing should equal the greedy one-text-at-a-time loop."""
+        import random
+
+        from lgrep.embeddings import _pack_batches
+
+        def greedy(texts, batch_size, budget):
+            batches, current, tokens = [], [], 0
+            for text in texts:
+                est = len(text) // 4
+                if current and (len(current) >= batch_size or tokens + est > budget):
+                    batches.append(current)
+                    current, tokens = [], 0
+                current.append(text)
+                tokens += est
+            return [*batches, current] if current else batches
+
+        rng = random.Random(7)
+        for _ in range(200):
+            texts = ["x" * rng.randrange(0, 400) for _ in range(rng.randrange(0, 60))]
+            batch_size, budget = rng.randrange(1, 12), rng.randrange(0, 300)
+            assert _pack_batches(texts, batch_size, budget) == greedy(texts, batch_size, budget)
+
+    def test_single_call_fast_path(self) -> None:
+        """Texts that fit one call should be passed through without copying."""
+        from lgrep.embeddings import _pack_batches
+
+        texts = ["x" * 40] * 10
+
+        [batch] = _pack_batches(texts, batch_size=10, token_budget=100)
+        assert batch is texts
+        assert len(_pack_batches(texts, batch_size=10, token_budget=99)) == 2
+
+
+class TestTokenBucket:
+    """Tests for client-side rate shaping."""
+
+    def test_acquire_waits_for_refill(self, fake_clock) -> None:
+        """Requests beyond the burst should wait exactly as long as refill needs."""
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            fake_clock.advance(seconds)
+
+        bucket = TokenBucket(rate_per_s=100, burst=200, clock=fake_clock, sleep=sleep)
+
+        assert bucket.acquire(150) == 0
+        assert bucket.acquire(150) == pytest.approx(1.0)
+        # Oversized requests are clamped to the burst instead of blocking forever.
+        assert bucket.acquire(10_000) == pytest.approx(2.0)
+        assert sleeps == [pytest.approx(1.0), pytest.approx(2.0)]
+
+    def test_pause_blocks_for_retry_after(self, fake_clock) -> None:
+        """A Retry-After pause should hold admission until the window reopens."""
+        bucket = TokenBucket(rate_per_s=100, burst=100, clock=fake_clock, sleep=fake_clock.advance)
+
+        bucket.pause(3.0)
+
+        assert bucket.acquire(1) == pytest.approx(3.0 + 1 / 100)
+
+    def test_rate_limit_retry_after_replaces_backoff(self) -> None:
+        """A 429 with Retry-After should pause the buckets, not sleep exponentially."""
+        import voyageai
+
+        mock_response = MagicMock()
+        mock_response.embeddings = [[0.1] * 1024]
+        mock_response.total_tokens = 5
+        rate_limited = voyageai.error.RateLimitError("slow down", headers={"retry-after": "2"})
+
+        with patch("voyageai.Client") as mock_client_class:
+            mock_client = MagicMock()
+            mock_client.embed.side_effect = [rate_limited, mock_response]
+            mock_client_class.return_value = mock_client
+
+            embedder = VoyageEmbedder(api_key="test-key")
+            with (
+                patch.object(embedder._request_rate, "pause") as pause_requests,
+                patch.object(embedder._token_rate, "pause") as pause_tokens,
+                patch("time.sleep") as sleep,
+            ):
+                result = embedder.embed_documents(["doc1"])
+
+        assert len(result.embeddings) == 1
+        pause_requests.assert_called_once_with(2.0)
+        pause_tokens.assert_called_once_with(2.0)
+        sleep.assert_not_called()
+
 
 class TestEmbeddingResult:
     """Tests for EmbeddingResult dataclass."""
@@ -9,6 +9,8 @@ Verifies:
 
 from __future__ import annotations
 
+import asyncio
+import threading
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -110,6 +112,68 @@ class TestEmbedQueryAsync:
 
         assert embedder.total_tokens_used == initial_tokens + 100
 
+    @pytest.mark.asyncio
+    async def test_embed_query_async_runs_on_query_pool(self, mock_embedder):
+        """The API call runs on the embedder's own query threads, not the
+        loop's default executor."""
+        embedder, mock_client = mock_embedder
+        threads = []
+
+        def embed(texts, **kwargs):
+            threads.append(threading.current_thread().name)
+            result = MagicMock()
+            result.embeddings = [[0.1]]
+            result.total_tokens = 1
+            return result
+
+        mock_client.embed.side_effect = embed
+
+        await embedder.embed_query_async("pool query")
+        embedder.close()
+
+        assert threads[0].startswith("lgrep-embed-query")
+
+    @pytest.mark.asyncio
+    async def test_concurrent_distinct_queries_share_one_request(self, mock_embedder):
+        """Distinct queries arriving together are embedded in one API call,
+        split at query_batch_size."""
+        embedder, mock_client = mock_embedder
+        embedder.query_batch_size = 3
+
+        def embed(texts, **kwargs):
+            result = MagicMock()
+            result.embeddings = [[float(len(t))] for t in texts]
+            result.total_tokens = len(texts)
+            return result
+
+        mock_client.embed.side_effect = embed
+
+        queries = ["a", "bb", "ccc", "dddd"]
+        results = await asyncio.gather(*(embedder.embed_query_async(q) for q in queries))
+
+        assert results == [[1.0], [2.0], [3.0], [4.0]]
+        assert [c.kwargs["texts"] for c in mock_client.embed.call_args_list] == [
+            ["a", "bb", "ccc"],
+            ["dddd"],
+        ]
+        assert embedder.total_tokens_used == 4
+
+    @pytest.mark.asyncio
+    async def test_batch_failure_reaches_every_caller(self, mock_embedder):
+        """A failed batch raises in every query that was waiting on it."""
+        embedder, mock_client = mock_embedder
+        mock_client.embed.side_effect = RuntimeError("down")
+
+        with patch("lgrep.embeddings.asyncio.sleep", new_callable=AsyncMock):
+            results = await asyncio.gather(
+                embedder.embed_query_async("one"),
+                embedder.embed_query_async("two"),
+                return_exceptions=True,
+            )
+
+        assert [str(r) for r in results] == ["down", "down"]
+        assert mock_client.embed.call_count == QUERY_MAX_RETRIES
+
 
 class TestSyncPathUnchanged:
     """Verify sync embed_query still uses time.sleep (not asyncio.sleep)."""
@@ -610,6 +610,24 @@ class TestCompactSerialization:
         assert loaded.repo_path == "/repo/legacy"
         assert loaded.files == {"a.py": "h"}
 
+    def test_index_round_trips_with_and_without_orjson(self, tmp_path, monkeypatch):
+        """Either serializer writes an index the other reads back identically."""
+        import lgrep.storage.index_store as index_store
+        from lgrep.storage.index_store import CodeIndex, IndexStore
+
+        index = CodeIndex(
+            repo_path="/repo/unicode",
+            files={"café.py": "h"},
+            symbols={"s": {"kind": "function", "name": "naïve", "line": 3}},
+            occurrences={"naïve": [{"line": 3}]},
+        )
+        IndexStore(storage_dir=tmp_path / "fast").save(index)
+        monkeypatch.setattr(index_store, "orjson", None)
+        IndexStore(storage_dir=tmp_path / "stdlib").save(index)
+
+        for saved in ("fast", "stdlib"):
+            assert IndexStore(storage_dir=tmp_path / saved).load("/repo/unicode") == index
+
 
 class TestDeleteRemovesSidecar:
     """delete_index() must remove the sidecar alongside the index (AC4).
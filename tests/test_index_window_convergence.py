@@ -58,6 +58,9 @@ def tmp_project(tmp_path, mock_storage, mock_embedder, fake_clock):
         embedder=mock_embedder,
         chunk_size=500,
         perf_counter=fake_clock,
+        # One file at a time keeps per-file clock advances and budget checks
+        # in lockstep; concurrent windows are covered in test_indexing.
+        workers=1,
     )
     return tmp_path, indexer
 
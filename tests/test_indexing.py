@@ -1,10 +1,11 @@
 """Tests for the indexing logic."""
 
-from unittest.mock import MagicMock
+import os
+from unittest.mock import MagicMock, call, patch
 
 import pytest
 
-from lgrep.indexing import Indexer
+from lgrep.indexing import MAX_EMBED_REQUESTS_IN_FLIGHT, Indexer
 from lgrep.storage import ChunkStore
 
 
@@ -60,6 +61,23 @@ class TestIndexer:
         # Verify embedder.embed_documents was called
         assert mock_embedder.embed_documents.called
 
+    def test_full_passes_match_embedding_width(self, tmp_path, mock_embedder, mock_storage):
+        """Full passes rebuild a table of another width; incremental re-indexes do not."""
+        (tmp_path / "a.py").write_text("def a(): pass")
+        mock_embedder.output_dimension = 512
+        mock_storage.get_file_hashes.return_value = {}
+        mock_storage.get_file_stats.return_value = {}
+        mock_storage.get_zero_chunk_files.return_value = []
+        mock_storage.get_indexed_files.return_value = set()
+        indexer = Indexer(tmp_path, mock_storage, mock_embedder)
+
+        indexer.index_files([tmp_path / "a.py"])
+        mock_storage.reset_dimension.assert_not_called()
+
+        indexer.index_all()
+        indexer.index_all_batched()
+        assert mock_storage.reset_dimension.call_args_list == [call(512), call(512)]
+
     def test_index_file_incremental(self, tmp_path, mock_embedder, mock_storage):
         """Should index a single file (incremental)."""
         file_path = tmp_path / "c.py"
@@ -80,6 +98,66 @@ class TestIndexer:
         mock_storage.delete_by_file.assert_called_with("c.py")
         assert mock_storage.add_chunks.called
 
+    def test_index_files_batches_changed_files(self, tmp_path, mock_embedder, mock_storage):
+        """Changed files share one embed call, one delete and one append."""
+        for name in ("a.py", "b.py", "empty.py"):
+            (tmp_path / name).write_text("" if name == "empty.py" else f"def {name[0]}(): pass")
+        mock_storage.get_file_hash.return_value = None
+        mock_storage.get_file_stats.return_value = {}
+
+        indexer = Indexer(project_path=tmp_path, storage=mock_storage, embedder=mock_embedder)
+        status = indexer.index_files([tmp_path / "a.py", "b.py", tmp_path / "empty.py"])
+
+        assert status.file_count == 3
+        assert mock_embedder.embed_documents.call_count == 1
+        mock_storage.delete_by_files.assert_any_call(["empty.py"])
+        mock_storage.delete_by_files.assert_any_call(["a.py", "b.py"])
+        assert mock_storage.add_chunks.call_count == 1
+        mock_storage.delete_by_file.assert_not_called()
+
+    def test_index_files_chunks_in_process_and_saves_stats(
+        self, tmp_path, mock_embedder, mock_storage
+    ):
+        """A large watcher batch never spawns a chunking pool, and its hashes persist."""
+        from lgrep.chunking import PARALLEL_CHUNK_MIN_FILES
+
+        paths = []
+        for i in range(PARALLEL_CHUNK_MIN_FILES + 2):
+            path = tmp_path / f"m{i}.py"
+            path.write_text(f"def m{i}(): pass")
+            os.utime(path, ns=(0, 0))  # old enough to record in the stat cache
+            paths.append(path)
+        mock_storage.get_file_hash.return_value = None
+        mock_storage.get_file_stats.return_value = {}
+
+        indexer = Indexer(project_path=tmp_path, storage=mock_storage, embedder=mock_embedder)
+        with patch("concurrent.futures.ProcessPoolExecutor") as pool:
+            status = indexer.index_files(paths)
+
+        pool.assert_not_called()
+        assert status.file_count == len(paths)
+        [saved] = mock_storage.set_file_stats.call_args.args
+        assert set(saved) == {p.name for p in paths}
+
+    def test_chunk_ids_are_deterministic(self, tmp_path, mock_embedder, mock_storage):
+        """Chunk ids should be stable per content and distinct per path."""
+        import hashlib
+
+        content = "\n\n".join(f"def f{i}():\n    return {i}" for i in range(40))
+        (tmp_path / "a.py").write_text(content)
+        (tmp_path / "b.py").write_text(content)
+        indexer = Indexer(project_path=tmp_path, storage=mock_storage, embedder=mock_embedder)
+
+        indexer.index_file(tmp_path / "a.py")
+        indexer.index_file(tmp_path / "b.py")
+        indexer.index_file(tmp_path / "a.py")
+
+        first, second, again = (call.args[0] for call in mock_storage.add_chunks.call_args_list)
+        prefix = hashlib.sha256(content.encode()).hexdigest()[:16]
+        assert [c.id for c in first] == [f"{prefix}:a.py:{i}" for i in range(len(first))]
+        assert [c.id for c in again] == [c.id for c in first]
+        assert not {c.id for c in first} & {c.id for c in second}
+
     def test_index_file_skips_if_hash_matches(self, tmp_path, mock_embedder, mock_storage):
         """Should skip indexing if file hash hasn't changed."""
         file_path = tmp_path / "unchanged.py"
@@ -105,3 +183,260 @@ class TestIndexer:
         assert not mock_storage.add_chunks.called
         # But should have checked the hash
         mock_storage.get_file_hash.assert_called_with("unchanged.py")
+
+    def test_index_file_passes_batch_size_to_embedder(self, tmp_path, mock_embedder, mock_storage):
+        """Embedding requests should use the configured batch size, clamped to the API max."""
+        file_path = tmp_path / "d.py"
+        file_path.write_text("def d(): pass")
+        mock_storage.get_file_hash.return_value = None
+
+        indexer = Indexer(tmp_path, mock_storage, mock_embedder, batch_size=16)
+        indexer.index_file(file_path)
+
+        assert mock_embedder.embed_documents.call_args.kwargs["batch_size"] == 16
+        # Workers split the shared cap on concurrent Voyage requests.
+        assert mock_embedder.embed_documents.call_args.kwargs["max_in_flight"] == (
+            MAX_EMBED_REQUESTS_IN_FLIGHT // indexer.workers
+        )
+        assert Indexer(tmp_path, mock_storage, mock_embedder, batch_size=1000).batch_size == 128
+
+    def test_bad_index_workers_env_falls_back_to_default(
+        self, tmp_path, mock_embedder, mock_storage, monkeypatch
+    ):
+        """A non-numeric LGREP_INDEX_WORKERS should not break Indexer construction."""
+        from lgrep.indexing import DEFAULT_INDEX_WORKERS
+
+        monkeypatch.setenv("LGREP_INDEX_WORKERS", "many")
+        assert Indexer(tmp_path, mock_storage, mock_embedder).workers == DEFAULT_INDEX_WORKERS
+
+        monkeypatch.setenv("LGREP_INDEX_WORKERS", "3")
+        assert Indexer(tmp_path, mock_storage, mock_embedder).workers == 3
+
+    def test_flush_persists_snapshot_while_hashing_concurrently(
+        self, tmp_path, mock_embedder, mock_storage
+    ):
+        """Flushes serialize a copy, so concurrent hashing never mutates it mid-write."""
+        import threading
+
+        old_ns = 1_000_000_000_000_000_000
+        paths = []
+        for i in range(200):
+            path = tmp_path / f"f{i}.py"
+            path.write_text(f"x = {i}")
+            os.utime(path, ns=(old_ns, old_ns))
+            paths.append(path)
+        mock_storage.get_file_stats.return_value = {}
+        indexer = Indexer(tmp_path, mock_storage, mock_embedder)
+
+        def hash_all():
+            for path in paths:
+                indexer._compute_file_hash(path, path.name)
+
+        workers = [threading.Thread(target=hash_all) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for _ in range(20):
+            indexer._flush_file_stats()
+        for worker in workers:
+            worker.join()
+        indexer._flush_file_stats()
+
+        snapshots = [c.args[0] for c in mock_storage.set_file_stats.call_args_list]
+        assert all(snapshot is not indexer._file_stats for snapshot in snapshots)
+        assert len(snapshots[-1]) == len(paths)
+
+    def test_file_hash_reuses_stat_cache_for_unchanged_files(
+        self, tmp_path, mock_embedder, mock_storage
+    ):
+        """Unchanged (mtime_ns, size) should skip the read; any change re-hashes."""
+        import hashlib
+        import os
+
+        file_path = tmp_path / "e.py"
+        file_path.write_text("def e(): pass")
+        old_ns = 1_000_000_000_000_000_000
+        os.utime(file_path, ns=(old_ns, old_ns))
+        digest = hashlib.sha256(file_path.read_bytes()).hexdigest()
+        mock_storage.get_file_stats.return_value = {}
+
+        indexer = Indexer(tmp_path, mock_storage, mock_embedder)
+        assert indexer._compute_file_hash(file_path, "e.py") == digest
+        indexer._flush_file_stats()
+        persisted = mock_storage.set_file_stats.call_args.args[0]
+        assert persisted == {"e.py": (old_ns, file_path.stat().st_size, digest)}
+
+        # A stale-but-matching stat entry wins without touching file contents.
+        mock_storage.get_file_stats.return_value = {"e.py": persisted["e.py"][:2] + ("cached",)}
+        fresh = Indexer(tmp_path, mock_storage, mock_embedder)
+        assert fresh._compute_file_hash(file_path, "e.py") == "cached"
+
+        os.utime(file_path, ns=(old_ns + 1, old_ns + 1))
+        assert fresh._compute_file_hash(file_path, "e.py") == digest
+
+        # Recently modified files are hashed but never recorded (racy mtime).
+        file_path.write_text("def e(): return 1")
+        racy = Indexer(tmp_path, mock_storage, mock_embedder)
+        racy._file_stats = {}
+        racy._compute_file_hash(file_path, "e.py")
+        assert racy._file_stats == {}
+
+    def test_index_window_indexes_files_concurrently(self, tmp_path, mock_embedder, mock_storage):
+        """With workers > 1, files overlap in flight and every result is accounted for."""
+        import threading
+
+        for name in ("a.py", "b.py", "c.py", "d.py"):
+            (tmp_path / name).write_text(f"def {name[0]}(): pass")
+        mock_storage.get_file_hashes.return_value = {}
+        mock_storage.get_file_stats.return_value = {}
+        mock_storage.get_zero_chunk_files.return_value = []
+        mock_storage.get_indexed_files.return_value = set()
+
+        indexer = Indexer(tmp_path, mock_storage, mock_embedder, workers=2)
+        barrier = threading.Barrier(2, timeout=5)
+        original_index_file = indexer.index_file
+
+        def paired_index_file(file_path, cancel_event=None):
+            barrier.wait()  # only passes if two files are in flight together
+            return original_index_file(file_path, cancel_event=cancel_event)
+
+        indexer.index_file = paired_index_file
+        result = indexer.index_window()
+
+        assert result.complete
+        assert sorted(result.indexed_files) == ["a.py", "b.py", "c.py", "d.py"]
+        assert result.status.file_count == 4
+        assert mock_storage.add_chunks.call_count == 4
+
+    def test_concurrent_window_cancel_drains_and_raises(
+        self, tmp_path, mock_embedder, mock_storage
+    ):
+        """Cancelling a concurrent window stops new files and raises OperationCancelled."""
+        import threading
+
+        from lgrep.indexing import IndexStatus, OperationCancelled
+
+        for i in range(6):
+            (tmp_path / f"f{i}.py").write_text(f"def f{i}(): pass")
+        indexer = Indexer(tmp_path, mock_storage, mock_embedder, workers=2)
+        cancel_event = threading.Event()
+        started = []
+
+        def cancelling_index_file(file_path, cancel_event=None):
+            started.append(file_path)
+            cancel_event.set()
+            return IndexStatus(file_count=1)
+
+        indexer.index_file = cancelling_index_file
+        pending = [f"f{i}.py" for i in range(6)]
+
+        with pytest.raises(OperationCancelled):
+            indexer.index_window(cancel_event=cancel_event, pending_files=pending)
+
+        assert len(started) <= 2
+        mock_storage.prepare_hybrid_indexes.assert_called()
+
+    def test_index_all_batched_coalesces_chunks_across_files(
+        self, tmp_path, mock_embedder, mock_storage
+    ):
+        """Small files should share embedding calls and be stored per wave."""
+        for i in range(5):
+            (tmp_path / f"m{i}.py").write_text(f"def m{i}(): pass")
+        (tmp_path / "empty.py").write_text("")
+        mock_storage.get_file_hashes.return_value = {}
+        mock_storage.get_file_stats.return_value = {}
+        mock_storage.get_zero_chunk_files.return_value = []
+        mock_storage.get_indexed_files.return_value = set()
+
+        indexer = Indexer(tmp_path, mock_storage, mock_embedder)
+        status = indexer.index_all_batched(max_buffered_chunks=3)
+
+        embed_calls = mock_embedder.embed_documents.call_args_list
+        assert [len(call.args[0]) for call in embed_calls] == [3, 2]
+        stored = [c for call in mock_storage.add_chunks.call_args_list for c in call.args[0]]
+        assert sorted(c.file_path for c in stored) == [f"m{i}.py" for i in range(5)]
+        assert all(c.file_hash for c in stored)
+        assert status.file_count == 6
+        assert status.chunk_count == 5
+        assert status.total_tokens == 50
+        mock_storage.add_zero_chunk_files.assert_called_once_with(["empty.py"])
+        mock_storage.prepare_hybrid_indexes.assert_called()
+
+    def test_index_all_batched_overlaps_chunking_with_embedding(
+        self, tmp_path, mock_embedder, mock_storage, monkeypatch
+    ):
+        """The next group should be chunked while the previous wave is embedding."""
+        import threading
+
+        import lgrep.indexing as indexing_module
+
+        for i in range(3):
+            (tmp_path / f"m{i}.py").write_text(f"def m{i}(): pass")
+        mock_storage.get_file_hashes.return_value = {}
+        mock_storage.get_file_stats.return_value = {}
+        mock_storage.get_zero_chunk_files.return_value = []
+        mock_storage.get_indexed_files.return_value = set()
+        monkeypatch.setattr(indexing_module, "BATCHED_CHUNK_FILES", 1)
+
+        indexer = Indexer(tmp_path, mock_storage, mock_embedder)
+        chunked_next = threading.Event()
+        chunk_calls = 0
+        original_chunk_files = indexer.chunker.chunk_files
+
+        def recording_chunk_files(paths):
+            nonlocal chunk_calls
+            chunk_calls += 1
+            if chunk_calls == 2:
+                chunked_next.set()
+            return original_chunk_files(paths)
+
+        overlapped = []
+        embed = mock_embedder.embed_documents.side_effect
+
+        def waiting_embed(texts, **kwargs):
+            if not overlapped:
+                overlapped.append(chunked_next.wait(timeout=5))
+            return embed(texts, **kwargs)
+
+        indexer.chunker.chunk_files = recording_chunk_files
+        mock_embedder.embed_documents.side_effect = waiting_embed
+        status = indexer.index_all_batched(max_buffered_chunks=1)
+
+        assert overlapped == [True]
+        assert mock_embedder.embed_documents.call_count == 3
+        assert status.chunk_count == 3
+
+    def test_large_file_hash_overlaps_chunking(
+        self, tmp_path, mock_embedder, mock_storage, monkeypatch
+    ):
+        """Large changed files are hashed off-thread; an unchanged digest still skips embedding."""
+        import hashlib
+        import threading
+
+        import lgrep.indexing as indexing_module
+
+        file_path = tmp_path / "big.py"
+        file_path.write_text("def big(): pass")
+        digest = hashlib.sha256(file_path.read_bytes()).hexdigest()
+        monkeypatch.setattr(indexing_module, "OVERLAP_HASH_MIN_BYTES", 0)
+        mock_storage.get_file_stats.return_value = {}
+        mock_storage.get_file_hash.return_value = None
+
+        indexer = Indexer(tmp_path, mock_storage, mock_embedder)
+        hash_threads = []
+        original_hash_file = indexer._hash_file
+
+        def recording_hash_file(*args):
+            hash_threads.append(threading.current_thread().name)
+            return original_hash_file(*args)
+
+        indexer._hash_file = recording_hash_file
+        indexer.index_file(file_path)
+
+        assert hash_threads and hash_threads[0].startswith("lgrep-hash")
+        stored = mock_storage.add_chunks.call_args.args[0]
+        assert {c.file_hash for c in stored} == {digest}
+
+        mock_embedder.embed_documents.reset_mock()
+        mock_storage.get_file_hash.return_value = digest
+        assert indexer.index_file(file_path).chunk_count == 0
+        assert not mock_embedder.embed_documents.called
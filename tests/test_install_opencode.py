@@ -7,6 +7,8 @@ custom tool template is updated.
 """
 
 import json
+import os
+from pathlib import Path
 from unittest.mock import patch
 
 from lgrep.install_opencode import (
@@ -170,6 +172,91 @@ class TestInstallUninstall:
         assert "~/.config/opencode/instructions/identity.md" in config["instructions"]
         assert "~/.config/opencode/instructions/lgrep-tools.md" in config["instructions"]
 
+    def test_install_writes_config_atomically_through_symlink(self, tmp_path):
+        """The config is replaced via a temp file, a symlinked config stays a symlink,
+        and the file's permission bits survive the replace."""
+        config_dir = tmp_path / ".config" / "opencode"
+        instruction_path = config_dir / "instructions" / "lgrep-tools.md"
+        skill_path = config_dir / "skills" / "lgrep" / "SKILL.md"
+        config_path = config_dir / "opencode.json"
+        dotfiles_config = tmp_path / "dotfiles" / "opencode.json"
+        dotfiles_config.parent.mkdir()
+        dotfiles_config.write_text(json.dumps({"mcp": {}}))
+        dotfiles_config.chmod(0o600)
+        config_dir.mkdir(parents=True)
+        config_path.symlink_to(dotfiles_config)
+
+        with (
+            patch("lgrep.install_opencode.OPENCODE_CONFIG_DIR", config_dir),
+            patch("lgrep.install_opencode.INSTRUCTION_DIR", instruction_path.parent),
+            patch("lgrep.install_opencode.INSTRUCTION_PATH", instruction_path),
+            patch("lgrep.install_opencode.SKILL_DIR", skill_path.parent),
+            patch("lgrep.install_opencode.SKILL_PATH", skill_path),
+            patch("lgrep.install_opencode._config_path", return_value=config_path),
+            patch("lgrep.install_opencode.os.replace", wraps=os.replace) as replace,
+        ):
+            install()
+
+        assert config_path.is_symlink()
+        assert "lgrep" in json.loads(dotfiles_config.read_text())["mcp"]
+        (tmp_file, target), _ = replace.call_args
+        assert target == dotfiles_config
+        assert not Path(tmp_file).exists()
+        assert sorted(p.name for p in dotfiles_config.parent.iterdir()) == ["opencode.json"]
+        assert dotfiles_config.stat().st_mode & 0o777 == 0o600
+
+    def test_repeat_install_leaves_current_jsonc_config_untouched(self, tmp_path):
+        """A .jsonc config is found, and is not rewritten once the entry is current."""
+        config_dir = tmp_path / ".config" / "opencode"
+        instruction_path = config_dir / "instructions" / "lgrep-tools.md"
+        skill_path = config_dir / "skills" / "lgrep" / "SKILL.md"
+        config_path = config_dir / "opencode.jsonc"
+        config_dir.mkdir(parents=True)
+        config_path.write_text('{"mcp": {}}')
+
+        with (
+            patch("lgrep.install_opencode.OPENCODE_CONFIG_DIR", config_dir),
+            patch("lgrep.install_opencode.INSTRUCTION_DIR", instruction_path.parent),
+            patch("lgrep.install_opencode.INSTRUCTION_PATH", instruction_path),
+            patch("lgrep.install_opencode.SKILL_DIR", skill_path.parent),
+            patch("lgrep.install_opencode.SKILL_PATH", skill_path),
+            patch("lgrep.install_opencode.os.replace", wraps=os.replace) as replace,
+        ):
+            install()
+            text = config_path.read_text().replace("{", "{ // kept\n", 1)
+            config_path.write_text(text)
+            install()
+
+        assert replace.call_count == 1
+        assert config_path.read_text() == text
+        assert not (config_dir / "opencode.json").exists()
+
+    def test_install_skips_copy_when_skill_dir_is_symlink_into_package(self, tmp_path, capsys):
+        """A skill dir symlinked into the package is recognised as the same file."""
+        fake_pkg_skill_dir = tmp_path / "pkg" / "skills" / "lgrep"
+        fake_pkg_skill_dir.mkdir(parents=True)
+        fake_pkg_skill = fake_pkg_skill_dir / "SKILL.md"
+        fake_pkg_skill.write_text("FAKE_PACKAGE_SKILL_SENTINEL")
+        config_dir = tmp_path / ".config" / "opencode"
+        (config_dir / "skills").mkdir(parents=True)
+        skill_dir_link = config_dir / "skills" / "lgrep"
+        skill_dir_link.symlink_to(fake_pkg_skill_dir)
+        instruction_path = config_dir / "instructions" / "lgrep-tools.md"
+
+        with (
+            patch("lgrep.install_opencode._PACKAGE_SKILL", fake_pkg_skill),
+            patch("lgrep.install_opencode.OPENCODE_CONFIG_DIR", config_dir),
+            patch("lgrep.install_opencode.INSTRUCTION_DIR", instruction_path.parent),
+            patch("lgrep.install_opencode.INSTRUCTION_PATH", instruction_path),
+            patch("lgrep.install_opencode.SKILL_DIR", skill_dir_link),
+            patch("lgrep.install_opencode.SKILL_PATH", skill_dir_link / "SKILL.md"),
+            patch("lgrep.install_opencode._config_path", return_value=config_dir / "opencode.json"),
+        ):
+            assert install() == 0
+
+        assert "(same file)" in capsys.readouterr().out
+        assert fake_pkg_skill.read_text() == "FAKE_PACKAGE_SKILL_SENTINEL"
+
     def test_uninstall_refuses_when_skill_dir_is_symlink_into_package(self, tmp_path):
         """When SKILL_DIR itself is a symlink whose target lives inside the
         installed package tree (common dev-workflow setup:
@@ -81,6 +81,7 @@ async def test_full_flow_integration(sample_project):
 
     with patch("lgrep.server.lifecycle.VoyageEmbedder") as mock_embedder_class:
         mock_embedder = MagicMock()
+        mock_embedder.output_dimension = 1024
         mock_embedder.embed_documents.side_effect = mock_embed_docs
         mock_embedder.embed_query.side_effect = mock_embed_query
         mock_embedder.embed_query_async = AsyncMock(side_effect=mock_embed_query_async)
@@ -170,6 +171,7 @@ def charge_card(card_number, amount):
 
         with patch("lgrep.server.lifecycle.VoyageEmbedder") as mock_embedder_class:
             mock_embedder = MagicMock()
+            mock_embedder.output_dimension = 1024
             mock_embedder.embed_documents.side_effect = mock_embed_docs
             mock_embedder.embed_query.side_effect = mock_embed_query
             mock_embedder.embed_query_async = AsyncMock(side_effect=mock_embed_query_async)
@@ -66,6 +66,13 @@ class TestLoadJsoncComments:
         """)
         assert load_jsonc_text(text) == {"a": 1, "b": 2}
 
+    def test_utf8_bytes_input(self):
+        """Raw file bytes parse the same as the decoded text, with or without comments."""
+        plain = '{"name": "café"}'.encode()
+        commented = '{\n  // note\n  "name": "café",\n}'.encode()
+        assert load_jsonc_text(plain) == {"name": "café"}
+        assert load_jsonc_text(commented) == {"name": "café"}
+
     def test_block_comment_at_end(self):
         """/* block comment */ at the end of the file is stripped."""
         text = '{"key": "value"} /* trailing block comment */'
@@ -160,6 +167,39 @@ class TestLoadJsoncMalformed:
         assert load_jsonc_text(text) == {"key": "/"}
 
 
+class TestOptionalOrjson:
+    """The orjson fast path must be indistinguishable from the stdlib path."""
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            '{"a": [1, 2.5, null], "b": {"url": "https://x//y"}}',
+            '{"a": 1, // trailing\n "b": [1, 2,],}',
+            '{"nan": NaN}',
+        ],
+    )
+    def test_load_matches_without_orjson(self, text, monkeypatch):
+        import math
+
+        import lgrep._jsonc as jsonc
+
+        with_default = load_jsonc_text(text)
+        monkeypatch.setattr(jsonc, "orjson", None)
+        stdlib = load_jsonc_text(text)
+        if "nan" in stdlib:
+            assert math.isnan(with_default["nan"]) and math.isnan(stdlib["nan"])
+        else:
+            assert with_default == stdlib
+
+    def test_indented_dump_matches_stdlib_layout_for_ascii(self, monkeypatch):
+        import lgrep._jsonc as jsonc
+
+        data = {"$schema": "https://opencode.ai/config.json", "mcp": {"x": {"enabled": True}}}
+        with_default = dump_jsonc_text(data, indent=2)
+        monkeypatch.setattr(jsonc, "orjson", None)
+        assert with_default == dump_jsonc_text(data, indent=2)
+
+
 class TestDumpJsoncText:
     """dump_jsonc_text should produce parseable JSON (no round-trip comments added)."""
 
@@ -252,6 +252,23 @@ def test_prune_dry_run_projects_reclaimed_bytes(tmp_path):
     assert report["deleted_dirs"] == 0
 
 
+def test_dir_size_sums_nested_entries_without_following_symlinks(tmp_path):
+    from lgrep.tools.prune_orphans import _dir_size
+
+    root = tmp_path / "cache"
+    (root / "chunks.lance" / "_versions").mkdir(parents=True)
+    (root / "chunks.lance" / "data.bin").write_bytes(b"x" * 1024)
+    (root / "chunks.lance" / "_versions" / "1.manifest").write_bytes(b"y" * 10)
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    (outside / "big.bin").write_bytes(b"z" * 4096)
+    (root / "link").symlink_to(outside)
+
+    expected = root.lstat().st_size + sum(p.lstat().st_size for p in root.rglob("*"))
+    assert _dir_size(root) == expected
+    assert _dir_size(tmp_path / "missing") == 0
+
+
 def test_prune_execute_refuses_path_outside_cache_root(tmp_path, monkeypatch):
     # Review SEC-1: even if find_orphans returns a path that escapes the
     # cache root (e.g., via post-scan tamper), prune_orphans refuses
@@ -98,6 +98,7 @@ class TestSemanticToolResponseShapes:
             "start_line",
             "end_line",
             "match_type",
+            "truncated",
         }
 
     @pytest.mark.asyncio
@@ -152,8 +153,7 @@ class TestSemanticToolResponseShapes:
         app_ctx.projects["/path"] = state
         mock_ctx.request_context.lifespan_context = app_ctx
 
-        mock_db.count_chunks.return_value = 500
-        mock_db.get_indexed_files.return_value = {"a.py", "b.py"}
+        mock_db.get_stats.return_value = (500, {"a.py", "b.py"})
 
         response = await status_semantic(path="/path", ctx=mock_ctx)
         data = response
@@ -0,0 +1,126 @@
+"""Tests for the per-project search result cache."""
+
+from lgrep.server.search_cache import SearchCache
+
+
+def _result(name):
+    return {"results": [], "total": 0, "query": name, "path": "/p", "engine": "hybrid"}
+
+
+class TestSemanticLookup:
+    """Cosine lookups over the remembered query vectors."""
+
+    def test_hit_requires_threshold_and_matching_mode(self):
+        cache = SearchCache(max_size=4, threshold=0.97)
+        cache.put("a", [1.0, 0.0], _result("a"), hybrid=True, limit=10, version=0)
+
+        assert cache.get([1.0, 0.01], hybrid=True, limit=10, version=0)["query"] == "a"
+        assert cache.get([0.0, 1.0], hybrid=True, limit=10, version=0) is None
+        assert cache.get([1.0, 0.0], hybrid=False, limit=10, version=0) is None
+        assert cache.get([1.0, 0.0], hybrid=True, limit=5, version=0) is None
+
+    def test_full_cache_evicts_least_recently_used(self):
+        cache = SearchCache(max_size=2, threshold=0.99)
+        cache.put("x", [1.0, 0.0, 0.0], _result("x"), hybrid=True, limit=10, version=0)
+        cache.put("y", [0.0, 1.0, 0.0], _result("y"), hybrid=True, limit=10, version=0)
+        assert cache.get([1.0, 0.0, 0.0], hybrid=True, limit=10, version=0) is not None
+
+        cache.put("z", [0.0, 0.0, 1.0], _result("z"), hybrid=True, limit=10, version=0)
+
+        assert len(cache) == 2
+        assert cache.get([1.0, 0.0, 0.0], hybrid=True, limit=10, version=0) is not None
+        assert cache.get([0.0, 1.0, 0.0], hybrid=True, limit=10, version=0) is None
+        assert cache.get([0.0, 0.0, 1.0], hybrid=True, limit=10, version=0) is not None
+
+    def test_version_change_clears_both_layers(self):
+        cache = SearchCache(max_size=4)
+        cache.put("a", [1.0, 0.0], _result("a"), hybrid=True, limit=10, version=0)
+
+        assert cache.get([1.0, 0.0], hybrid=True, limit=10, version=1) is None
+        assert cache.get_exact("a", hybrid=True, limit=10, version=1) is None
+        assert len(cache) == 0
+
+    def test_zero_size_disables_both_layers(self):
+        cache = SearchCache(max_size=0)
+        cache.put("a", [1.0, 0.0], _result("a"), hybrid=True, limit=10, version=0)
+
+        assert cache.get([1.0, 0.0], hybrid=True, limit=10, version=0) is None
+        assert cache.get_exact("a", hybrid=True, limit=10, version=0) is None
+
+    def test_zero_size_from_env_disables_exact_layer(self, monkeypatch):
+        monkeypatch.setenv("LGREP_SEMCACHE_SIZE", "0")
+        cache = SearchCache()
+        cache.put("a", [1.0, 0.0], _result("a"), hybrid=False, limit=5, version=3)
+
+        assert cache.get_exact("a", hybrid=False, limit=5, version=3) is None
+
+    def test_int8_env_accepts_boolean_words(self, monkeypatch):
+        for value in ("0", "false", "No", " off "):
+            monkeypatch.setenv("LGREP_SEMCACHE_INT8", value)
+            assert SearchCache(max_size=1).int8 is False
+        monkeypatch.setenv("LGREP_SEMCACHE_INT8", "true")
+        assert SearchCache(max_size=1).int8 is True
+
+    def test_quantized_scores_track_float_cosine(self):
+        """int8 storage keeps scores within rounding distance of exact cosine."""
+        import numpy as np
+
+        rng = np.random.default_rng(0)
+        stored = rng.standard_normal((8, 1024)).astype(np.float32)
+        cache = SearchCache(max_size=8, threshold=-1.0)
+        for i, vector in enumerate(stored):
+            cache.put(str(i), vector.tolist(), _result(str(i)), hybrid=True, limit=10, version=0)
+
+        for i, vector in enumerate(stored):
+            noisy = vector + 0.05 * rng.standard_normal(1024).astype(np.float32)
+            hit = cache.get(noisy.tolist(), hybrid=True, limit=10, version=0)
+            assert hit["query"] == str(i)
+
+        assert cache._codes.nbytes == 8 * 1024
+
+    def test_float32_mode_matches_int8_lookups(self):
+        """The unquantized mode stores float32 rows and agrees on hits."""
+        import numpy as np
+
+        rng = np.random.default_rng(2)
+        stored = rng.standard_normal((8, 512)).astype(np.float32)
+        queries = [v + 0.05 * rng.standard_normal(512).astype(np.float32) for v in stored]
+
+        hits = {}
+        for int8 in (True, False):
+            cache = SearchCache(max_size=8, threshold=0.97, int8=int8)
+            for i, vector in enumerate(stored):
+                cache.put(
+                    str(i), vector.tolist(), _result(str(i)), hybrid=True, limit=10, version=0
+                )
+            hits[int8] = [cache.get(q.tolist(), hybrid=True, limit=10, version=0) for q in queries]
+            assert cache._codes.dtype == (np.int8 if int8 else np.float32)
+
+        assert hits[True] == hits[False]
+
+    def test_simsimd_kernel_matches_numpy_scores(self, monkeypatch):
+        """The optional SIMD kernel picks the same entries as the NumPy path."""
+        import numpy as np
+        import pytest
+
+        pytest.importorskip("simsimd")
+        import lgrep.server.search_cache as search_cache
+
+        rng = np.random.default_rng(1)
+        stored = rng.standard_normal((16, 256)).astype(np.float32)
+        queries = [v + 0.05 * rng.standard_normal(256).astype(np.float32) for v in stored]
+        queries.append(rng.standard_normal(256).astype(np.float32))
+
+        def lookups():
+            cache = SearchCache(max_size=16, threshold=0.97)
+            for i, vector in enumerate(stored):
+                cache.put(
+                    str(i), vector.tolist(), _result(str(i)), hybrid=True, limit=10, version=0
+                )
+            return [cache.get(q.tolist(), hybrid=True, limit=10, version=0) for q in queries]
+
+        fast = lookups()
+        monkeypatch.setattr(search_cache, "simsimd", None)
+        assert lookups() == fast
+        assert [hit["query"] for hit in fast[:-1]] == [str(i) for i in range(16)]
+        assert fast[-1] is None
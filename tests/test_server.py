@@ -3,6 +3,8 @@
 import asyncio
 import json
 import os
+import threading
+import time
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -185,8 +187,7 @@ class TestDiskCacheAutoLoad:
         project_path.mkdir()
 
         mock_store = MagicMock()
-        mock_store.count_chunks.return_value = 500
-        mock_store.get_indexed_files.return_value = {"a.py", "b.py", "c.py"}
+        mock_store.get_stats.return_value = (500, {"a.py", "b.py", "c.py"})
 
         with (
             patch("lgrep.server.tools_semantic.has_disk_cache", return_value=True),
@@ -218,6 +219,26 @@ class TestDiskCacheAutoLoad:
         assert data["files"] == 0
         assert data["chunks"] == 0
 
+    @pytest.mark.asyncio
+    async def test_status_probes_disk_cache_off_the_event_loop(self, tmp_path):
+        """The disk-cache probe (a git call under worktree dedup) runs in a worker."""
+        mock_ctx = MagicMock(spec=Context)
+        mock_ctx.request_context.lifespan_context = LgrepContext()
+        project_path = tmp_path / "probe"
+        project_path.mkdir()
+        probe_threads = []
+
+        def probe(_path):
+            probe_threads.append(threading.get_ident())
+            return False
+
+        with patch("lgrep.server.tools_semantic.has_disk_cache", side_effect=probe):
+            response = await lgrep_status(path=str(project_path), ctx=mock_ctx)
+
+        assert response["chunks"] == 0
+        assert probe_threads
+        assert probe_threads[0] != threading.get_ident()
+
     @pytest.mark.asyncio
     async def test_mcp_prune_orphans_skips_active_projects(self, tmp_path, monkeypatch):
         mock_ctx = MagicMock(spec=Context)
@@ -784,6 +805,176 @@ class TestServerTools:
         # query_time_ms is no longer in the response TypedDict (SearchSemanticResult)
         # — it was an internal storage metric, not part of the MCP contract
 
+    @pytest.mark.asyncio
+    async def test_lgrep_search_reuses_result_for_similar_query(self):
+        """A near-identical query vector is answered from the semantic cache
+        until the store is written to."""
+        mock_ctx = MagicMock(spec=Context)
+        app_ctx = LgrepContext()
+        app_ctx.embedder = MagicMock()
+
+        async def run_blocking(kind, caller, project, fn, *args, **kwargs):
+            return fn(*args, **kwargs)
+
+        app_ctx.runtime.run_blocking = run_blocking
+        mock_db = MagicMock()
+        mock_db.write_version = 0
+        mock_db.search_hybrid.return_value = SearchResults(
+            results=[SearchResult("a.py", 1, 10, "code", 0.9, "hybrid")],
+            query_time_ms=10.0,
+            total_chunks=100,
+        )
+        app_ctx.projects["/path"] = ProjectState(db=mock_db, indexer=MagicMock())
+        mock_ctx.request_context.lifespan_context = app_ctx
+        app_ctx.embedder.embed_query_async = AsyncMock(
+            side_effect=[[1.0, 0.0, 0.01], [1.0, 0.0, 0.02], [0.0, 1.0, 0.0], [1.0, 0.0, 0.01]]
+        )
+
+        first = await lgrep_search(query="auth flow", path="/path", ctx=mock_ctx)
+        second = await lgrep_search(query="the auth flow", path="/path", ctx=mock_ctx)
+        assert mock_db.search_hybrid.call_count == 1
+        assert second["results"] == first["results"]
+        assert second["query"] == "the auth flow"
+
+        await lgrep_search(query="unrelated", path="/path", ctx=mock_ctx)
+        assert mock_db.search_hybrid.call_count == 2
+
+        mock_db.write_version = 1
+        await lgrep_search(query="auth flow", path="/path", ctx=mock_ctx)
+        assert mock_db.search_hybrid.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_filtered_log_levels_skip_per_call_events(self):
+        """With INFO filtered out, tool entry events are never built."""
+        mock_ctx = MagicMock(spec=Context)
+        app_ctx = LgrepContext()
+        mock_ctx.request_context.lifespan_context = app_ctx
+
+        with (
+            patch("lgrep.server.tools_semantic._INFO_ON", False),
+            patch("lgrep.server.tools_semantic.log") as mock_log,
+        ):
+            await lgrep_search(query="q", path="/nonexistent", ctx=mock_ctx)
+            await lgrep_status(path="", ctx=mock_ctx)
+
+        mock_log.info.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_searches_share_one_run(self):
+        """Identical searches in flight together embed and search once."""
+        mock_ctx = MagicMock(spec=Context)
+        app_ctx = LgrepContext()
+        app_ctx.embedder = MagicMock()
+
+        async def run_blocking(kind, caller, project, fn, *args, **kwargs):
+            return fn(*args, **kwargs)
+
+        async def slow_embed(query):
+            await asyncio.sleep(0.05)
+            return [1.0, 0.0]
+
+        app_ctx.runtime.run_blocking = run_blocking
+        app_ctx.embedder.embed_query_async = AsyncMock(side_effect=slow_embed)
+        mock_db = MagicMock()
+        mock_db.write_version = 0
+        mock_db.search_hybrid.return_value = SearchResults(
+            results=[SearchResult("a.py", 1, 10, "code", 0.9, "hybrid")],
+            query_time_ms=10.0,
+            total_chunks=100,
+        )
+        state = ProjectState(db=mock_db, indexer=MagicMock())
+        app_ctx.projects["/path"] = state
+        mock_ctx.request_context.lifespan_context = app_ctx
+
+        results = await asyncio.gather(
+            *(lgrep_search(query="q", path="/path", ctx=mock_ctx) for _ in range(3))
+        )
+
+        assert results[0] == results[1] == results[2]
+        assert app_ctx.embedder.embed_query_async.await_count == 1
+        assert mock_db.search_hybrid.call_count == 1
+        assert state.inflight_searches == {}
+
+    @pytest.mark.asyncio
+    async def test_lgrep_search_exact_repeat_skips_embedding(self):
+        """A verbatim repeat is served before the query is embedded."""
+        mock_ctx = MagicMock(spec=Context)
+        app_ctx = LgrepContext()
+        app_ctx.embedder = MagicMock()
+
+        async def run_blocking(kind, caller, project, fn, *args, **kwargs):
+            return fn(*args, **kwargs)
+
+        app_ctx.runtime.run_blocking = run_blocking
+        mock_db = MagicMock()
+        mock_db.write_version = 0
+        mock_db.search_vector.return_value = SearchResults(
+            results=[SearchResult("a.py", 1, 10, "code", 0.9, "vector")],
+            query_time_ms=10.0,
+            total_chunks=100,
+        )
+        app_ctx.projects["/path"] = ProjectState(db=mock_db, indexer=MagicMock())
+        mock_ctx.request_context.lifespan_context = app_ctx
+        app_ctx.embedder.embed_query_async = AsyncMock(return_value=[1.0, 0.0])
+
+        first = await lgrep_search(query="q", path="/path", hybrid=False, ctx=mock_ctx)
+        second = await lgrep_search(query="q", path="/path", hybrid=False, ctx=mock_ctx)
+
+        assert second == first
+        assert app_ctx.embedder.embed_query_async.await_count == 1
+        assert mock_db.search_vector.call_count == 1
+
+        await lgrep_search(query="q", path="/path", limit=3, hybrid=False, ctx=mock_ctx)
+        assert app_ctx.embedder.embed_query_async.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_lgrep_search_clips_long_snippets(self):
+        """Chunk text past LGREP_MAX_SNIPPET_BYTES is cut on a line and flagged."""
+        mock_ctx = MagicMock(spec=Context)
+        app_ctx = LgrepContext()
+        app_ctx.embedder = MagicMock()
+
+        async def run_blocking(kind, caller, project, fn, *args, **kwargs):
+            return fn(*args, **kwargs)
+
+        app_ctx.runtime.run_blocking = run_blocking
+        mock_db = MagicMock()
+        mock_db.write_version = 0
+        long_text = "".join(f"line_{i} = 'é'\n" for i in range(20))
+        mock_db.search_vector.return_value = SearchResults(
+            results=[
+                SearchResult("a.py", 1, 20, long_text, 0.9, "vector"),
+                SearchResult("b.py", 1, 1, "short", 0.8, "vector"),
+            ],
+            query_time_ms=10.0,
+            total_chunks=100,
+        )
+        app_ctx.projects["/path"] = ProjectState(db=mock_db, indexer=MagicMock())
+        mock_ctx.request_context.lifespan_context = app_ctx
+        app_ctx.embedder.embed_query_async = AsyncMock(return_value=[1.0, 0.0])
+
+        with patch("lgrep.server.tools_semantic.MAX_SNIPPET_BYTES", 64):
+            data = await lgrep_search(query="q", path="/path", hybrid=False, ctx=mock_ctx)
+
+        clipped, short = data["results"]
+        assert clipped["truncated"] is True
+        assert len(clipped["content"].encode()) <= 64
+        assert long_text.startswith(clipped["content"])
+        assert clipped["content"].endswith("\n")
+        assert short["content"] == "short"
+        assert "truncated" not in short
+
+    def test_snippet_limit_env_falls_back_on_bad_values(self, monkeypatch):
+        """A malformed LGREP_MAX_SNIPPET_BYTES keeps the default instead of failing import."""
+        from lgrep.server.tools_semantic import DEFAULT_MAX_SNIPPET_BYTES, _snippet_bytes_from_env
+
+        monkeypatch.setenv("LGREP_MAX_SNIPPET_BYTES", "2k")
+        assert _snippet_bytes_from_env() == DEFAULT_MAX_SNIPPET_BYTES
+        monkeypatch.setenv("LGREP_MAX_SNIPPET_BYTES", "0")
+        assert _snippet_bytes_from_env() == 0
+        monkeypatch.delenv("LGREP_MAX_SNIPPET_BYTES")
+        assert _snippet_bytes_from_env() == DEFAULT_MAX_SNIPPET_BYTES
+
     @pytest.mark.asyncio
     async def test_lgrep_status_format(self):
         """Should format status as JSON."""
@@ -796,8 +987,7 @@ class TestServerTools:
         app_ctx.projects["/path"] = state
         mock_ctx.request_context.lifespan_context = app_ctx
 
-        mock_db.count_chunks.return_value = 500
-        mock_db.get_indexed_files.return_value = {"a.py", "b.py"}
+        mock_db.get_stats.return_value = (500, {"a.py", "b.py"})
 
         response = await lgrep_status(path="/path", ctx=mock_ctx)
         data = response
@@ -842,6 +1032,131 @@ class TestServerErrorPaths:
         assert "error" in data
         assert "does not exist" in data["error"]
 
+    @pytest.mark.asyncio
+    async def test_lgrep_index_file_path(self, tmp_path):
+        """Should return the same error when the path is a regular file."""
+        mock_ctx = MagicMock(spec=Context)
+        mock_ctx.request_context.lifespan_context = LgrepContext()
+        file_path = tmp_path / "main.py"
+        file_path.write_text("x = 1")
+
+        response = await lgrep_index(path=str(file_path), ctx=mock_ctx)
+
+        assert response == {
+            "error": f"Path does not exist or is not a directory: {file_path}",
+        }
+
+    def test_resolve_project_path_memoizes_absolute_paths(self, tmp_path, monkeypatch):
+        """Absolute paths resolve once; relative ones follow the working directory."""
+        from lgrep.server.lifecycle import _resolve_project_path
+
+        (tmp_path / "real").mkdir()
+        (tmp_path / "link").symlink_to(tmp_path / "real", target_is_directory=True)
+        calls = []
+        original = os.path.realpath
+
+        def counting(path, *args, **kwargs):
+            calls.append(path)
+            return original(path, *args, **kwargs)
+
+        monkeypatch.setattr(os.path, "realpath", counting)
+        link = str(tmp_path / "link")
+
+        assert _resolve_project_path(link) == str((tmp_path / "real").resolve())
+        assert _resolve_project_path(link) == str((tmp_path / "real").resolve())
+        assert calls.count(link) == 1
+
+        monkeypatch.chdir(tmp_path)
+        assert _resolve_project_path("real") == str(tmp_path.resolve() / "real")
+        monkeypatch.chdir(tmp_path / "real")
+        assert _resolve_project_path("real") == str(tmp_path.resolve() / "real" / "real")
+
+    def test_resolve_project_path_revalidates_after_ttl(self, tmp_path, monkeypatch):
+        """A retargeted symlink maps to its new directory once the entry expires."""
+        from lgrep.server import lifecycle
+
+        (tmp_path / "old").mkdir()
+        (tmp_path / "new").mkdir()
+        link = tmp_path / "link"
+        link.symlink_to(tmp_path / "old", target_is_directory=True)
+        now = [1000.0]
+        monkeypatch.setattr(lifecycle.time, "monotonic", lambda: now[0])
+
+        assert lifecycle._resolve_project_path(str(link)) == str((tmp_path / "old").resolve())
+        link.unlink()
+        link.symlink_to(tmp_path / "new", target_is_directory=True)
+        assert lifecycle._resolve_project_path(str(link)) == str((tmp_path / "old").resolve())
+
+        now[0] += lifecycle.RESOLVE_CACHE_TTL_S
+        assert lifecycle._resolve_project_path(str(link)) == str((tmp_path / "new").resolve())
+
+    @pytest.mark.asyncio
+    async def test_search_miss_stats_project_dir_once(self, tmp_path, monkeypatch):
+        """An unloaded project costs one stat of its directory, and a deleted
+        directory is reported on the very next search (no cached answer)."""
+        from lgrep.server import lifecycle
+
+        monkeypatch.setenv("LGREP_CACHE_DIR", str(tmp_path / "cache"))
+        project = tmp_path / "proj"
+        project.mkdir()
+        project_key = str(project.resolve())
+        app_ctx = LgrepContext(voyage_api_key="mock-key")
+        real_stat = os.stat
+        stats = []
+
+        def counting_stat(target, *args, **kwargs):
+            if os.fspath(target) == project_key:
+                stats.append(target)
+            return real_stat(target, *args, **kwargs)
+
+        with (
+            patch.object(
+                lifecycle, "_auto_index_project_single_flight", AsyncMock(return_value="state")
+            ),
+            patch("lgrep.server.lifecycle.os.stat", side_effect=counting_stat),
+        ):
+            assert await lifecycle._ensure_search_project_state(app_ctx, str(project)) == "state"
+            assert len(stats) == 1
+
+            project.rmdir()
+            result = await lifecycle._ensure_search_project_state(app_ctx, str(project))
+        assert "does not exist" in result["error"]
+
+    @pytest.mark.asyncio
+    async def test_search_width_mismatch_keeps_index(self, tmp_path):
+        """A query of another embedding width asks for a reindex instead of
+        dropping the table."""
+        from lgrep.storage import ChunkStore, CodeChunk, chunk_model_for
+
+        mock_ctx = MagicMock(spec=Context)
+        app_ctx = LgrepContext(voyage_api_key="mock-key")
+        app_ctx.embedder = MagicMock()
+        app_ctx.embedder.embed_query_async = AsyncMock(return_value=[0.1] * 1024)
+        mock_ctx.request_context.lifespan_context = app_ctx
+
+        project_path = tmp_path / "narrow"
+        project_path.mkdir()
+        db = ChunkStore(tmp_path / "db", dimension=512)
+        fields = CodeChunk(
+            id="a:0",
+            file_path="a.py",
+            chunk_index=0,
+            start_line=1,
+            end_line=1,
+            content="x = 1",
+            vector=[0.0] * 1024,
+            file_hash="h",
+            indexed_at=0.0,
+        ).model_dump()
+        db.add_chunks([chunk_model_for(512)(**(fields | {"vector": [0.1] * 512}))])
+        app_ctx.projects[str(project_path.resolve())] = ProjectState(db=db, indexer=MagicMock())
+
+        with patch("lgrep.server.tools_semantic._check_staleness", return_value=(False, 0)):
+            response = await lgrep_search(query="x", path=str(project_path), ctx=mock_ctx)
+
+        assert "Reindex required" in response["error"]
+        assert db.count_chunks() == 1
+
     @pytest.mark.asyncio
     async def test_lgrep_index_missing_api_key(self, tmp_path):
         """Should return error when VOYAGE_API_KEY is not set."""
@@ -933,6 +1248,39 @@ class TestServerErrorPaths:
             state.db.count_chunks.assert_not_called()
             state.db.get_indexed_files.assert_not_called()
 
+    @pytest.mark.asyncio
+    async def test_lgrep_status_all_projects_deep_gathers_concurrently(self):
+        """deep=True reads every project's counts concurrently, capped, in order."""
+        mock_ctx = MagicMock(spec=Context)
+        app_ctx = LgrepContext()
+        in_flight = 0
+        peak = 0
+
+        async def run_blocking(kind, caller, project, fn, *args, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return fn(*args, **kwargs)
+
+        app_ctx.runtime.run_blocking = run_blocking
+        paths = [f"/proj/{i}" for i in range(12)]
+        for i, proj_path in enumerate(paths):
+            mock_db = MagicMock()
+            mock_db.get_stats.return_value = (i, {f"f{j}.py" for j in range(i)})
+            app_ctx.projects[proj_path] = ProjectState(db=mock_db, indexer=MagicMock())
+        app_ctx.projects["/proj/3"].db.get_stats.side_effect = RuntimeError("boom")
+        mock_ctx.request_context.lifespan_context = app_ctx
+
+        data = await lgrep_status(deep=True, ctx=mock_ctx)
+
+        assert [entry["project"] for entry in data["projects"]] == paths
+        assert data["projects"][5]["chunks"] == 5
+        assert data["projects"][5]["files"] == 5
+        assert "boom" in data["projects"][3]["error"]
+        assert 1 < peak <= 8
+
     @pytest.mark.asyncio
     async def test_lgrep_status_scoped_includes_fields_on_error_branch(self):
         """Scoped deep status still carries both `disk_cache` and `error` keys."""
@@ -940,7 +1288,7 @@ class TestServerErrorPaths:
         app_ctx = LgrepContext()
 
         broken_db = MagicMock()
-        broken_db.count_chunks.side_effect = RuntimeError("simulated DB failure")
+        broken_db.get_stats.side_effect = RuntimeError("simulated DB failure")
         state = ProjectState(db=broken_db, indexer=MagicMock(), watching=False)
         app_ctx.projects["/proj/broken"] = state
 
@@ -965,8 +1313,7 @@ class TestServerErrorPaths:
 
         app_ctx.runtime.run_blocking = run_blocking
         mock_db = MagicMock()
-        mock_db.count_chunks.return_value = 42
-        mock_db.get_indexed_files.return_value = {"x.py", "y.py"}
+        mock_db.get_stats.return_value = (42, {"x.py", "y.py"})
         app_ctx.projects["/proj/scoped"] = ProjectState(db=mock_db, indexer=MagicMock())
         mock_ctx.request_context.lifespan_context = app_ctx
 
@@ -974,8 +1321,34 @@ class TestServerErrorPaths:
 
         assert entry["files"] == 2
         assert entry["chunks"] == 42
-        assert ("status_count_chunks", "_get_project_stats", "/proj/scoped") in calls
-        assert ("status_indexed_files", "_get_project_stats", "/proj/scoped") in calls
+        assert ("status_project_stats", "_get_project_stats", "/proj/scoped") in calls
+
+    @pytest.mark.asyncio
+    async def test_lgrep_status_reuses_recent_stats_until_write(self):
+        """Back-to-back status polls share one stats scan until the store changes."""
+        mock_ctx = MagicMock(spec=Context)
+        app_ctx = LgrepContext()
+        mock_db = MagicMock()
+        mock_db.write_version = 0
+        mock_db.get_stats.return_value = (42, {"x.py", "y.py"})
+        app_ctx.projects["/proj/cached"] = ProjectState(db=mock_db, indexer=MagicMock())
+        mock_ctx.request_context.lifespan_context = app_ctx
+
+        await lgrep_status(path="/proj/cached", ctx=mock_ctx)
+        entry = await lgrep_status(path="/proj/cached", ctx=mock_ctx)
+        assert entry["chunks"] == 42
+        assert mock_db.get_stats.call_count == 1
+
+        mock_db.write_version = 1
+        mock_db.get_stats.return_value = (50, {"x.py", "y.py", "z.py"})
+        entry = await lgrep_status(path="/proj/cached", ctx=mock_ctx)
+        assert entry["chunks"] == 50
+        assert entry["files"] == 3
+        assert mock_db.get_stats.call_count == 2
+
+        with patch("lgrep.server.lifecycle.STATUS_CACHE_TTL_S", 0.0):
+            await lgrep_status(path="/proj/cached", ctx=mock_ctx)
+        assert mock_db.get_stats.call_count == 3
 
     @pytest.mark.asyncio
     async def test_lgrep_watch_stop_when_not_watching(self):
@@ -1006,22 +1379,96 @@ class TestMaxProjectsLimit:
     """Tests for MAX_PROJECTS resource guard."""
 
     @pytest.mark.asyncio
-    async def test_max_projects_rejects_at_limit(self, tmp_path):
-        """Should reject new projects when MAX_PROJECTS limit is reached."""
+    async def test_max_projects_evicts_least_recently_used(self, tmp_path):
+        """At MAX_PROJECTS the idle project with the oldest access is unloaded."""
         app_ctx = LgrepContext(voyage_api_key="mock-key")
 
-        # Pre-fill projects dict to MAX_PROJECTS.
         # After in-memory dedup, the limit applies to unique canonical projects,
         # so we populate _canonical_to_state too.
         for i in range(MAX_PROJECTS):
-            state = ProjectState(db=MagicMock(), indexer=MagicMock())
+            state = ProjectState(db=MagicMock(), indexer=MagicMock(), last_used=float(i))
             path = f"/fake/project/{i}"
             app_ctx.projects[path] = state
             app_ctx._canonical_to_state[path] = state
+        # Project 0 is the oldest but mid-index; project 1 has an alias and a watcher.
+        app_ctx._indexing_events["/fake/project/0"] = asyncio.Event()
+        victim = app_ctx.projects["/fake/project/1"]
+        app_ctx.projects["/fake/alias/1"] = victim
+        watcher = MagicMock()
+        victim.watcher, victim.watching = watcher, True
 
-        assert len(app_ctx.projects) == MAX_PROJECTS
+        new_path = tmp_path / "overflow"
+        new_path.mkdir()
+        with patch("lgrep.server.lifecycle.VoyageEmbedder"):
+            result = await _ensure_project_initialized(app_ctx, new_path)
+
+        assert isinstance(result, ProjectState)
+        assert "/fake/project/0" in app_ctx.projects
+        assert "/fake/project/1" not in app_ctx.projects
+        assert "/fake/alias/1" not in app_ctx.projects
+        assert "/fake/project/1" not in app_ctx._canonical_to_state
+        await asyncio.gather(*app_ctx._eviction_tasks)
+        watcher.stop.assert_called_once()
+        victim.db.close.assert_called_once()
+        assert len(app_ctx._canonical_to_state) == MAX_PROJECTS
+
+    @pytest.mark.asyncio
+    async def test_eviction_stops_watcher_off_loop_and_waits_for_searches(self):
+        """The watcher joins on a worker thread; the store closes after running searches."""
+        import threading
+
+        from lgrep.server.lifecycle import _evict_lru_project
+
+        app_ctx = LgrepContext()
+        state = ProjectState(db=MagicMock(), indexer=MagicMock())
+        app_ctx.projects["/fake/a"] = state
+        app_ctx._canonical_to_state["/fake/a"] = state
+        stop_threads = []
+        state.watcher, state.watching = MagicMock(), True
+        state.watcher.stop.side_effect = lambda: stop_threads.append(threading.get_ident())
+        search = asyncio.get_running_loop().create_future()
+        state.inflight_searches[("q", 10, True)] = search
+
+        assert _evict_lru_project(app_ctx) == "/fake/a"
+        assert app_ctx.projects == {}
+        await asyncio.sleep(0.05)
+        assert stop_threads and stop_threads[0] != threading.get_ident()
+        state.db.close.assert_not_called()
+
+        search.set_result({})
+        await asyncio.gather(*app_ctx._eviction_tasks)
+        state.db.close.assert_called_once()
+        assert not app_ctx._eviction_tasks
+
+    @pytest.mark.asyncio
+    async def test_eviction_keeps_store_reused_by_reinitialized_project(self):
+        """A store picked up again by a re-initialized project is not closed."""
+        from lgrep.server.lifecycle import _evict_lru_project
+
+        app_ctx = LgrepContext()
+        shared_db = MagicMock()
+        state = ProjectState(db=shared_db, indexer=MagicMock())
+        app_ctx.projects["/fake/a"] = state
+        app_ctx._canonical_to_state["/fake/a"] = state
+
+        _evict_lru_project(app_ctx)
+        app_ctx._canonical_to_state["/fake/a"] = ProjectState(db=shared_db, indexer=MagicMock())
+        await asyncio.gather(*app_ctx._eviction_tasks)
+
+        shared_db.close.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_max_projects_rejects_when_all_busy(self, tmp_path):
+        """Should reject new projects when every loaded project is mid-index."""
+        app_ctx = LgrepContext(voyage_api_key="mock-key")
+
+        for i in range(MAX_PROJECTS):
+            state = ProjectState(db=MagicMock(), indexer=MagicMock())
+            path = f"/fake/project/{i}"
+            app_ctx.projects[path] = state
+            app_ctx._canonical_to_state[path] = state
+            app_ctx._indexing_events[path] = asyncio.Event()
 
-        # Try to add one more
         new_path = tmp_path / "overflow"
         new_path.mkdir()
         result = await _ensure_project_initialized(app_ctx, new_path)
@@ -1032,6 +1479,7 @@ class TestMaxProjectsLimit:
         assert "error" in data
         assert "Maximum project limit" in data["error"]
         assert "Restart the server" in data["error"]
+        assert len(app_ctx.projects) == MAX_PROJECTS
 
     @pytest.mark.asyncio
     async def test_projects_below_limit_succeed(self, tmp_path):
@@ -1054,6 +1502,122 @@ class TestMaxProjectsLimit:
         assert len(app_ctx.projects) == MAX_PROJECTS
 
 
+class TestProjectInitSingleFlight:
+    """Tests for per-repo single-flight project initialization."""
+
+    @pytest.mark.asyncio
+    async def test_waiter_shares_pending_init_and_other_repos_proceed(self, tmp_path):
+        """A pending init for one repo is awaited, not duplicated, and blocks no other repo."""
+        app_ctx = LgrepContext(voyage_api_key="mock-key")
+        slow, fast = tmp_path / "slow", tmp_path / "fast"
+        slow.mkdir()
+        fast.mkdir()
+        pending = asyncio.get_running_loop().create_future()
+        app_ctx._init_futures[str(slow.resolve())] = pending
+
+        waiter = asyncio.create_task(_ensure_project_initialized(app_ctx, slow))
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        with patch("lgrep.server.lifecycle.VoyageEmbedder"):
+            other = await _ensure_project_initialized(app_ctx, fast)
+        assert isinstance(other, ProjectState)
+        assert not waiter.done()
+
+        state = ProjectState(db=MagicMock(), indexer=MagicMock())
+        pending.set_result(state)
+
+        assert await waiter is state
+        assert app_ctx.projects[str(slow)] is state
+        assert str(fast.resolve()) not in app_ctx._init_futures
+
+    @pytest.mark.asyncio
+    async def test_concurrent_inits_build_once_off_the_event_loop(self, tmp_path):
+        """Concurrent callers share one ChunkStore built on a supervisor thread."""
+        app_ctx = LgrepContext(voyage_api_key="mock-key")
+        project = tmp_path / "repo"
+        project.mkdir()
+        loop_thread = threading.get_ident()
+        build_threads = []
+
+        def slow_store(*args, **kwargs):
+            build_threads.append(threading.get_ident())
+            time.sleep(0.05)
+            return MagicMock()
+
+        with (
+            patch("lgrep.server.lifecycle.VoyageEmbedder"),
+            patch("lgrep.server.lifecycle.ChunkStore", side_effect=slow_store),
+            patch("lgrep.server.lifecycle.Indexer"),
+        ):
+            states = await asyncio.gather(
+                *(_ensure_project_initialized(app_ctx, project) for _ in range(3))
+            )
+
+        assert states[0] is states[1] is states[2]
+        assert isinstance(states[0], ProjectState)
+        assert len(build_threads) == 1
+        assert build_threads[0] != loop_thread
+        assert app_ctx._init_futures == {}
+
+    @pytest.mark.asyncio
+    async def test_init_does_not_wait_on_context_lock(self, tmp_path):
+        """Project init bookkeeping never queues behind reindex bookkeeping."""
+        app_ctx = LgrepContext(voyage_api_key="mock-key")
+        project = tmp_path / "repo"
+        project.mkdir()
+
+        with (
+            patch("lgrep.server.lifecycle.VoyageEmbedder"),
+            patch("lgrep.server.lifecycle.ChunkStore"),
+            patch("lgrep.server.lifecycle.Indexer"),
+        ):
+            async with app_ctx._lock:
+                state = await asyncio.wait_for(
+                    _ensure_project_initialized(app_ctx, project), timeout=5
+                )
+
+        assert isinstance(state, ProjectState)
+        assert app_ctx.projects[str(project)] is state
+
+    @pytest.mark.asyncio
+    async def test_reinit_reuses_live_chunk_store(self, tmp_path, monkeypatch):
+        """Re-initializing a removed project reuses a ChunkStore still held elsewhere."""
+        from lgrep.server import remove_project
+
+        monkeypatch.setenv("LGREP_CACHE_DIR", str(tmp_path / "cache"))
+        app_ctx = LgrepContext(voyage_api_key="mock-key")
+        project = tmp_path / "repo"
+        project.mkdir()
+
+        with patch("lgrep.server.lifecycle.VoyageEmbedder") as embedder_cls:
+            embedder_cls.return_value.output_dimension = 1024
+            first = await _ensure_project_initialized(app_ctx, project)
+            held = first.db
+            remove_project(app_ctx, str(project))
+            second = await _ensure_project_initialized(app_ctx, project)
+
+        assert second is not first
+        assert second.db is held
+
+    @pytest.mark.asyncio
+    async def test_failed_init_releases_single_flight_slot(self, tmp_path):
+        """A failed construction returns the error and lets a later call retry."""
+        app_ctx = LgrepContext(voyage_api_key="mock-key")
+        project = tmp_path / "broken"
+        project.mkdir()
+
+        with (
+            patch("lgrep.server.lifecycle.VoyageEmbedder"),
+            patch("lgrep.server.lifecycle.ChunkStore", side_effect=OSError("disk gone")),
+        ):
+            result = await _ensure_project_initialized(app_ctx, project)
+
+        assert result == {"error": "Failed to initialize project."}
+        assert app_ctx._init_futures == {}
+        assert str(project) not in app_ctx.projects
+
+
 class TestWatcherBehavior:
     """Tests for watcher start/stop edge cases."""
 
@@ -1074,7 +1638,11 @@ class TestWatcherBehavior:
         app_ctx.projects[path_key] = state
         mock_ctx.request_context.lifespan_context = app_ctx
 
-        response = await lgrep_watch_start(path=str(tmp_path), ctx=mock_ctx)
+        with patch(
+            "lgrep.server.tools_semantic._validate_dir",
+            side_effect=AssertionError("watched path must not be re-validated"),
+        ):
+            response = await lgrep_watch_start(path=str(tmp_path), ctx=mock_ctx)
         data = response
 
         assert data["watching"] is True
@@ -1157,7 +1725,7 @@ class TestLifecycle:
         watcher_b = MagicMock()
 
         ctx = LgrepContext()
-        ctx.embedder = MagicMock()
+        embedder = ctx.embedder = MagicMock()
         ctx.projects["/a"] = ProjectState(
             db=MagicMock(), indexer=MagicMock(), watcher=watcher_a, watching=True
         )
@@ -1170,8 +1738,46 @@ class TestLifecycle:
         watcher_a.stop.assert_called_once()
         watcher_b.stop.assert_called_once()
         assert len(ctx.projects) == 0
+        embedder.close.assert_called_once()
         assert ctx.embedder is None
 
+    @pytest.mark.asyncio
+    async def test_lifespan_publishes_app_context_to_tools(self):
+        """Tools reach the lifespan context without a request ctx while the server runs."""
+        from lgrep.server.lifecycle import _app_context, app_lifespan
+
+        with (
+            patch("lgrep.server.lifecycle._warm_projects", new=AsyncMock()),
+            patch("lgrep.server.lifecycle._schedule_startup_sweep", new=AsyncMock()),
+        ):
+            async with app_lifespan(MagicMock(name="lgrep")) as app_ctx:
+                assert _app_context(None) is app_ctx
+                data = await lgrep_status(ctx=None)
+                assert data == {"projects": []}
+
+        assert _app_context(None) is None
+        assert "error" in await lgrep_status(ctx=None)
+
+    @pytest.mark.asyncio
+    async def test_shutdown_joins_watchers_concurrently(self):
+        """Slow watcher joins overlap instead of adding up."""
+        ctx = LgrepContext()
+        watchers = []
+        for i in range(4):
+            watcher = MagicMock()
+            watcher.stop.side_effect = lambda: time.sleep(0.2)
+            watchers.append(watcher)
+            ctx.projects[f"/p{i}"] = ProjectState(
+                db=MagicMock(), indexer=MagicMock(), watcher=watcher, watching=True
+            )
+
+        start = time.monotonic()
+        await _shutdown(ctx)
+
+        assert time.monotonic() - start < 0.6
+        for watcher in watchers:
+            watcher.stop.assert_called_once()
+
 
 class TestEagerWarmUp:
     """Tests for LGREP_WARM_PATHS eager index warming at startup."""
@@ -1202,6 +1808,36 @@ class TestEagerWarmUp:
 
         assert mock_init.call_count == 2
 
+    @pytest.mark.asyncio
+    async def test_warm_prewarms_index_on_db_pool(self, tmp_path):
+        """Warming runs the store's prewarm as a DB job; a failure is not fatal."""
+        project = tmp_path / "proj"
+        project.mkdir()
+        app_ctx = LgrepContext(voyage_api_key="mock-key")
+        calls = []
+
+        async def run_blocking(kind, caller, project, fn, *args, **kwargs):
+            calls.append((kind, caller, project))
+            return fn(*args, **kwargs)
+
+        app_ctx.runtime.run_blocking = run_blocking
+        mock_db = MagicMock()
+        mock_db.prewarm.side_effect = OSError("cold disk")
+        mock_state = ProjectState(db=mock_db, indexer=MagicMock())
+
+        with (
+            patch.dict(os.environ, {"LGREP_WARM_PATHS": str(project)}),
+            patch("lgrep.server.lifecycle.has_disk_cache", return_value=True),
+            patch(
+                "lgrep.server.lifecycle._ensure_project_initialized",
+                return_value=mock_state,
+            ),
+        ):
+            await _warm_projects(app_ctx)
+
+        mock_db.prewarm.assert_called_once_with()
+        assert calls == [("db_prewarm", "_warm_project", str(project.resolve()))]
+
     @pytest.mark.asyncio
     async def test_warm_skips_projects_without_disk_cache(self, tmp_path):
         """Projects without disk caches should be silently skipped."""
@@ -6,15 +6,20 @@ import tempfile
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
+import numpy as np
 import pytest
 
+from lgrep.exceptions import DimensionMismatchError
 from lgrep.storage import (
     CHUNKS_TABLE,
     EMBEDDING_DIM,
     ChunkStore,
     CodeChunk,
+    EmbeddingCache,
+    chunk_model_for,
     get_project_db_path,
     has_disk_cache,
+    open_default_embedding_cache,
 )
 
 
@@ -99,6 +104,17 @@ class TestDbPathResolution:
         db2 = get_project_db_path("/path/b")
         assert db1 != db2
 
+    def test_get_project_db_path_hashes_each_key_once(self, tmp_path, monkeypatch):
+        """The key digest is memoized; LGREP_CACHE_DIR is still read per call."""
+        monkeypatch.setenv("LGREP_CACHE_DIR", str(tmp_path / "one"))
+        first = get_project_db_path("/memo/project")
+        with patch("lgrep.storage._chunk_store.hashlib.sha256") as sha256:
+            monkeypatch.setenv("LGREP_CACHE_DIR", str(tmp_path / "two"))
+            second = get_project_db_path("/memo/project")
+        sha256.assert_not_called()
+        assert first.name == second.name
+        assert second.parent == tmp_path / "two"
+
     def test_has_disk_cache_check(self, tmp_path, monkeypatch):
         """Should detect if lance files exist on disk."""
         # Isolate from global cache to avoid collisions with prior runs
@@ -116,6 +132,48 @@ class TestDbPathResolution:
         assert has_disk_cache(project_path) is True
 
 
+class TestEmbeddingCache:
+    """Tests for the persistent embedding cache."""
+
+    def test_round_trip_and_pruning(self, tmp_path):
+        """Vectors should survive reopening, and the oldest rows are pruned past the cap."""
+        path = tmp_path / "embeddings.sqlite3"
+        cache = EmbeddingCache(path, max_entries=2)
+        keys = EmbeddingCache.keys_for("voyage-code-3", "document", ["a", "b", "c"])
+        cache.put_many([(keys[0], [0.5, 1.0]), (keys[1], [2.0, 3.0])])
+        cache.put_many([(keys[2], [4.0, 5.0])])
+        cache.close()
+
+        reopened = EmbeddingCache(path, max_entries=2)
+        assert reopened.get_many(keys) == {keys[1]: [2.0, 3.0], keys[2]: [4.0, 5.0]}
+        assert EmbeddingCache.keys_for("voyage-code-3", "query", ["a"]) != keys[:1]
+        reopened.close()
+
+    def test_vectors_stored_as_float16(self, tmp_path):
+        """Rows take two bytes per dimension and decode to within float16 precision."""
+        cache = EmbeddingCache(tmp_path / "embeddings.sqlite3")
+        [key] = EmbeddingCache.keys_for("voyage-code-3", "document", ["a"])
+        vector = [0.1, -0.2, 0.3, 0.9]
+        cache.put_many([(key, vector)])
+        [blob] = cache._conn.execute("SELECT vec FROM embeddings").fetchone()
+
+        assert len(blob) == 2 * len(vector)
+        assert cache.get_many([key])[key] == pytest.approx(vector, abs=1e-3)
+        cache.close()
+
+    def test_default_cache_location_and_opt_out(self, tmp_path, monkeypatch):
+        """The shared cache lives in LGREP_CACHE_DIR and can be disabled."""
+        monkeypatch.setenv("LGREP_CACHE_DIR", str(tmp_path))
+        monkeypatch.setenv("LGREP_EMBED_CACHE", "1")
+        cache = open_default_embedding_cache()
+        assert cache is not None
+        assert cache.path == tmp_path / "embeddings.sqlite3"
+        cache.close()
+
+        monkeypatch.setenv("LGREP_EMBED_CACHE", "0")
+        assert open_default_embedding_cache() is None
+
+
 class TestStorageModuleDeletion:
     def test_storage_py_file_does_not_exist(self):
         storage_py = Path(__file__).resolve().parents[1] / "src" / "lgrep" / "storage.py"
@@ -194,6 +252,50 @@ class TestChunkStoreLifecycle:
         assert count == 3
         assert chunk_store.count_chunks() == 3
 
+    def test_add_chunks_round_trips_columns(self, chunk_store, sample_chunks):
+        """Columnar inserts should preserve every field and store float32 vectors."""
+        sample_chunks[0].vector = [0.25] * EMBEDDING_DIM
+        chunk_store.add_chunks(sample_chunks)
+
+        stored = chunk_store.table.to_arrow()
+        assert stored.schema.field("vector").type.value_type == "float"
+        row = next(r for r in stored.to_pylist() if r["id"] == sample_chunks[0].id)
+        expected = sample_chunks[0].model_dump()
+        assert row == expected | {"vector": [0.25] * EMBEDDING_DIM}
+
+    def test_file_stats_round_trip(self, chunk_store):
+        """The stat hash-cache sidecar should persist and tolerate a missing file."""
+        assert chunk_store.get_file_stats() == {}
+
+        chunk_store.set_file_stats({"a.py": (123, 45, "abc")})
+
+        assert chunk_store.get_file_stats() == {"a.py": (123, 45, "abc")}
+
+    def test_truncated_dimension_store(self, temp_db_path):
+        """Stores adopt the width on disk; only reset_dimension rebuilds the table."""
+        narrow = chunk_model_for(512)
+        chunk = narrow(**(make_chunk().model_dump() | {"vector": [0.5] * 512}))
+        store = ChunkStore(temp_db_path, dimension=512)
+        store.add_chunks([chunk])
+
+        reopened = ChunkStore(temp_db_path)
+        assert reopened.count_chunks() == 1
+        assert reopened.dimension == 512
+        assert reopened.search_vector([0.5] * 512, limit=1).results[0].file_path == "test.py"
+
+        widened = ChunkStore(temp_db_path, dimension=EMBEDDING_DIM)
+        assert widened.count_chunks() == 1
+        assert widened.dimension == 512
+        with pytest.raises(DimensionMismatchError, match="Reindex required"):
+            widened.search_vector([0.5] * EMBEDDING_DIM, limit=1)
+        assert widened.count_chunks() == 1
+
+        assert widened.reset_dimension(512) is False
+        assert widened.reset_dimension(EMBEDDING_DIM) is True
+        assert widened.count_chunks() == 0
+        assert widened.add_chunks([make_chunk()]) == 1
+        assert chunk_model_for(EMBEDDING_DIM) is CodeChunk
+
     def test_add_chunks_empty(self, chunk_store):
         """Should handle empty list gracefully."""
         assert chunk_store.add_chunks([]) == 0
@@ -228,6 +330,59 @@ class TestChunkStoreLifecycle:
         assert deleted == 2
         assert chunk_store.count_chunks() == 1
 
+    def test_delete_by_files(self, chunk_store, sample_chunks):
+        """Should delete every listed file's chunks in one call."""
+        chunk_store.add_chunks(sample_chunks)
+        version = chunk_store.write_version
+
+        assert chunk_store.delete_by_files(["a.py", "b.py", "it's.py"]) == 3
+        assert chunk_store.count_chunks() == 0
+        assert chunk_store.write_version == version + 1
+        assert chunk_store.delete_by_files([]) == 0
+
+    def test_delete_by_files_batches_predicates(self, chunk_store, sample_chunks):
+        """Long path lists are split into DELETE_BATCH_SIZE-sized IN predicates."""
+        chunk_store.add_chunks(sample_chunks)
+        paths = [f"gone_{i}.py" for i in range(3)] + ["a.py", "b.py"]
+
+        with (
+            patch("lgrep.storage._chunk_store.DELETE_BATCH_SIZE", 2),
+            patch.object(chunk_store.table, "delete", wraps=chunk_store.table.delete) as delete,
+        ):
+            assert chunk_store.delete_by_files(paths) == 3
+        assert delete.call_count == 3
+        assert chunk_store.count_chunks() == 0
+
+    def test_write_version_advances_on_every_write(self, chunk_store, sample_chunks):
+        """Each write path bumps write_version; reads leave it alone."""
+        seen = [chunk_store.write_version]
+        chunk_store.add_chunks(sample_chunks)
+        seen.append(chunk_store.write_version)
+        chunk_store.upsert_chunks(sample_chunks[:1])
+        seen.append(chunk_store.write_version)
+        chunk_store.delete_by_file("a.py")
+        seen.append(chunk_store.write_version)
+        chunk_store.count_chunks()
+        assert chunk_store.write_version == seen[-1]
+        chunk_store.clear()
+        seen.append(chunk_store.write_version)
+        assert seen == sorted(set(seen))
+
+    def test_prewarm(self, chunk_store, sample_chunks):
+        """prewarm skips an empty table and runs probe queries otherwise."""
+        assert chunk_store.prewarm() is False
+        chunk_store.add_chunks(sample_chunks)
+        chunk_store.ensure_fts_index()
+        assert chunk_store.prewarm() is True
+
+    def test_close_releases_table_and_reopens_on_use(self, chunk_store, sample_chunks):
+        """close drops the table handle; the next access reopens it."""
+        chunk_store.add_chunks(sample_chunks)
+        chunk_store.close()
+
+        assert chunk_store._table is None
+        assert chunk_store.count_chunks() == 3
+
     def test_get_file_hash(self, chunk_store, sample_chunks):
         """Should retrieve the stored hash for a file."""
         chunk_store.add_chunks(sample_chunks)
@@ -244,6 +399,21 @@ class TestChunkStoreLifecycle:
         files = chunk_store.get_indexed_files()
         assert files == {"a.py", "b.py"}
 
+    def test_get_stats_counts_chunks_and_files_in_one_scan(self, chunk_store):
+        """get_stats should match count_chunks and get_indexed_files past the default limit."""
+        assert chunk_store.get_stats() == (0, set())
+
+        chunk_store.add_chunks(
+            [make_chunk(file_path="a.py", chunk_index=i) for i in range(15)]
+            + [make_chunk(file_path="b.py")]
+        )
+
+        assert chunk_store.get_stats() == (16, {"a.py", "b.py"})
+        assert chunk_store.get_stats() == (
+            chunk_store.count_chunks(),
+            chunk_store.get_indexed_files(),
+        )
+
     def test_get_file_hashes_returns_path_to_hash_mapping(self, chunk_store):
         """Should return dict mapping each indexed file to its stored hash."""
         chunks = [
@@ -299,6 +469,52 @@ class TestSearch:
         assert results.total_chunks == 3
         assert results.results[0].match_type == "vector"
 
+    def test_search_rows_leave_vectors_in_arrow(self, chunk_store, sample_chunks):
+        """Hit rows carry scores and content but never a Python copy of the vector."""
+        from lgrep.storage._chunk_store import _result_rows
+
+        chunk_store.add_chunks(sample_chunks)
+        hits = chunk_store.table.search([0.1] * EMBEDDING_DIM).limit(2).to_arrow()
+
+        rows = _result_rows(hits)
+        assert len(rows) == 2
+        assert "vector" not in rows[0]
+        assert {"file_path", "content", "_distance"} <= rows[0].keys()
+
+    def test_query_vectors_reuse_a_float32_buffer(self, chunk_store, sample_chunks):
+        """Searches on one thread share a float32 buffer and rank as before."""
+        chunk_store.add_chunks(sample_chunks)
+        first = chunk_store._query_array([0.1] * EMBEDDING_DIM)
+        second = chunk_store._query_array([0.2] * EMBEDDING_DIM)
+        assert first is second
+        assert second.dtype == np.float32
+        assert second[0] == np.float32(0.2)
+
+        query = [0.1] * EMBEDDING_DIM
+        expected = chunk_store.table.search(query).limit(3).to_arrow()
+        results = chunk_store.search_vector(query, limit=3)
+        assert [r.score for r in results.results] == pytest.approx(
+            expected.column("_distance").to_pylist()
+        )
+
+    def test_row_count_memoized_until_next_write(self, chunk_store, sample_chunks):
+        """Repeated searches count rows once; a write makes the next count fresh."""
+        chunk_store.add_chunks(sample_chunks)
+        query_vector = [0.1] * EMBEDDING_DIM
+
+        with patch.object(
+            chunk_store.table, "count_rows", wraps=chunk_store.table.count_rows
+        ) as count_rows:
+            chunk_store.search_vector(query_vector, limit=2)
+            chunk_store.search_vector(query_vector, limit=2)
+            assert count_rows.call_count == 1
+
+            chunk_store.delete_by_file(sample_chunks[0].file_path)
+            calls = count_rows.call_count
+            results = chunk_store.search_vector(query_vector, limit=2)
+            assert count_rows.call_count == calls
+        assert results.total_chunks == chunk_store.table.count_rows()
+
     def test_search_hybrid(self, chunk_store, sample_chunks):
         """Should perform hybrid search with RRF reranking."""
         chunk_store.add_chunks(sample_chunks)
@@ -388,6 +604,50 @@ class TestIdempotentIndexCreation:
         store.search_hybrid(query_vector, "test query", limit=3)
         assert store._vector_indexed is True
 
+    def test_vector_index_sized_once_and_kept_on_reopen(self, temp_db_path):
+        """The IVF-PQ index is sized to the table and not retrained by a new store."""
+        store = ChunkStore(temp_db_path)
+        store.add_chunks([make_chunk(content=f"content {i}", chunk_index=i) for i in range(260)])
+
+        with (
+            patch.object(store.table, "count_rows", return_value=1500),
+            patch.object(store.table, "create_index", wraps=store.table.create_index) as create,
+        ):
+            store.prepare_hybrid_indexes()
+        assert create.call_args.kwargs["num_partitions"] == 38
+        assert create.call_args.kwargs["num_sub_vectors"] == EMBEDDING_DIM // 16
+        assert create.call_args.kwargs["replace"] is False
+
+        reopened = ChunkStore(temp_db_path)
+        table = reopened.table  # opening the table probes for existing indexes
+        assert reopened._vector_indexed is True
+        with patch.object(table, "create_index") as create_again:
+            reopened.prepare_hybrid_indexes()
+        create_again.assert_not_called()
+
+    def test_vector_index_rebuilt_after_growth(self, temp_db_path):
+        """The index is retrained only once the table grows past the rebuild margin."""
+        store = ChunkStore(temp_db_path)
+        store._vector_indexed = True
+        store._vector_indexed_rows = 1000
+
+        with (
+            patch.object(store.table, "count_rows", return_value=1200),
+            patch.object(store.table, "create_index") as create,
+        ):
+            store.prepare_hybrid_indexes()
+        create.assert_not_called()
+
+        store.write_version += 1  # rows written since
+        with (
+            patch.object(store.table, "count_rows", return_value=1600),
+            patch.object(store.table, "create_index") as create,
+        ):
+            store.prepare_hybrid_indexes()
+        assert create.call_args.kwargs["replace"] is True
+        assert create.call_args.kwargs["num_partitions"] == 40
+        assert store._vector_indexed_rows == 1600
+
     def test_fts_indexed_flag_prevents_rebuild(self, chunk_store):
         """After first FTS index build, subsequent calls skip rebuild."""
         chunks = [make_chunk(content=f"content {i}", chunk_index=i) for i in range(3)]
@@ -5,7 +5,7 @@ from pathlib import Path
 from unittest.mock import MagicMock
 
 import pytest
-from watchdog.events import FileModifiedEvent
+from watchdog.events import FileDeletedEvent, FileModifiedEvent
 
 from lgrep.watcher import IndexingHandler
 
@@ -35,8 +35,8 @@ class TestFileWatcher:
         # Wait for debounce
         await asyncio.sleep(0.05)
 
-        # Verify indexer.index_file was called (in executor)
-        assert indexer.index_file.called
+        # Verify indexer.index_files was called (in executor)
+        indexer.index_files.assert_called_once_with([Path("/project/test.py")])
 
     @pytest.mark.asyncio
     async def test_handler_routes_index_through_runtime(self):
@@ -61,8 +61,8 @@ class TestFileWatcher:
         handler.on_modified(event)
         await asyncio.sleep(0.05)
 
-        assert indexer.index_file.called
-        assert ("watch_index_file", "IndexingHandler._do_index", "/project") in calls
+        assert indexer.index_files.called
+        assert ("watch_index_files", "IndexingHandler._do_index", "/project") in calls
 
     @pytest.mark.asyncio
     async def test_handler_routes_delete_through_runtime(self):
@@ -82,10 +82,10 @@ class TestFileWatcher:
         loop = asyncio.get_running_loop()
         handler = IndexingHandler(indexer, loop, runtime=runtime)
 
-        await handler._async_delete_file(Path("/project/test.py"))
+        await handler._delete_files([Path("/project/test.py"), Path("/elsewhere/x.py")])
 
-        indexer.storage.delete_by_file.assert_called_once_with("test.py")
-        assert ("watch_delete_file", "IndexingHandler._async_delete_file", "/project") in calls
+        indexer.storage.delete_by_files.assert_called_once_with(["test.py"])
+        assert ("watch_delete_files", "IndexingHandler._delete_files", "/project") in calls
 
     @pytest.mark.asyncio
     async def test_handler_respects_ignore(self):
@@ -118,18 +118,18 @@ class TestFileWatcher:
 
         handler.on_modified(event)
         await asyncio.sleep(0.01)  # Process threadsafe call
-        handle1 = handler.pending_files[path]
+        handle1 = handler._flush_handle
 
         await asyncio.sleep(0.01)
 
         handler.on_modified(event)
         await asyncio.sleep(0.01)  # Process threadsafe call
-        handle2 = handler.pending_files[path]
+        handle2 = handler._flush_handle
 
         assert handle1 != handle2
 
         await asyncio.sleep(0.1)
-        assert indexer.index_file.call_count == 1
+        assert indexer.index_files.call_count == 1
 
     @pytest.mark.asyncio
     async def test_handler_skips_non_code_files(self):
@@ -166,3 +166,40 @@ class TestFileWatcher:
         await asyncio.sleep(0.01)
 
         assert len(handler.pending_files) == 5
+
+    @pytest.mark.asyncio
+    async def test_handler_batches_changes_in_one_window(self):
+        """Changes to different files inside one window are indexed together."""
+        indexer = MagicMock()
+        indexer.discovery.is_ignored.return_value = False
+
+        loop = asyncio.get_running_loop()
+        handler = IndexingHandler(indexer, loop, debounce_ms=30)
+
+        for name in ["b.py", "a.py", "b.py"]:
+            handler.on_modified(FileModifiedEvent(f"/project/{name}"))
+            await asyncio.sleep(0.01)
+
+        await asyncio.sleep(0.1)
+        indexer.index_files.assert_called_once_with([Path("/project/a.py"), Path("/project/b.py")])
+        assert not handler.pending_files
+
+    @pytest.mark.asyncio
+    async def test_deleted_file_leaves_pending_batch(self):
+        """Files deleted inside the window are removed together, not re-indexed."""
+        indexer = MagicMock()
+        indexer.discovery.is_ignored.return_value = False
+        indexer.project_path = Path("/project")
+
+        loop = asyncio.get_running_loop()
+        handler = IndexingHandler(indexer, loop, debounce_ms=30)
+
+        handler.on_modified(FileModifiedEvent("/project/a.py"))
+        handler.on_modified(FileModifiedEvent("/project/gone.py"))
+        await asyncio.sleep(0.01)
+        handler.on_deleted(FileDeletedEvent("/project/gone.py"))
+        handler.on_deleted(FileDeletedEvent("/project/old.py"))
+        await asyncio.sleep(0.1)
+
+        indexer.index_files.assert_called_once_with([Path("/project/a.py")])
+        indexer.storage.delete_by_files.assert_called_once_with(["gone.py", "old.py"])
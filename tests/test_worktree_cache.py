@@ -203,6 +203,7 @@ class TestStaleFileDeletionGuard:
 
         # Create a mock embedder that returns zeros
         embedder = MagicMock()
+        embedder.output_dimension = EMBEDDING_DIM
         embed_result = MagicMock()
         embed_result.embeddings = [[0.0] * EMBEDDING_DIM]
         embed_result.token_usage = 0
@@ -253,6 +254,7 @@ class TestStaleFileDeletionGuard:
         )
 
         embedder = MagicMock()
+        embedder.output_dimension = EMBEDDING_DIM
         embed_result = MagicMock()
         embed_result.embeddings = [[0.0] * EMBEDDING_DIM]
         embed_result.token_usage = 0